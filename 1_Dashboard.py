@@ -1,12 +1,11 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import boto3
-import os
-from io import StringIO
 from dotenv import load_dotenv
 
+from bank_marketing.config import cache_artefacts, client_s3, nom_bucket, seuil_mode_approche
+from bank_marketing.demarrage import PRECHAUFFAGE, tache_dataset
+from bank_marketing.figures import CacheFigures
+from bank_marketing.profilage import Chrono, Profileur
+
 # --- 1. CONFIGURATION ---
 load_dotenv()
 
@@ -17,78 +16,243 @@ st.set_page_config(
 )
 
 # --- 2. FONCTIONS BACKEND (S3) ---
-@st.cache_data
+@st.cache_resource
 def charger_data_s3(nom_du_fichier):
-    # Connexion S3
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=os.getenv('ACCESS_KEY'),
-        aws_secret_access_key=os.getenv('SECRET_KEY'),
-        region_name="eu-west-3"
-    )
-    reponse = s3_client.get_object(Bucket=os.getenv('BUCKET_NAME'), Key=nom_du_fichier)
-    contenu = reponse['Body'].read().decode('utf-8')
-    
-    # Lecture avec le bon séparateur (point-virgule)
-    return pd.read_csv(StringIO(contenu), sep=';')
+    # Un seul dataset figé par process (DatasetPartage), partagé par les sessions sans copie
+    # (st.cache_data renvoyait une copie désérialisée à chaque rerun).
+    # Dataset déjà chargé par le préchauffage (python -m bank_marketing.demarrage) s'il a tourné
+    jeu = PRECHAUFFAGE.prendre(tache_dataset(nom_du_fichier))
+    if jeu is not None:
+        return jeu
+
+    # Snapshot Parquet (colonnes utiles uniquement) si publié par l'ETL, sinon CSV
+    # parsé en continu pendant le téléchargement par plages parallèles
+    barre_chargement = st.progress(0.0)
+
+    def suivre_chargement(octets_lus, total):
+        barre_chargement.progress(
+            min(octets_lus / total, 1.0) if total else 1.0,
+            text=f"Téléchargement S3 : {octets_lus / 1e6:.0f} / {total / 1e6:.0f} Mo"
+        )
+
+    df = charger_dataset(cache_artefacts(), nom_bucket(), nom_du_fichier, progression=suivre_chargement)
+    barre_chargement.empty()
+    return DatasetPartage(df)
+
+@st.cache_data(ttl=300)
+def version_ingestion():
+    # Version publiée par l'ingestion incrémentale (0 : pas encore initialisée)
+    try:
+        return version_courante(client_s3(), nom_bucket())
+    except Exception:
+        return 0
+
+@st.cache_resource
+def charger_cube(nom_du_fichier, version):
+    # Cube tenu à jour par l'ingestion si elle existe, sinon construit une seule fois
+    # par version du dataset ; figé et partagé comme le dataset
+    if version:
+        return figer(charger_cube_stocke(cache_artefacts(), nom_bucket()))
+    return figer(construire_cube(charger_data_s3(nom_du_fichier).df))
+
+@st.cache_resource
+def echantillon_stocke(version):
+    # Échantillon stratifié publié par l'ingestion avec cette version (None sans ingestion)
+    if version:
+        return charger_echantillon_stocke(cache_artefacts(), nom_bucket())
+    return None
+
+@st.cache_resource
+def reservoir_source(nom_du_fichier):
+    # Réservoir tiré une fois en lisant la source lot par lot : le dataset complet n'est pas chargé
+    reservoir = ReservoirStratifie()
+    for lot in lire_par_lots(cache_artefacts(), nom_bucket(), nom_du_fichier):
+        reservoir.ajouter(lot)
+    return reservoir
+
+@st.cache_resource
+def lignes_source(nom_du_fichier):
+    # Taille du dataset lue dans le pied du snapshot Parquet ; sans snapshot (CSV seul),
+    # comptée en alimentant le réservoir du mode approché
+    lignes = compter_lignes(cache_artefacts(), nom_bucket(), nom_du_fichier)
+    return lignes if lignes is not None else reservoir_source(nom_du_fichier).lignes_vues
+
+@st.cache_resource
+def charger_echantillon(nom_du_fichier, version):
+    # Mode approché : réservoir publié par l'ingestion, sinon tiré une fois de la source en flux ;
+    # lignes tirées et cube pondéré, figés comme le dataset
+    reservoir = echantillon_stocke(version)
+    if reservoir is None:
+        reservoir = reservoir_source(nom_du_fichier)
+    return DatasetPartage(reservoir.echantillon()), figer(reservoir.cube())
+
+@st.cache_resource
+def index_filtres(nom_du_fichier, version, mode_approche, _cube):
+    # Bitmaps des filtres construits une fois par version (et par mode) du cube, partagés par les sessions
+    return IndexBitmap(_cube)
+
+@st.cache_resource
+def profileur_dashboard():
+    # Partagé par les sessions : percentiles glissants sur les derniers reruns
+    return Profileur()
+
+@st.cache_resource
+def cache_figures():
+    # Figures des zooms partagées par les sessions, par (graphique, option, version des données)
+    return CacheFigures()
+
+profileur = profileur_dashboard()
+figures = cache_figures()
+chrono = Chrono(profileur)
+
+# --- 3. EN-TÊTE (PREMIER AFFICHAGE) ---
+chrono.etape("En-tête")
+
+# Sidebar simple
+st.sidebar.title("Navigation")
+st.sidebar.success("Données connectées S3")
+st.sidebar.markdown("---")
+st.sidebar.info("Projet Bank Marketing")
+
+# Titre Principal
+st.title("🏦 Optimisation des Campagnes Marketing")
+st.markdown("### Analyse de la performance et ciblage prédictif")
+st.markdown("---")
+PRECHAUFFAGE.marquer("Premier affichage (dashboard)")
+
+# --- 4. CHARGEMENT ET CALCULS ---
+chrono.etape("Imports + chargement S3 + cube")
+# Imports lourds (pandas, plotly, pyarrow) après l'en-tête : déjà faits si le préchauffage a tourné
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from bank_marketing.cube import agreger, construire_cube, kpis, matrice, taux_par
+from bank_marketing.donnees import DatasetPartage, charger_dataset, compter_lignes, figer, lire_par_lots
+from bank_marketing.echantillon import LIGNES_MIN_FIABLES, ReservoirStratifie, intervalle_global, intervalles
+from bank_marketing.filtres import LIBELLES_FILTRES, IndexBitmap
+from bank_marketing.ingestion import charger_cube_stocke, charger_echantillon_stocke, version_courante
 
-# --- 3. CHARGEMENT ET CALCULS ---
 try:
     with st.spinner('Chargement des données...'):
-        df = charger_data_s3("bank_marketing_cleaned_v1.csv")
+        version = version_ingestion()
+        stocke = echantillon_stocke(version)
+        lignes_totales = stocke.lignes_vues if stocke is not None else lignes_source("bank_marketing_cleaned_v1.csv")
+
+    # Au-delà du seuil, KPI et graphiques sont estimés sur l'échantillon stratifié (désactivable)
+    st.sidebar.markdown("---")
+    mode_approche = st.sidebar.toggle(
+        "⚡ Mode approché (échantillon)",
+        value=lignes_totales > seuil_mode_approche(),
+        help="Taux estimés sur un échantillon stratifié métier x mois, avec intervalles de confiance à 95 %."
+    )
+
+    with st.spinner('Chargement des données...'):
+        if mode_approche:
+            jeu, cube = charger_echantillon("bank_marketing_cleaned_v1.csv", version)
+        else:
+            jeu, cube = charger_data_s3("bank_marketing_cleaned_v1.csv"), charger_cube("bank_marketing_cleaned_v1.csv", version)
+        # Vue sans copie du dataset partagé (colonnes en lecture seule)
+        df = jeu.df
+        index = index_filtres("bank_marketing_cleaned_v1.csv", version, mode_approche, cube)
         
         # Définition de la cible
         COLONNE_CIBLE = 'souscription'
-        
-        # Création d'une colonne numérique pour les calculs (1=Yes, 0=No)
-        df['target_num'] = df[COLONNE_CIBLE].apply(lambda x: 1 if x == 'yes' else 0)
-        
-        # Calcul du taux de conversion global
-        conversion_rate = (df[COLONNE_CIBLE].value_counts(normalize=True).get('yes', 0)) * 100
 
 except Exception as e:
     st.error(f"Erreur technique : {e}")
     st.stop()
 
-# --- 4. INTERFACE UTILISATEUR ---
+# --- FILTRES CROISÉS (SIDEBAR) ---
+chrono.etape("Filtres croisés")
+ordre_mois = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
 
-# Sidebar simple
-st.sidebar.title("Navigation")
-st.sidebar.success("Données connectées S3")
 st.sidebar.markdown("---")
-st.sidebar.info("Projet Bank Marketing")
+st.sidebar.header("🔎 Filtres")
+selection = {}
+for dimension in index.dimensions:
+    modalites = index.modalites[dimension]
+    if dimension == 'mois':
+        modalites = sorted(modalites, key=lambda m: ordre_mois.index(m) if m in ordre_mois else len(ordre_mois))
+    selection[dimension] = st.sidebar.multiselect(LIBELLES_FILTRES[dimension], modalites, placeholder="Tous")
+
+# Tous les KPI et graphiques ci-dessous portent sur les seules cellules retenues (AND entre filtres, OR entre modalités)
+cube_complet = cube
+cube = index.filtrer(cube_complet, selection)
+cle_donnees = (version, mode_approche, IndexBitmap.cle(selection))
+filtre_actif = bool(cle_donnees[2])
+
+# KPI (roll-up du cube filtré)
+indicateurs = kpis(cube)
+conversion_rate = indicateurs['conversion_rate']
+if indicateurs['volume'] == 0:
+    st.warning("Aucun client ne correspond à ces filtres.")
+    st.stop()
+if filtre_actif:
+    st.sidebar.caption(
+        f"{'≈ ' if mode_approche else ''}{indicateurs['volume']:,} clients retenus sur "
+        f"{int(cube_complet['Volume'].sum()):,}".replace(",", " ")
+    )
 
-# Titre Principal
-st.title("🏦 Optimisation des Campagnes Marketing")
-st.markdown("### Analyse de la performance et ciblage prédictif")
-st.markdown("---")
+def ajouter_intervalles(df_taux, dimension, colonne_taux):
+    # Mode approché : écarts aux bornes de l'IC 95 % (barres d'erreur des graphiques de taux)
+    ic = intervalles(cube, [dimension])[[dimension, 'Borne_basse', 'Borne_haute']]
+    df_taux = df_taux.merge(ic, on=dimension, how='left')
+    return df_taux.assign(
+        Erreur_haute=df_taux['Borne_haute'] - df_taux[colonne_taux],
+        Erreur_basse=df_taux[colonne_taux] - df_taux['Borne_basse']
+    )
+
+def barres_erreur(axe):
+    return {f'error_{axe}': 'Erreur_haute', f'error_{axe}_minus': 'Erreur_basse'} if mode_approche else {}
+
+# --- 5. INTERFACE UTILISATEUR ---
+chrono.etape("KPI")
 
 # --- SECTION KPI MACRO ---
+if mode_approche:
+    _, borne_basse, borne_haute = intervalle_global(cube)
+
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric(label="Volume Clients", value=f"{df.shape[0]:,}".replace(",", " "))
+    st.metric(label="Volume Clients", value=f"{indicateurs['volume']:,}".replace(",", " "))
 with col2:
-    st.metric(label="Taux de Conversion", value=f"{conversion_rate:.2f} %")
+    st.metric(
+        label="Taux de Conversion",
+        value=f"{conversion_rate:.2f} %" + (f" ± {(borne_haute - borne_basse) / 2:.2f}" if mode_approche else ""),
+        delta=f"{conversion_rate - kpis(cube_complet)['conversion_rate']:+.2f} pts vs global" if filtre_actif else None,
+        help=f"IC 95 % : {borne_basse:.2f} – {borne_haute:.2f} %" if mode_approche else None
+    )
 with col3:
-    st.metric(label="Âge Moyen", value=f"{df['age'].mean():.0f} ans")
+    st.metric(label="Âge Moyen", value=f"{indicateurs['age_moyen']:.0f} ans")
 with col4:
-    st.metric(label="Durée Moyenne", value=f"{df['duration'].mean()/60:.1f} min")
+    st.metric(label="Durée Moyenne", value=f"{indicateurs['duree_moyenne']/60:.1f} min")
+
+if mode_approche:
+    lignes_echantillon = f"{int(cube_complet['Lignes'].sum()):,}".replace(",", " ")
+    st.info(
+        f"⚡ **Mode approché** : estimations sur {lignes_echantillon} clients tirés par strate métier x mois "
+        f"parmi {lignes_totales:,}".replace(",", " ") + ". Les taux portent leur intervalle de confiance à 95 %."
+    )
 
 st.markdown("---")
 
 # --- SECTION 1 : APERÇU DES DONNÉES ---
+chrono.etape("Aperçu des données")
 with st.expander("👁️ Afficher un aperçu des données brutes"):
     st.dataframe(df.head())
 
 # --- SECTION 2 : LE PROBLÈME (Déséquilibre) ---
+chrono.etape("1. Cible + zoom")
 st.header("1. Analyse de la Cible (Target)")
 
 c1, c2 = st.columns([1, 1])
 
 with c1:
     # GRAPHIQUE 1 : Distribution Globale
-    counts = df[COLONNE_CIBLE].value_counts().reset_index()
+    counts = agreger(cube, [COLONNE_CIBLE]).sort_values('Volume', ascending=False)
+    counts = counts[[COLONNE_CIBLE, 'Volume']]
     counts.columns = ['Résultat', 'Nombre']
     
     fig = px.bar(
@@ -116,54 +280,65 @@ with c1:
     """)
 
 # BLOC ZOOM (LE SLICER EST ICI)
-with c2:
-    st.markdown("#### 🔍 Zoom sur la répartition")
-    
-    critere = st.selectbox(
-        "Voir le détail par :",
-        ["Métier", "Statut Matrimonial", "Niveau d'Études"]
+# Fragment : changer de critère ne réexécute que ce bloc, pas tout le dashboard
+def figure_zoom_critere(cube, critere, col_choisie):
+    df_zoom = agreger(cube, [col_choisie, COLONNE_CIBLE]).rename(columns={'Volume': 'Nombre'})
+
+    fig_zoom = px.bar(
+        df_zoom,
+        x='Nombre',
+        y=col_choisie,
+        color=COLONNE_CIBLE,
+        orientation='h',
+        title=f"Répartition {critere} x Souscription",
+        color_discrete_map={'no': "#CA2103", 'yes': "#05662A"},
+        barmode='stack'
     )
-    
-    col_map = {
-        "Métier": "metier",
-        "Statut Matrimonial": "statut_matrimonial",
-        "Niveau d'Études": "niveau_etudes" 
-    }
-    col_choisie = col_map[critere]
-    
-    if col_choisie in df.columns:
-        df_zoom = df.groupby([col_choisie, COLONNE_CIBLE]).size().reset_index(name='Nombre')
+    fig_zoom.update_layout(legend=dict(orientation="h", y=1.1))
+    return fig_zoom
+
+@st.fragment
+def zoom_critere(cube, cle_donnees):
+    with profileur.section("Zoom critère (fragment)"):
+        st.markdown("#### 🔍 Zoom sur la répartition")
         
-        fig_zoom = px.bar(
-            df_zoom,
-            x='Nombre',
-            y=col_choisie,
-            color=COLONNE_CIBLE,
-            orientation='h',
-            title=f"Répartition {critere} x Souscription",
-            color_discrete_map={'no': "#CA2103", 'yes': "#05662A"},
-            barmode='stack'
+        critere = st.selectbox(
+            "Voir le détail par :",
+            ["Métier", "Statut Matrimonial", "Niveau d'Études"]
         )
-        fig_zoom.update_layout(legend=dict(orientation="h", y=1.1))
-        st.plotly_chart(fig_zoom, use_container_width=True)
-    else:
-        st.info("Donnée non disponible.")
+        
+        col_map = {
+            "Métier": "metier",
+            "Statut Matrimonial": "statut_matrimonial",
+            "Niveau d'Études": "niveau_etudes" 
+        }
+        col_choisie = col_map[critere]
+        
+        if col_choisie in cube.columns:
+            fig_zoom = figures.obtenir(
+                'zoom_critere', critere, cle_donnees, lambda: figure_zoom_critere(cube, critere, col_choisie)
+            )
+            st.plotly_chart(fig_zoom, use_container_width=True)
+        else:
+            st.info("Donnée non disponible.")
+
+with c2:
+    zoom_critere(cube, cle_donnees)
     
 st.markdown("---")
 
 # --- SECTION 3 : PROFIL CLIENT (WHO) ---
+chrono.etape("2. Profil client")
 st.header("2. PROFILING : QUI EST LE CLIENT IDÉAL ?")
 
 st.markdown("Comparaison **Volume** (qui on appelle) vs **Performance** (qui signe).")
 
 # 1. PRÉPARATION DES DONNÉES
-df_job = df.groupby('metier').agg(
-    Volume=('souscription', 'count'),
-    Conversion_Rate=('target_num', 'mean')
-).reset_index()
-# Conversion en % et Arrondi à 2 décimales
-df_job['Conversion_Rate'] = (df_job['Conversion_Rate'] * 100).round(2)
+# Volume et taux (en %, arrondi à 2 décimales) issus du cube
+df_job = agreger(cube, ['metier']).rename(columns={'Taux_Conversion': 'Conversion_Rate'})
 df_job = df_job.sort_values(by='Conversion_Rate', ascending=False)
+if mode_approche:
+    df_job = ajouter_intervalles(df_job, 'metier', 'Conversion_Rate')
 
 # 2. VISUALISATION MÉTIER
 st.subheader("A. Analyse par Métier (Job)")
@@ -194,7 +369,8 @@ with col_job2:
         title="Taux de Conversion (%)",
         text_auto='.2f', # Formatage affichage 2 décimales
         color='Conversion_Rate',
-        color_continuous_scale=["#EED9C5","#E6A66A","#F18C2D","#884506"]
+        color_continuous_scale=["#EED9C5","#E6A66A","#F18C2D","#884506"],
+        **barres_erreur('x')
     )
     fig_perf.add_vline(x=conversion_rate, line_dash="dash", line_color="Brown", annotation_text="Moyenne")
     st.plotly_chart(fig_perf, use_container_width=True)
@@ -218,10 +394,10 @@ st.subheader("B. Analyse Démographique")
 col_age1, col_age2 = st.columns(2)
 
 with col_age1:
-    if 'age_group' in df.columns:
-        df_age = df.groupby('age_group')['target_num'].mean().reset_index()
-        # Arrondi
-        df_age['target_num'] = (df_age['target_num'] * 100).round(2)
+    if 'age_group' in cube.columns:
+        df_age = taux_par(cube, 'age_group').rename('target_num').reset_index()
+        if mode_approche:
+            df_age = ajouter_intervalles(df_age, 'age_group', 'target_num')
         
         fig_age = px.bar(
             df_age, 
@@ -231,16 +407,17 @@ with col_age1:
             text_auto='.2f',
             color='target_num',
             color_continuous_scale=["#FFEEE5","#DB9452","#D8802E","#FF7B00"],
-            labels={'target_num': 'Conversion (%)'}
+            labels={'target_num': 'Conversion (%)'},
+            **barres_erreur('y')
         )
         st.plotly_chart(fig_age, use_container_width=True)
     else:
         st.warning("Colonne 'age_group' introuvable.")
 
 with col_age2:
-    df_statut = df.groupby('statut_matrimonial')['target_num'].mean().reset_index()
-    # Arrondi
-    df_statut['target_num'] = (df_statut['target_num'] * 100).round(2)
+    df_statut = taux_par(cube, 'statut_matrimonial').rename('target_num').reset_index()
+    if mode_approche:
+        df_statut = ajouter_intervalles(df_statut, 'statut_matrimonial', 'target_num')
     
     fig_statut = px.bar(
         df_statut, 
@@ -250,15 +427,18 @@ with col_age2:
         text_auto='.2f',
         color='target_num',
         color_continuous_scale='Oranges',
-        labels={'target_num': 'Conversion (%)'}
+        labels={'target_num': 'Conversion (%)'},
+        **barres_erreur('y')
     )
     st.plotly_chart(fig_statut, use_container_width=True)
 
 # Calculs auto pour texte
-top_age_group = df.groupby('age_group')['target_num'].mean().idxmax() if 'age_group' in df.columns else "N/A"
-perf_age = df.groupby('age_group')['target_num'].mean().max() * 100 if 'age_group' in df.columns else 0
-top_statut = df.groupby('statut_matrimonial')['target_num'].mean().idxmax()
-perf_statut = df.groupby('statut_matrimonial')['target_num'].mean().max() * 100
+taux_age = taux_par(cube, 'age_group') if 'age_group' in cube.columns else None
+top_age_group = taux_age.idxmax() if taux_age is not None else "N/A"
+perf_age = taux_age.max() if taux_age is not None else 0
+taux_statut = taux_par(cube, 'statut_matrimonial')
+top_statut = taux_statut.idxmax()
+perf_statut = taux_statut.max()
 
 st.info(f"""
 **Observation Business :** Sur le plan démographique, deux signaux forts se dégagent :
@@ -271,6 +451,7 @@ st.info(f"""
 st.markdown("---")
 
 # --- SECTION 4 : STRATÉGIE TEMPORELLE (WHEN) ---
+chrono.etape("3. Timing")
 st.header("3. TIMING : QUAND LANCER LES CAMPAGNES ?")
 
 st.markdown("Analyse de la **Saisonnalité** (Mois) et de la **Pression Marketing**.")
@@ -278,13 +459,13 @@ st.markdown("Analyse de la **Saisonnalité** (Mois) et de la **Pression Marketin
 # 1. ANALYSE MENSUELLE (COMBO CHART AVEC PLOTLY GO)
 st.subheader("A. Le Paradoxe du Mois de Mai")
 
-ordre_mois = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-df_mois = df.groupby('mois').agg(
-    Volume=('souscription', 'count'),
-    Taux_Conversion=('target_num', 'mean')
-).reindex(ordre_mois).dropna().reset_index()
-# Arrondi
-df_mois['Taux_Conversion'] = (df_mois['Taux_Conversion'] * 100).round(2)
+df_mois = (
+    agreger(cube, ['mois'])
+    .set_index('mois')[['Volume', 'Taux_Conversion']]
+    .reindex(ordre_mois).dropna().reset_index()
+)
+if mode_approche:
+    df_mois = ajouter_intervalles(df_mois, 'mois', 'Taux_Conversion')
 
 col_mois1, col_mois2 = st.columns([2, 1])
 
@@ -307,6 +488,8 @@ with col_mois1:
         yaxis='y2',
         mode='lines+markers',
         line=dict(color='red', width=3),
+        error_y=dict(type='data', array=df_mois['Erreur_haute'], arrayminus=df_mois['Erreur_basse'])
+        if mode_approche else None,
         hovertemplate='%{y:.2f}%' # Template survol propre
     ))
 
@@ -336,13 +519,9 @@ with col_mois1:
     """)
 
 # ZOOM MOIS (DROITE)
-with col_mois2:
-    st.markdown("#### 🔍 Zoom : Qui a-t-on appelé ?")
-    
-    mois_select = st.selectbox("Sélectionnez un mois :", ordre_mois, index=4) # index 4 = may
-    
-    df_zoom_month = df[df['mois'] == mois_select]
-    df_zoom_job = df_zoom_month['metier'].value_counts().reset_index()
+# Fragment : changer de mois ne reconstruit ni le combo mensuel ni la heatmap
+def figure_zoom_mois(cube, mois_select):
+    df_zoom_job = agreger(cube, ['metier'], filtres={'mois': mois_select})[['metier', 'Volume']]
     df_zoom_job.columns = ['Metier', 'Volume']
     
     fig_zoom_month = px.bar(
@@ -355,15 +534,31 @@ with col_mois2:
         color_discrete_sequence=["#E6A66A"]
     )
     fig_zoom_month.update_layout(margin=dict(l=0, r=0, t=30, b=0), showlegend=False)
-    st.plotly_chart(fig_zoom_month, use_container_width=True)
+    return fig_zoom_month
+
+@st.fragment
+def zoom_mois(cube, cle_donnees):
+    with profileur.section("Zoom mois (fragment)"):
+        st.markdown("#### 🔍 Zoom : Qui a-t-on appelé ?")
+        
+        mois_select = st.selectbox("Sélectionnez un mois :", ordre_mois, index=4) # index 4 = may
+        
+        fig_zoom_month = figures.obtenir(
+            'zoom_mois', mois_select, cle_donnees, lambda: figure_zoom_mois(cube, mois_select)
+        )
+        st.plotly_chart(fig_zoom_month, use_container_width=True)
+
+with col_mois2:
+    zoom_mois(cube, cle_donnees)
 
 
 # 2. ANALYSE DE LA PRESSION
 st.subheader("B. Acharnement vs Efficacité")
 
-df_campaign = df.groupby('campaign')['target_num'].mean().reset_index()
-# Arrondi
-df_campaign['target_num'] = (df_campaign['target_num'] * 100).round(2)
+df_campaign = taux_par(cube, 'campaign_bucket').rename('target_num').reset_index()
+if mode_approche:
+    df_campaign = ajouter_intervalles(df_campaign, 'campaign_bucket', 'target_num')
+df_campaign = df_campaign.rename(columns={'campaign_bucket': 'campaign'})
 df_campaign = df_campaign[df_campaign['campaign'] <= 10]
 
 col_cam1, col_cam2 = st.columns([2, 1])
@@ -375,7 +570,8 @@ with col_cam1:
         y='target_num',
         markers=True,
         title="Chute de la conversion après X appels",
-        labels={'target_num': 'Succès (%)', 'campaign': 'Nb contacts'}
+        labels={'target_num': 'Succès (%)', 'campaign': 'Nb contacts'},
+        **barres_erreur('y')
     )
     fig_press.add_vline(x=3, line_dash="dash", line_color="red", annotation_text="Zone Harcèlement")
     # Mise à jour du format de survol
@@ -393,20 +589,13 @@ with col_cam2:
 st.markdown("---")
 
 # --- SECTION 5 : ANALYSE CROISÉE (THE SNIPER VIEW) ---
+chrono.etape("4. Matrice métier x mois")
 st.header("4. CIBLAGE CHIRURGICAL : QUI & QUAND ?")
 
 st.markdown("Carte de chaleur (Heatmap) croisée **Métier x Mois**.")
 
 # PRÉPARATION PIVOT
-pivot_table = df.pivot_table(
-    values='target_num',
-    index='metier',
-    columns='mois',
-    aggfunc='mean'
-)
-# Arrondi du pivot direct
-pivot_table = (pivot_table * 100).round(2)
-pivot_table = pivot_table.reindex(columns=ordre_mois)
+pivot_table = matrice(cube, 'metier', 'mois', ordre_colonnes=ordre_mois)
 
 # HEATMAP PLOTLY
 fig_heat = px.imshow(
@@ -419,7 +608,24 @@ fig_heat = px.imshow(
     aspect="auto"
 )
 fig_heat.update_layout(title="Matrice de Rentabilité")
+
+# Cellules sur trop peu de clients signalées (⚠) ; en mode approché, IC 95 % au survol
+cellules = intervalles(cube, ['metier', 'mois'])
+peu_de_lignes = cellules.pivot(index='metier', columns='mois', values='Peu_de_lignes').reindex_like(pivot_table) == True
+texte = pivot_table.map(lambda v: f"{v:.2f}" if v == v else "")
+texte = texte.where(~peu_de_lignes, texte + " ⚠")
+fig_heat.update_traces(text=texte.to_numpy(), texttemplate="%{text}")
+if mode_approche:
+    bornes = [
+        cellules.pivot(index='metier', columns='mois', values=borne).reindex_like(pivot_table).to_numpy()
+        for borne in ('Borne_basse', 'Borne_haute')
+    ]
+    fig_heat.update_traces(
+        customdata=np.dstack(bornes),
+        hovertemplate="%{y} / %{x} : %{z:.2f} % (IC 95 % : %{customdata[0]:.2f} – %{customdata[1]:.2f})<extra></extra>"
+    )
 st.plotly_chart(fig_heat, use_container_width=True)
+st.caption(f"⚠ : moins de {LIGNES_MIN_FIABLES} clients dans la cellule, taux peu fiable.")
 
 # --- INSIGHTS SPÉCIFIQUES ---
 st.markdown("### 💡 Analyse détaillée de la Matrice")
@@ -453,6 +659,7 @@ with col_opportunite:
     """)
 
 # --- CONCLUSION FINALE ---
+chrono.etape("Recommandations")
 st.markdown("---")
 st.header("🎓 RECOMMANDATIONS STRATÉGIQUES")
 
@@ -477,4 +684,21 @@ with col_rec2:
 
 # Signature
 st.markdown("---")
-st.caption("Dashboard réalisé avec Streamlit & AWS S3 • Données Bank Marketing")
\ No newline at end of file
+st.caption("Dashboard réalisé avec Streamlit & AWS S3 • Données Bank Marketing")
+chrono.fin()
+
+# --- 6. PROFILAGE (DEBUG) ---
+st.sidebar.markdown("---")
+if st.sidebar.checkbox("🛠️ Profilage des sections", value=False):
+    st.sidebar.caption("Durées par section sur les derniers reruns (toutes sessions).")
+    st.sidebar.dataframe(profileur.statistiques(), hide_index=True)
+    st.sidebar.download_button(
+        "Exporter (JSON)",
+        data=profileur.exporter_json(),
+        file_name="profilage_dashboard.json",
+        mime="application/json"
+    )
+    if st.sidebar.button("Réinitialiser les mesures"):
+        profileur.reinitialiser()
+    st.sidebar.caption("Démarrage du process (secondes depuis le lancement).")
+    st.sidebar.dataframe(PRECHAUFFAGE.rapport(), hide_index=True)
\ No newline at end of file
@@ -0,0 +1 @@
+"""Briques partagées par le dashboard, le simulateur et l'ETL Bank Marketing."""
@@ -0,0 +1,170 @@
+"""Cache disque des objets S3 (dataset, modèles) revalidé par ETag.
+
+Chaque objet est stocké sous <répertoire>/<bucket>/<clé> avec un fichier
+.meta.json (ETag, taille, dates). Au démarrage, un GET conditionnel
+(If-None-Match) ne retélécharge l'objet que s'il a changé ; si S3 est
+injoignable, la dernière copie valide est servie. Les téléchargements passent
+par des GET par plages parallèles (voir telechargement.py).
+"""
+import io
+import json
+import os
+import tempfile
+import time
+
+from bank_marketing.telechargement import avancement, ouvrir_flux
+
+TAILLE_BLOC = 8 * 1024 * 1024
+
+
+def code_erreur(erreur):
+    reponse = getattr(erreur, 'response', None) or {}
+    code = str(reponse.get('Error', {}).get('Code', ''))
+    statut = reponse.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return code, statut
+
+
+def est_non_modifie(erreur):
+    code, statut = code_erreur(erreur)
+    return code in ('304', 'NotModified') or statut == 304
+
+
+def est_introuvable(erreur):
+    code, statut = code_erreur(erreur)
+    return code in ('404', 'NoSuchKey', 'NotFound') or statut == 404
+
+
+class CacheArtefacts:
+
+    def __init__(self, s3_client, repertoire, taille_max=None, age_max=None, hors_ligne=False):
+        self.s3_client = s3_client
+        self.repertoire = repertoire
+        self.taille_max = taille_max
+        self.age_max = age_max
+        self.hors_ligne = hors_ligne
+        # Origine du dernier accès par clé : 'telecharge', 'revalide', 'hors_ligne'
+        self.statuts = {}
+
+    # --- CHEMINS / MÉTADONNÉES ---
+    def chemin(self, bucket, key):
+        return os.path.join(self.repertoire, bucket or "_", *key.split('/'))
+
+    def _meta(self, chemin):
+        try:
+            with open(chemin + '.meta.json', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _ecrire_meta(self, chemin, meta):
+        with open(chemin + '.meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    # --- ACCÈS ---
+    def ouvrir(self, bucket, key):
+        """Flux binaire sur l'objet : copie locale si elle est à jour, sinon
+        téléchargement par plages parallèles recopié dans le cache au fil de la lecture."""
+        chemin = self.chemin(bucket, key)
+        meta = self._meta(chemin) if os.path.isfile(chemin) else None
+
+        if meta and self.hors_ligne:
+            return self._ouvrir_local(chemin, meta, key, 'hors_ligne')
+
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(chemin), suffix='.part')
+        copie = os.fdopen(descripteur, 'wb')
+        try:
+            flux = ouvrir_flux(
+                self.s3_client, bucket, key,
+                etag_connu=meta['etag'] if meta else None,
+                copie=copie,
+                a_la_fin=lambda brut: self._finaliser(copie, temporaire, chemin, bucket, key, brut.etag)
+            )
+        except Exception as e:
+            copie.close()
+            os.remove(temporaire)
+            if meta and est_non_modifie(e):
+                return self._ouvrir_local(chemin, meta, key, 'revalide')
+            if meta and not est_introuvable(e):
+                # S3 injoignable (réseau, identifiants...) : dernière copie valide
+                return self._ouvrir_local(chemin, meta, key, 'hors_ligne')
+            raise
+
+        # Lecture interrompue avant la fin : la copie partielle est abandonnée
+        flux.raw.a_la_fermeture = lambda: self._abandonner(copie, temporaire)
+        return flux
+
+    def recuperer(self, bucket, key, progression=None):
+        """Chemin local à jour de l'objet (téléchargé, revalidé ou copie hors ligne).
+
+        `progression(octets_lus, total)` est appelé depuis le thread appelant.
+        """
+        with self.ouvrir(bucket, key) as flux:
+            if not isinstance(flux.raw, io.FileIO):
+                while flux.read(TAILLE_BLOC):
+                    if progression is not None:
+                        progression(*avancement(flux))
+            if progression is not None:
+                taille = avancement(flux)[1]
+                progression(taille, taille)
+        return self.chemin(bucket, key)
+
+    def _ouvrir_local(self, chemin, meta, key, statut):
+        meta['dernier_acces'] = time.time()
+        self._ecrire_meta(chemin, meta)
+        self.statuts[key] = statut
+        return open(chemin, 'rb')
+
+    def _finaliser(self, copie, temporaire, chemin, bucket, key, etag):
+        # Renommage atomique une fois le dernier octet reçu : jamais de copie tronquée
+        copie.close()
+        os.replace(temporaire, chemin)
+        maintenant = time.time()
+        self._ecrire_meta(chemin, {
+            'bucket': bucket, 'key': key, 'etag': etag,
+            'taille': os.path.getsize(chemin), 'telecharge_le': maintenant, 'dernier_acces': maintenant
+        })
+        self.statuts[key] = 'telecharge'
+        self.evincer(garder=chemin)
+
+    def _abandonner(self, copie, temporaire):
+        if not copie.closed:
+            copie.close()
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+
+    # --- ÉVICTION ---
+    def entrees(self):
+        """(chemin, meta) de tous les objets en cache."""
+        resultat = []
+        for dossier, _, fichiers in os.walk(self.repertoire):
+            for nom in fichiers:
+                if nom.endswith('.meta.json'):
+                    chemin = os.path.join(dossier, nom[:-len('.meta.json')])
+                    meta = self._meta(chemin)
+                    if meta and os.path.isfile(chemin):
+                        resultat.append((chemin, meta))
+        return resultat
+
+    def supprimer(self, chemin):
+        for cible in (chemin, chemin + '.meta.json'):
+            if os.path.exists(cible):
+                os.remove(cible)
+
+    def evincer(self, garder=None):
+        """Supprime les objets trop anciens, puis les moins récemment utilisés au-delà de taille_max."""
+        entrees = sorted(self.entrees(), key=lambda e: e[1].get('dernier_acces', 0))
+        maintenant = time.time()
+        if self.age_max is not None:
+            for chemin, meta in list(entrees):
+                if chemin != garder and maintenant - meta.get('dernier_acces', 0) > self.age_max:
+                    self.supprimer(chemin)
+                    entrees.remove((chemin, meta))
+        if self.taille_max is not None:
+            total = sum(meta.get('taille', 0) for _, meta in entrees)
+            for chemin, meta in entrees:
+                if total <= self.taille_max:
+                    break
+                if chemin != garder:
+                    self.supprimer(chemin)
+                    total -= meta.get('taille', 0)
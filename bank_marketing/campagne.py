@@ -0,0 +1,142 @@
+"""Courbes seuil / ROI d'une campagne : les scores sont triés une seule fois, puis
+précision, recall, nombre d'appels et profit de TOUS les seuils possibles sont
+lus dans des sommes cumulées (généralise simuler_campagne_business du notebook V2).
+
+Sans résultat connu (prospects à appeler), les conversions attendues sont la
+somme des probabilités : même courbe, en espérance.
+
+Sur l'historique, seules les lignes de test du notebook V2 sont scorées : le
+modèle publié a été ajusté sur les 80 % restants, ses scores y seraient
+optimistes (seuil trop bas, profit surestimé).
+"""
+import numpy as np
+import pandas as pd
+
+from bank_marketing.config import COLONNE_CIBLE, COUT_APPEL, GAIN_VENTE
+
+# Découpage train / test du notebook 3_machine_learningV2 (étape 2)
+PART_TEST = 0.2
+SEED_DECOUPAGE = 42
+
+# Points gardés pour tracer une courbe (le calcul, lui, porte sur tous les seuils)
+POINTS_GRAPHIQUE = 500
+
+# Point « ne rien appeler »
+AUCUN_APPEL = {'seuil': None, 'appels': 0, 'conversions': 0.0, 'precision': 0.0, 'recall': 0.0, 'profit': 0.0}
+
+
+class CourbeSeuils:
+    """Cumuls triés par score décroissant, un point par valeur de score distincte.
+
+    Le point k correspond à « appeler tous les clients de score >= seuils[k] » :
+    les ex-aequo sont appelés ensemble, comme avec `probs >= s` dans le notebook.
+    """
+
+    def __init__(self, scores, conversions=None):
+        scores = np.asarray(scores, dtype=np.float64)
+        conversions = scores if conversions is None else np.asarray(conversions, dtype=np.float64)
+        ordre = np.argsort(-scores, kind='stable')
+        tries = scores[ordre]
+        cumul = np.cumsum(conversions[ordre])
+
+        # Dernière position de chaque groupe d'ex-aequo
+        fins = np.flatnonzero(np.r_[tries[1:] != tries[:-1], True]) if tries.size else np.empty(0, dtype=np.int64)
+        self.seuils = tries[fins]
+        self.appels = fins + 1
+        self.conversions = cumul[fins]
+        self.total_conversions = float(cumul[-1]) if cumul.size else 0.0
+        self.nb_clients = scores.size
+
+    def __len__(self):
+        return self.seuils.size
+
+    def profit(self, cout_appel=COUT_APPEL, gain_vente=GAIN_VENTE):
+        return self.conversions * gain_vente - self.appels * cout_appel
+
+    def tableau(self, cout_appel=COUT_APPEL, gain_vente=GAIN_VENTE, indices=None):
+        """Courbe (ou ses points `indices`) : seuil, appels, conversions, précision, recall, profit."""
+        indices = slice(None) if indices is None else indices
+        appels, conversions = self.appels[indices], self.conversions[indices]
+        return pd.DataFrame({
+            'seuil': self.seuils[indices],
+            'appels': appels,
+            'conversions': conversions,
+            'precision': conversions / appels,
+            'recall': conversions / self.total_conversions if self.total_conversions else 0.0,
+            'profit': conversions * gain_vente - appels * cout_appel
+        })
+
+    def indice_max_appels(self, max_appels):
+        """Dernier point dont le nombre d'appels tient dans `max_appels` (-1 si aucun)."""
+        return int(np.searchsorted(self.appels, max_appels, side='right')) - 1
+
+    def optimum(self, cout_appel=COUT_APPEL, gain_vente=GAIN_VENTE, budget=None):
+        """Seuil qui maximise le profit, sous contrainte de budget (en €) si fourni.
+
+        Renvoie un dict (seuil, appels, conversions, précision, recall, profit) ;
+        ne rien appeler (profit 0) reste possible si aucun seuil n'est rentable.
+        """
+        profits = self.profit(cout_appel, gain_vente)
+        fin = len(self) - 1
+        if budget is not None:
+            fin = self.indice_max_appels(budget // cout_appel if cout_appel > 0 else self.nb_clients)
+        if fin < 0 or profits[:fin + 1].max() <= 0:
+            return dict(AUCUN_APPEL)
+        k = int(np.argmax(profits[:fin + 1]))
+        return self._point(k, profits[k])
+
+    def top_k(self, k, cout_appel=COUT_APPEL, gain_vente=GAIN_VENTE):
+        """Point le plus proche de « appeler les k meilleurs » sans dépasser k appels."""
+        i = self.indice_max_appels(k)
+        if i < 0:
+            return dict(AUCUN_APPEL)
+        return self._point(i, self.profit(cout_appel, gain_vente)[i])
+
+    def _point(self, k, profit):
+        return {
+            'seuil': float(self.seuils[k]),
+            'appels': int(self.appels[k]),
+            'conversions': float(self.conversions[k]),
+            'precision': float(self.conversions[k] / self.appels[k]),
+            'recall': float(self.conversions[k] / self.total_conversions) if self.total_conversions else 0.0,
+            'profit': float(profit)
+        }
+
+    def echantillon(self, cout_appel=COUT_APPEL, gain_vente=GAIN_VENTE, points=POINTS_GRAPHIQUE):
+        """Tableau réduit à ~`points` lignes régulièrement espacées en nombre d'appels."""
+        if len(self) <= points:
+            return self.tableau(cout_appel, gain_vente)
+        cibles = np.linspace(self.appels[0], self.appels[-1], points)
+        indices = np.unique(np.searchsorted(self.appels, cibles).clip(0, len(self) - 1))
+        return self.tableau(cout_appel, gain_vente, indices)
+
+
+def lignes_test(df):
+    """Jeu de test du notebook V2 (même découpage stratifié, même graine) : jamais vu par le modèle publié."""
+    from sklearn.model_selection import train_test_split
+
+    y = (df[COLONNE_CIBLE].astype(str) == 'yes').astype(int)
+    _, test = train_test_split(df, test_size=PART_TEST, random_state=SEED_DECOUPAGE, stratify=y)
+    return test
+
+
+def selection_top_k(scores, k):
+    """Indices des k meilleurs scores (ordre décroissant), en O(n) + O(k log k)."""
+    scores = np.asarray(scores)
+    k = min(int(k), scores.size)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    meilleurs = np.argpartition(-scores, k - 1)[:k]
+    return meilleurs[np.argsort(-scores[meilleurs], kind='stable')]
+
+
+def simuler_campagne(scores, y, seuils, cout_appel=COUT_APPEL, gain_vente=GAIN_VENTE):
+    """Équivalent vectorisé de simuler_campagne_business pour une liste de seuils."""
+    courbe = CourbeSeuils(scores, y)
+    seuils = np.asarray(seuils, dtype=np.float64)
+    # Dernier point de seuil >= s (seuils de la courbe décroissants) ; -1 : personne n'est appelé
+    indices = np.searchsorted(-courbe.seuils, -seuils, side='right') - 1
+    tableau = courbe.tableau(cout_appel, gain_vente, indices.clip(0))
+    tableau['seuil'] = seuils
+    tableau.loc[indices < 0, ['appels', 'conversions', 'precision', 'recall', 'profit']] = 0
+    return tableau
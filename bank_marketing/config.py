@@ -0,0 +1,97 @@
+"""Constantes communes (S3, fichiers, colonnes) utilisées par les pages et l'ETL."""
+import os
+from functools import lru_cache
+
+# --- S3 ---
+REGION_S3 = "eu-west-3"
+
+
+@lru_cache(maxsize=None)
+def client_s3():
+    """Client S3 unique pour tout le process (les clients boto3 sont thread-safe).
+
+    Si S3_LOCAL_DIR est défini, un faux S3 adossé au disque le remplace (dev, benchmarks).
+    """
+    if os.getenv('S3_LOCAL_DIR'):
+        from bank_marketing.s3_local import ClientS3Local
+
+        return ClientS3Local(os.getenv('S3_LOCAL_DIR'))
+
+    # Import local : boto3 est lourd et inutile pour les traitements hors S3
+    import boto3
+
+    return boto3.client(
+        's3',
+        aws_access_key_id=os.getenv('ACCESS_KEY'),
+        aws_secret_access_key=os.getenv('SECRET_KEY'),
+        region_name=REGION_S3
+    )
+
+
+def nom_bucket():
+    return os.getenv('BUCKET_NAME')
+
+
+# --- CACHE LOCAL DES ARTEFACTS S3 ---
+def repertoire_cache():
+    return os.getenv('BANK_MARKETING_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'bank_marketing'))
+
+
+@lru_cache(maxsize=None)
+def cache_artefacts():
+    """Cache disque partagé (données + modèles), revalidé par ETag au démarrage.
+
+    Variables (lues au premier appel, donc après load_dotenv) :
+    BANK_MARKETING_CACHE_DIR, BANK_MARKETING_CACHE_MAX_MO, BANK_MARKETING_CACHE_MAX_JOURS,
+    BANK_MARKETING_OFFLINE=1 (ne jamais interroger S3 si une copie locale existe).
+    """
+    from bank_marketing.cache_s3 import CacheArtefacts
+
+    repertoire = repertoire_cache()
+    taille_max = int(os.getenv('BANK_MARKETING_CACHE_MAX_MO', '2048')) * 1024 * 1024
+    age_max = int(os.getenv('BANK_MARKETING_CACHE_MAX_JOURS', '30')) * 24 * 3600
+    hors_ligne = os.getenv('BANK_MARKETING_OFFLINE', '0') == '1'
+    return CacheArtefacts(client_s3(), repertoire, taille_max, age_max, hors_ligne)
+
+
+# --- MODE APPROCHÉ DU DASHBOARD ---
+def seuil_mode_approche():
+    """Nombre de lignes au-delà duquel le dashboard passe par défaut sur l'échantillon stratifié
+    (BANK_MARKETING_SEUIL_APPROCHE, 5 millions par défaut ; 0 : toujours)."""
+    return int(os.getenv('BANK_MARKETING_SEUIL_APPROCHE', '5000000'))
+
+
+# --- SURVEILLANCE DE LA DÉRIVE ---
+def dossier_derive():
+    """Dossier partagé où le simulateur, le service et le scoring écrivent leurs esquisses de dérive
+    (BANK_MARKETING_DERIVE_DIR, par défaut le sous-dossier `derive` du cache local)."""
+    return os.getenv('BANK_MARKETING_DERIVE_DIR', os.path.join(repertoire_cache(), 'derive'))
+
+
+# --- FICHIERS PUBLIÉS PAR L'ETL ---
+FICHIER_CSV = "bank_marketing_cleaned_v1.csv"
+FICHIER_PARQUET = "bank_marketing_cleaned_v1.parquet"
+
+# --- COLONNES ---
+COLONNE_CIBLE = 'souscription'
+# Cible précalculée en booléen (souscription == 'yes') dans le dataset partagé du dashboard
+COLONNE_SOUSCRIT = 'souscrit'
+
+# --- HYPOTHÈSES BUSINESS (notebook 3_machine_learningV2) ---
+# Ici plutôt que dans campagne : la page de planification les affiche avant d'importer numpy/pandas
+COUT_APPEL = 10
+GAIN_VENTE = 100
+
+ORDRE_MOIS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+# Seules colonnes lues par le dashboard (élagage des colonnes au chargement)
+COLONNES_DASHBOARD = [
+    'metier', 'mois', 'souscription', 'age', 'duration', 'campaign',
+    'age_group', 'statut_matrimonial', 'niveau_etudes', 'segment_contact'
+]
+
+# Colonnes texte stockées en dictionnaire (category) dans le snapshot colonnaire
+COLONNES_CATEGORIELLES = [
+    'metier', 'statut_matrimonial', 'niveau_etudes', 'defaut_credit', 'pret_immo',
+    'pret_conso', 'mois', 'resultat_precedent', 'souscription', 'segment_contact', 'age_group'
+]
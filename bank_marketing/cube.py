@@ -0,0 +1,90 @@
+"""Cube d'agrégats par segment : construit une fois par version du dataset, puis
+chaque KPI / graphique du dashboard n'est qu'un roll-up de quelques milliers de lignes."""
+import numpy as np
+import pandas as pd
+
+from bank_marketing.config import COLONNE_CIBLE, COLONNE_SOUSCRIT
+
+# Au-delà de 10 appels, le dashboard ne détaille plus : tout tombe dans le bucket 11
+CAMPAGNE_MAX = 10
+
+DIMENSIONS_CUBE = [
+    'metier', 'mois', 'age_group', 'statut_matrimonial', 'niveau_etudes',
+    'segment_contact', 'campaign_bucket', COLONNE_CIBLE
+]
+MESURES_CUBE = ['Volume', 'Conversions', 'Somme_age', 'Somme_duration']
+
+
+def bucket_campagne(campaign):
+    return np.minimum(np.asarray(campaign), CAMPAGNE_MAX + 1)
+
+
+def construire_cube(df):
+    """Comptes et sommes par combinaison de segments (une ligne par cellule non vide)."""
+    # Cible booléenne précalculée par le dataset partagé (donnees.DatasetPartage), sinon recalculée
+    souscrit = df[COLONNE_SOUSCRIT] if COLONNE_SOUSCRIT in df.columns else df[COLONNE_CIBLE] == 'yes'
+    travail = pd.DataFrame({
+        'campaign_bucket': bucket_campagne(df['campaign']).astype('int64'),
+        'Volume': 1,
+        'Conversions': souscrit.astype('int64'),
+        'Somme_age': df['age'],
+        'Somme_duration': df['duration']
+    }, index=df.index)
+    dimensions = [d for d in DIMENSIONS_CUBE if d in df.columns or d == 'campaign_bucket']
+    for dim in dimensions:
+        if dim != 'campaign_bucket':
+            travail[dim] = df[dim]
+
+    # dropna=False : les lignes sans segment (ex. age_group vide) restent dans les totaux
+    return (
+        travail.groupby(dimensions, observed=True, dropna=False)[MESURES_CUBE]
+        .sum()
+        .reset_index()
+    )
+
+
+# --- ROLL-UPS ---
+def kpis(cube):
+    volume = cube['Volume'].sum()
+    return {
+        'volume': int(volume),
+        'conversion_rate': cube['Conversions'].sum() / volume * 100 if volume else 0,
+        'age_moyen': cube['Somme_age'].sum() / volume if volume else 0,
+        'duree_moyenne': cube['Somme_duration'].sum() / volume if volume else 0
+    }
+
+
+def agreger(cube, dimensions, filtres=None):
+    """Volume, conversions et taux (en %, 2 décimales) par `dimensions`.
+
+    `filtres` : dict {colonne: valeur} appliqué sur le cube avant le roll-up.
+    """
+    if filtres:
+        masque = np.ones(len(cube), dtype=bool)
+        for col, valeur in filtres.items():
+            masque &= (cube[col] == valeur).to_numpy()
+        cube = cube[masque]
+    resultat = (
+        cube.groupby(dimensions, observed=True)[['Volume', 'Conversions']]
+        .sum()
+        .reset_index()
+    )
+    resultat = resultat[resultat['Volume'] > 0]
+    resultat['Taux_Conversion'] = (resultat['Conversions'] / resultat['Volume'] * 100).round(2)
+    if resultat['Volume'].dtype.kind == 'f':
+        # Cube d'échantillon (echantillon.py) : volumes estimés, affichés en entiers
+        resultat[['Volume', 'Conversions']] = resultat[['Volume', 'Conversions']].round().astype('int64')
+    return resultat
+
+
+def taux_par(cube, dimension):
+    """Équivalent de df.groupby(dimension)['target_num'].mean() * 100."""
+    return agreger(cube, [dimension]).set_index(dimension)['Taux_Conversion']
+
+
+def matrice(cube, index, colonnes, ordre_colonnes=None):
+    """Équivalent du pivot_table(values='target_num', aggfunc='mean') en %."""
+    pivot = agreger(cube, [index, colonnes]).pivot(index=index, columns=colonnes, values='Taux_Conversion')
+    if ordre_colonnes is not None:
+        pivot = pivot.reindex(columns=ordre_colonnes)
+    return pivot
@@ -0,0 +1,190 @@
+"""Démarrage à froid : préchauffage en tâche de fond et mesures de démarrage.
+
+Lancé à la place de `streamlit run`, ce module démarre un thread qui importe
+les bibliothèques lourdes des pages (pandas, plotly, pyarrow, boto3) puis
+remplit les caches (dataset du dashboard, modèle publié) pendant que Streamlit
+démarre. Les pages récupèrent ces résultats avec `PRECHAUFFAGE.prendre(nom)` ;
+sans préchauffage (`streamlit run` direct), `prendre` renvoie None et chaque
+page charge elle-même, comme avant.
+
+Toutes les durées sont comptées depuis le lancement du process (interpréteur
+compris) : imports, tâches de préchauffage et premier affichage des pages
+(`PRECHAUFFAGE.marquer`).
+
+Usage (Dockerfile) :
+    python -m bank_marketing.demarrage 1_Dashboard.py --server.port 7860 --server.address 0.0.0.0
+"""
+import argparse
+import importlib
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+# Imports des pages, du plus lent au plus rapide (boto3 est optionnel avec S3_LOCAL_DIR)
+MODULES_LOURDS = ('pandas', 'plotly.express', 'plotly.graph_objects', 'pyarrow.parquet', 'boto3')
+
+TACHE_MODELE = "Modèle publié"
+
+
+def tache_dataset(nom_du_fichier):
+    return f"Dataset {nom_du_fichier}"
+
+
+def _lancement_proc():
+    """Date de démarrage du process sur l'horloge perf_counter (Linux : lue dans /proc)."""
+    try:
+        with open('/proc/self/stat') as f:
+            # Champ 22 (starttime, en tops d'horloge depuis le boot) ; le nom du process peut contenir des espaces
+            depart = int(f.read().rsplit(')', 1)[1].split()[19]) / os.sysconf('SC_CLK_TCK')
+        with open('/proc/uptime') as f:
+            return time.perf_counter() - (float(f.read().split()[0]) - depart)
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter()
+
+
+_LANCEMENT = _lancement_proc()
+
+
+def secondes_depuis_lancement():
+    return time.perf_counter() - _LANCEMENT
+
+
+class Prechauffage:
+    """Tâches de fond (une Future par nom) et journal des étapes de démarrage du process."""
+
+    def __init__(self):
+        self._taches = {}
+        self._journal = []
+        self._jalons = set()
+        self._verrou = threading.Lock()
+        self.thread = None
+
+    def _noter(self, nom, debut, duree, statut="ok"):
+        with self._verrou:
+            self._journal.append({
+                'Étape': nom,
+                'Début_s': round(debut, 3),
+                'Durée_ms': round(duree * 1000, 1) if duree is not None else None,
+                'Statut': statut
+            })
+
+    def mesurer(self, nom, fonction, *args):
+        """Exécute `fonction(*args)` et journalise sa durée (statut « échec » si elle lève)."""
+        debut = secondes_depuis_lancement()
+        try:
+            resultat = fonction(*args)
+        except Exception:
+            self._noter(nom, debut, secondes_depuis_lancement() - debut, "échec")
+            raise
+        self._noter(nom, debut, secondes_depuis_lancement() - debut)
+        return resultat
+
+    def marquer(self, nom):
+        """Jalon (ex. premier affichage d'une page) : seul le premier passage du process compte."""
+        with self._verrou:
+            if nom in self._jalons:
+                return
+            self._jalons.add(nom)
+        self._noter(nom, secondes_depuis_lancement(), None)
+
+    def lancer(self, taches, modules=MODULES_LOURDS):
+        """Thread de fond : imports `modules`, puis tâches {nom: fonction} dans l'ordre."""
+        # Le thread garde ses Futures : `prendre` peut les retirer avant qu'elles ne soient résolues
+        futurs = {nom: Future() for nom in taches}
+        with self._verrou:
+            self._taches.update(futurs)
+        self.thread = threading.Thread(target=self._executer, args=(taches, futurs, modules),
+                                       name="prechauffage", daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def _executer(self, taches, futurs, modules):
+        debut = secondes_depuis_lancement()
+        for module in modules:
+            try:
+                self.mesurer(f"import {module}", importlib.import_module, module)
+            except ImportError:
+                pass
+        for nom, fonction in taches.items():
+            futur = futurs[nom]
+            if not futur.set_running_or_notify_cancel():
+                continue
+            try:
+                futur.set_result(self.mesurer(nom, fonction))
+            except Exception as e:
+                futur.set_exception(e)
+        self._noter("Préchauffage (total)", debut, secondes_depuis_lancement() - debut)
+        print(f"🔥 Préchauffage terminé en {secondes_depuis_lancement() - debut:.2f} s", flush=True)
+
+    def prendre(self, nom, delai=None):
+        """Résultat de la tâche `nom` (attend sa fin), remis une seule fois.
+
+        None si la tâche n'existe pas ou a échoué : la page charge alors elle-même.
+        """
+        with self._verrou:
+            futur = self._taches.pop(nom, None)
+        if futur is None:
+            return None
+        try:
+            return futur.result(delai)
+        except Exception:
+            return None
+
+    def rapport(self):
+        """Étapes du démarrage, par date de début (liste de dicts, affichable par st.dataframe)."""
+        with self._verrou:
+            return sorted(self._journal, key=lambda ligne: ligne['Début_s'])
+
+
+# Unique par process : partagé par le lanceur et toutes les sessions Streamlit
+PRECHAUFFAGE = Prechauffage()
+
+
+def taches_application():
+    """Dataset du dashboard (déjà compacté et figé) et modèle publié, lus via le cache disque S3."""
+    from dotenv import load_dotenv
+
+    from bank_marketing.config import FICHIER_CSV, cache_artefacts, nom_bucket
+
+    load_dotenv()
+
+    def dataset():
+        from bank_marketing.donnees import DatasetPartage, charger_dataset
+
+        return DatasetPartage(charger_dataset(cache_artefacts(), nom_bucket(), FICHIER_CSV))
+
+    def modele():
+        from bank_marketing.scoring import charger_modele_publie
+
+        return charger_modele_publie(cache_artefacts(), nom_bucket())
+
+    return {tache_dataset(FICHIER_CSV): dataset, TACHE_MODELE: modele}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Lance Streamlit en préchauffant imports et caches en tâche de fond.",
+        epilog="Les options inconnues (--server.port ...) sont transmises à `streamlit run`.",
+        allow_abbrev=False
+    )
+    parser.add_argument("script", help="Page principale (ex. 1_Dashboard.py)")
+    parser.add_argument("--sans-prechauffage", action='store_true', help="Démarrage classique (mesures seules)")
+    args, options_streamlit = parser.parse_known_args()
+
+    # Sous `python -m`, ce fichier est __main__ : les pages, elles, importent bank_marketing.demarrage
+    from bank_marketing.demarrage import PRECHAUFFAGE as prechauffage
+
+    # Streamlit d'abord, dans ce thread : à l'import, il construit des figures plotly qui testent
+    # la présence de pandas dans sys.modules et casseraient sur un pandas en cours d'import
+    cli = prechauffage.mesurer("import streamlit", importlib.import_module, "streamlit.web.cli")
+    if not args.sans_prechauffage:
+        # Le thread tourne pendant le démarrage du serveur et l'attente de la première session
+        prechauffage.lancer(taches_application())
+    sys.argv = ["streamlit", "run", args.script, *options_streamlit]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
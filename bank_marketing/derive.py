@@ -0,0 +1,651 @@
+"""Surveillance de la dérive des entrées du modèle et du score, à mémoire fixe.
+
+Chaque variable client du modèle et la propension prédite sont résumées par
+une esquisse de taille fixe, fusionnable par simple addition :
+- numérique : histogramme sur les déciles du profil de référence (comptes par
+  case, valeurs manquantes, somme, min, max) ;
+- catégorielle : compte par modalité vue à l'entraînement, plus une case
+  « inconnues » (valeurs que l'encodeur met silencieusement à zéro) avec
+  quelques exemples gardés.
+
+Le profil de référence est calculé à l'entraînement (même esquisses, sur les
+données et les scores d'entraînement) et publié à côté du modèle. Sur le
+chemin de prédiction, un MoniteurDerive met à jour ses esquisses (quelques
+µs par client) ; un thread les écrit toutes les INTERVALLE_ECRITURE_S
+secondes dans le dossier partagé, un fichier par process et par heure. La
+page Dérive fusionne les fichiers de la fenêtre choisie et les compare à la
+référence (PSI, KS).
+
+Usage :
+    python -m bank_marketing.derive reference donnees.csv model_bank_marketing_v1.joblib model_bank_marketing_v1_profil.json
+    python -m bank_marketing.derive rapport model_bank_marketing_v1_profil.json --heures 24
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.cache_s3 import est_introuvable
+
+journal = logging.getLogger(__name__)
+
+CLE_PROFIL = "model_bank_marketing_v1_profil.json"
+
+VARIABLE_SCORE = 'propension'
+
+# Déciles de référence : 10 cases (moins si la variable a peu de valeurs distinctes)
+N_CASES = 10
+# Exemples de valeurs inconnues gardés par variable (le compte, lui, est exact)
+MAX_EXEMPLES_INCONNUS = 20
+
+# Seuils usuels du PSI : < 0,1 stable, 0,1 - 0,25 à surveiller, > 0,25 dérive
+PSI_SURVEILLER = 0.1
+PSI_DERIVE = 0.25
+# Part de valeurs inconnues (mises à zéro par l'encodeur) au-delà de laquelle on alerte
+PART_INCONNUES_DERIVE = 0.01
+# En dessous, les écarts ne sont pas interprétés
+LIGNES_MIN_DERIVE = 500
+# Proportion plancher d'une case vide dans le calcul du PSI
+EPSILON_PSI = 1e-4
+
+INTERVALLE_ECRITURE_S = 30
+RETENTION_JOURS = 30
+
+
+# --- 1. ESQUISSES ---
+class EsquisseNumerique:
+    """Histogramme à bornes fixes (déciles de référence) + manquantes, somme, min, max."""
+
+    type = 'numerique'
+
+    def __init__(self, bornes, comptes=None, manquantes=0, somme=0.0, minimum=np.inf, maximum=-np.inf):
+        self.bornes = np.asarray(bornes, dtype=np.float64)
+        self._bornes = self.bornes.tolist()
+        # Entiers Python : incrément unitaire ~10x plus rapide qu'un élément de tableau NumPy
+        self.comptes = [0] * (len(self.bornes) + 1) if comptes is None else [int(n) for n in comptes]
+        self.manquantes = int(manquantes)
+        self.somme = float(somme)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+
+    @classmethod
+    def depuis_valeurs(cls, valeurs, n_cases=N_CASES):
+        x = _en_flottants(valeurs)
+        presentes = x[~np.isnan(x)]
+        bornes = np.unique(np.quantile(presentes, np.linspace(0, 1, n_cases + 1)[1:-1])) if presentes.size else []
+        return cls(bornes).ajouter(x)
+
+    def vide(self):
+        return type(self)(self.bornes)
+
+    def ajouter_valeur(self, valeur):
+        try:
+            x = float(valeur)
+        except (TypeError, ValueError):
+            x = np.nan
+        if x != x:
+            self.manquantes += 1
+            return
+        self.comptes[bisect_right(self._bornes, x)] += 1
+        self.somme += x
+        if x < self.minimum:
+            self.minimum = x
+        if x > self.maximum:
+            self.maximum = x
+
+    def ajouter(self, valeurs):
+        x = _en_flottants(valeurs)
+        manque = np.isnan(x)
+        if manque.any():
+            self.manquantes += int(manque.sum())
+            x = x[~manque]
+        if x.size:
+            ajouts = np.bincount(np.searchsorted(self.bornes, x, side='right'), minlength=len(self.comptes))
+            self.comptes = [a + b for a, b in zip(self.comptes, ajouts.tolist())]
+            self.somme += float(x.sum())
+            self.minimum = min(self.minimum, float(x.min()))
+            self.maximum = max(self.maximum, float(x.max()))
+        return self
+
+    def compatible(self, autre):
+        return isinstance(autre, EsquisseNumerique) and np.array_equal(self.bornes, autre.bornes)
+
+    def fusionner(self, autre):
+        if not self.compatible(autre):
+            raise ValueError("Esquisses numériques de bornes différentes : fusion impossible.")
+        self.comptes = [a + b for a, b in zip(self.comptes, autre.comptes)]
+        self.manquantes += autre.manquantes
+        self.somme += autre.somme
+        self.minimum = min(self.minimum, autre.minimum)
+        self.maximum = max(self.maximum, autre.maximum)
+        return self
+
+    @property
+    def lignes(self):
+        return sum(self.comptes) + self.manquantes
+
+    @property
+    def moyenne(self):
+        presentes = sum(self.comptes)
+        return self.somme / presentes if presentes else np.nan
+
+    def cases(self):
+        """Comptes par case, manquantes en dernier (support du PSI)."""
+        return np.array(self.comptes + [self.manquantes], dtype=np.int64)
+
+    def libelles(self):
+        b = [f"{v:g}" for v in self._bornes]
+        if not b:
+            return ["toutes", "(manquantes)"]
+        return [f"< {b[0]}"] + [f"[{b[i]} ; {b[i + 1]}[" for i in range(len(b) - 1)] + [f"≥ {b[-1]}", "(manquantes)"]
+
+    def vers_dict(self):
+        return {'type': self.type, 'bornes': self._bornes, 'comptes': list(self.comptes),
+                'manquantes': self.manquantes, 'somme': self.somme,
+                'minimum': _json_flottant(self.minimum), 'maximum': _json_flottant(self.maximum)}
+
+    @classmethod
+    def depuis_dict(cls, d):
+        return cls(d['bornes'], d['comptes'], d['manquantes'], d['somme'],
+                   _flottant_json(d['minimum'], np.inf), _flottant_json(d['maximum'], -np.inf))
+
+
+class EsquisseCategorielle:
+    """Comptes par modalité de référence, case « inconnues » et quelques exemples de ces valeurs."""
+
+    type = 'categorielle'
+
+    def __init__(self, modalites, comptes=None, manquantes=0, inconnues=None):
+        self.modalites = [str(m) for m in modalites]
+        self.position = {m: i for i, m in enumerate(self.modalites)}
+        # Dernière case : valeurs inconnues du profil de référence
+        self.comptes = [0] * (len(self.modalites) + 1) if comptes is None else [int(n) for n in comptes]
+        self.manquantes = int(manquantes)
+        self.inconnues = dict(inconnues or {})
+
+    @classmethod
+    def depuis_valeurs(cls, valeurs):
+        modalites = pd.Series(valeurs).dropna().astype(str).value_counts().index
+        return cls(modalites).ajouter(valeurs)
+
+    def vide(self):
+        return type(self)(self.modalites)
+
+    def ajouter_valeur(self, valeur):
+        i = self.position.get(valeur)
+        if i is not None:
+            self.comptes[i] += 1
+        elif valeur is None or valeur != valeur:
+            self.manquantes += 1
+        else:
+            self._inconnue(valeur, 1)
+
+    def _inconnue(self, valeur, n):
+        self.comptes[-1] += n
+        cle = str(valeur)
+        if cle in self.inconnues or len(self.inconnues) < MAX_EXEMPLES_INCONNUS:
+            self.inconnues[cle] = self.inconnues.get(cle, 0) + int(n)
+
+    def ajouter_comptes(self, compteur):
+        """Ajoute des comptes {valeur: n} (Counter d'un micro-lot de clients)."""
+        for valeur, n in compteur.items():
+            i = self.position.get(valeur)
+            if i is not None:
+                self.comptes[i] += n
+            elif valeur is None or valeur != valeur:
+                self.manquantes += n
+            else:
+                self._inconnue(valeur, n)
+        return self
+
+    def ajouter(self, valeurs):
+        serie = valeurs if isinstance(valeurs, pd.Series) else pd.Series(valeurs)
+        codes = pd.Categorical(serie, categories=self.modalites).codes
+        manque = serie.isna().to_numpy()
+        connus = codes >= 0
+        ajouts = np.bincount(codes[connus], minlength=len(self.modalites)).tolist() + [0]
+        self.comptes = [a + b for a, b in zip(self.comptes, ajouts)]
+        self.manquantes += int(manque.sum())
+        inconnus = ~connus & ~manque
+        if inconnus.any():
+            for valeur, n in serie[inconnus].astype(str).value_counts().items():
+                self._inconnue(valeur, n)
+        return self
+
+    def compatible(self, autre):
+        return isinstance(autre, EsquisseCategorielle) and self.modalites == autre.modalites
+
+    def fusionner(self, autre):
+        if not self.compatible(autre):
+            raise ValueError("Esquisses catégorielles de modalités différentes : fusion impossible.")
+        self.comptes = [a + b for a, b in zip(self.comptes, autre.comptes)]
+        self.manquantes += autre.manquantes
+        for valeur, n in autre.inconnues.items():
+            if valeur in self.inconnues or len(self.inconnues) < MAX_EXEMPLES_INCONNUS:
+                self.inconnues[valeur] = self.inconnues.get(valeur, 0) + n
+        return self
+
+    @property
+    def lignes(self):
+        return sum(self.comptes) + self.manquantes
+
+    @property
+    def nb_inconnues(self):
+        return self.comptes[-1]
+
+    def cases(self):
+        return np.array(self.comptes + [self.manquantes], dtype=np.int64)
+
+    def libelles(self):
+        return self.modalites + ["(inconnues)", "(manquantes)"]
+
+    def vers_dict(self):
+        return {'type': self.type, 'modalites': self.modalites, 'comptes': list(self.comptes),
+                'manquantes': self.manquantes, 'inconnues': self.inconnues}
+
+    @classmethod
+    def depuis_dict(cls, d):
+        return cls(d['modalites'], d['comptes'], d['manquantes'], d['inconnues'])
+
+
+def _en_flottants(valeurs):
+    try:
+        return np.asarray(valeurs, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(valeurs), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _json_flottant(x):
+    # JSON strict : pas d'infini (esquisse vide)
+    return x if np.isfinite(x) else None
+
+
+def _flottant_json(x, defaut):
+    return defaut if x is None else float(x)
+
+
+_TYPES_ESQUISSE = {c.type: c for c in (EsquisseNumerique, EsquisseCategorielle)}
+
+
+class Esquisses:
+    """Une esquisse par variable client du modèle, plus la propension (en %)."""
+
+    def __init__(self, variables):
+        self.variables = dict(variables)
+        self._numeriques = [(c, e) for c, e in self.variables.items()
+                            if e.type == 'numerique' and c != VARIABLE_SCORE]
+        self._categorielles = [(c, e) for c, e in self.variables.items() if e.type == 'categorielle']
+        self._score = self.variables[VARIABLE_SCORE]
+
+    @classmethod
+    def depuis_donnees(cls, df, scores, colonnes_numeriques, colonnes_categorielles, n_cases=N_CASES):
+        """Profil de référence : bornes et modalités tirées des données d'entraînement."""
+        variables = {c: EsquisseNumerique.depuis_valeurs(df[c], n_cases) for c in colonnes_numeriques}
+        variables.update({c: EsquisseCategorielle.depuis_valeurs(df[c]) for c in colonnes_categorielles})
+        variables[VARIABLE_SCORE] = EsquisseNumerique.depuis_valeurs(scores, n_cases)
+        return cls(variables)
+
+    def vide(self):
+        """Mêmes bornes et modalités, comptes à zéro."""
+        return type(self)({c: e.vide() for c, e in self.variables.items()})
+
+    @property
+    def lignes(self):
+        return self._score.lignes
+
+    # --- Mise à jour ---
+    def observer_client(self, client, score):
+        """Un client (dict) et son score : chemin chaud du simulateur et du service."""
+        for col, esquisse in self._numeriques:
+            esquisse.ajouter_valeur(client.get(col))
+        for col, esquisse in self._categorielles:
+            esquisse.ajouter_valeur(client.get(col))
+        self._score.ajouter_valeur(score)
+
+    def observer_clients(self, clients, scores):
+        """Une liste de clients (dicts) et leurs scores : micro-lot du service, colonne par colonne."""
+        for col, esquisse in self._numeriques:
+            esquisse.ajouter([client.get(col) for client in clients])
+        for col, esquisse in self._categorielles:
+            esquisse.ajouter_comptes(Counter(client.get(col) for client in clients))
+        self._score.ajouter(scores)
+
+    def observer_lot(self, df, scores):
+        """Un DataFrame de clients et leurs scores (vectorisé) ; colonnes absentes comptées manquantes."""
+        for col, esquisse in self._numeriques + self._categorielles:
+            esquisse.ajouter(df[col] if col in df.columns else np.full(len(df), np.nan))
+        self._score.ajouter(scores)
+
+    def compatible(self, autre):
+        """Mêmes variables, mêmes bornes et modalités : esquisses du même profil de référence."""
+        return (self.variables.keys() == autre.variables.keys()
+                and all(e.compatible(autre.variables[col]) for col, e in self.variables.items()))
+
+    def fusionner(self, autre):
+        # Tout est vérifié avant la première variable fusionnée : jamais de fusion partielle
+        if not self.compatible(autre):
+            raise ValueError("Esquisses d'un autre profil de référence : fusion impossible.")
+        for col, esquisse in self.variables.items():
+            esquisse.fusionner(autre.variables[col])
+        return self
+
+    # --- Persistance ---
+    def vers_dict(self):
+        return {col: e.vers_dict() for col, e in self.variables.items()}
+
+    @classmethod
+    def depuis_dict(cls, d):
+        return cls({col: _TYPES_ESQUISSE[e['type']].depuis_dict(e) for col, e in d.items()})
+
+    def sauvegarder(self, chemin):
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump({'variables': self.vers_dict()}, f, ensure_ascii=False)
+
+    @classmethod
+    def charger(cls, source):
+        with open(source, encoding='utf-8') as f:
+            return cls.depuis_dict(json.load(f)['variables'])
+
+
+def construire_reference(model, df, n_cases=N_CASES):
+    """Profil de référence d'un modèle : entrées d'entraînement et scores (en %) qu'il leur donne."""
+    from bank_marketing.features import EncodeurCompile, preparer_clients, schema_du_modele
+    from bank_marketing.scoring import predire_proba_lot
+
+    schema = schema_du_modele(model)
+    clients = preparer_clients(df)
+    scores = np.round(predire_proba_lot(model, EncodeurCompile.depuis_modele(model), clients) * 100, 2)
+    return Esquisses.depuis_donnees(clients, scores, schema['colonnes_numeriques'],
+                                    schema['colonnes_categorielles'], n_cases)
+
+
+def charger_profil_publie(cache, bucket):
+    """Profil de référence publié à côté du modèle, ou None s'il ne l'est pas."""
+    try:
+        return Esquisses.charger(cache.recuperer(bucket, CLE_PROFIL))
+    except Exception as e:
+        if not est_introuvable(e):
+            # Profil publié mais illisible (S3 injoignable, fichier corrompu...) : signalé, pas pris pour une absence
+            journal.warning("Profil de référence %s illisible : %r", CLE_PROFIL, e, exc_info=True)
+        return None
+
+
+# --- 2. COMPARAISON ---
+def psi(reference, courant):
+    """Population Stability Index entre deux vecteurs de comptes sur les mêmes cases."""
+    attendu = np.clip(reference / max(reference.sum(), 1), EPSILON_PSI, None)
+    observe = np.clip(courant / max(courant.sum(), 1), EPSILON_PSI, None)
+    return float(((observe - attendu) * np.log(observe / attendu)).sum())
+
+
+def ks(reference, courant):
+    """Statistique de Kolmogorov-Smirnov sur les bornes de l'histogramme (valeurs présentes)."""
+    if not sum(reference.comptes) or not sum(courant.comptes):
+        return np.nan
+    repartition_ref = np.cumsum(reference.comptes) / sum(reference.comptes)
+    repartition = np.cumsum(courant.comptes) / sum(courant.comptes)
+    return float(np.abs(repartition - repartition_ref).max())
+
+
+def niveau(lignes, indice_psi, part_inconnues=0.0):
+    if lignes < LIGNES_MIN_DERIVE:
+        return "⚪ trop peu de clients"
+    if indice_psi >= PSI_DERIVE or part_inconnues >= PART_INCONNUES_DERIVE:
+        return "🔴 dérive"
+    if indice_psi >= PSI_SURVEILLER or part_inconnues > 0:
+        return "🟠 à surveiller"
+    return "🟢 stable"
+
+
+def comparer(reference, courant):
+    """Une ligne par variable : PSI, KS (numériques), part d'inconnues, moyennes, niveau d'alerte."""
+    lignes = []
+    for col, ref in reference.variables.items():
+        cour = courant.variables[col]
+        indice = psi(ref.cases(), cour.cases())
+        numerique = ref.type == 'numerique'
+        part_inconnues = 0.0 if numerique else cour.nb_inconnues / max(cour.lignes, 1)
+        lignes.append({
+            'Variable': col,
+            'Type': ref.type,
+            'Clients': cour.lignes,
+            'PSI': round(indice, 4),
+            'KS': round(ks(ref, cour), 4) if numerique else np.nan,
+            'Inconnues (%)': round(part_inconnues * 100, 2),
+            'Moyenne réf.': ref.moyenne if numerique else np.nan,
+            'Moyenne': cour.moyenne if numerique else np.nan,
+            'Niveau': niveau(cour.lignes, indice, part_inconnues)
+        })
+    return pd.DataFrame(lignes).sort_values('PSI', ascending=False, ignore_index=True)
+
+
+def alertes(reference, courant):
+    """Messages des variables qui ne sont pas stables, les plus fortes dérives d'abord."""
+    messages = []
+    for ligne in comparer(reference, courant).itertuples(index=False):
+        if ligne.Niveau[0] not in "🔴🟠":
+            continue
+        ref, cour = reference.variables[ligne.Variable], courant.variables[ligne.Variable]
+        texte = f"{ligne.Niveau[0]} **{ligne.Variable}** : PSI {ligne.PSI:.2f}"
+        if ref.type == 'numerique':
+            texte += f", KS {ligne.KS:.2f} (moyenne {ref.moyenne:,.1f} → {cour.moyenne:,.1f})"
+        else:
+            parts_ref, parts = ref.cases() / max(ref.lignes, 1), cour.cases() / max(cour.lignes, 1)
+            i = int(np.abs(parts - parts_ref)[:len(ref.modalites)].argmax())
+            texte += f" ('{ref.modalites[i]}' {parts_ref[i]:.1%} → {parts[i]:.1%})"
+            if cour.nb_inconnues:
+                exemples = ", ".join(f"'{v}'" for v in sorted(cour.inconnues, key=cour.inconnues.get, reverse=True)[:3])
+                texte += (f" ; {cour.nb_inconnues / max(cour.lignes, 1):.2%} de valeurs jamais vues à l'entraînement, "
+                          f"mises à zéro par l'encodeur (ex. {exemples})")
+        if cour.manquantes and not ref.manquantes:
+            texte += f" ; {cour.manquantes:,} valeurs manquantes"
+        messages.append(texte)
+    return messages
+
+
+# --- 3. MONITEUR DU CHEMIN DE PRÉDICTION ---
+def periode_courante(horodatage=None):
+    """Heure UTC (AAAAMMJJTHH) : une esquisse écrite par process et par période."""
+    return time.strftime('%Y%m%dT%H', time.gmtime(time.time() if horodatage is None else horodatage))
+
+
+def fin_periode(horodatage=None):
+    """Horodatage du début de l'heure UTC suivante (fin de la période en cours)."""
+    return (int(time.time() if horodatage is None else horodatage) // 3600 + 1) * 3600
+
+
+class MoniteurDerive:
+    """Esquisses d'un process (simulateur, service, scoring) écrites dans le dossier partagé.
+
+    Le chemin chaud ne fait que mettre à jour l'esquisse courante sous un
+    verrou ; l'écriture l'échange contre une esquisse vide (le verrou n'est
+    tenu que le temps de l'échange) et fusionne le delta hors du verrou.
+    Au changement d'heure, l'esquisse courante est mise de côté avec sa
+    période : chaque delta est écrit dans le fichier de l'heure où il a été
+    observé, jamais dans celle qui commence ou qui vient de finir.
+    """
+
+    def __init__(self, reference, source, dossier=None, intervalle_s=INTERVALLE_ECRITURE_S):
+        self.reference = reference
+        self.source = source
+        self.dossier = dossier
+        self.intervalle_s = intervalle_s
+        self.identifiant = f"{source}-{socket.gethostname()}-{os.getpid()}"
+        self._courant = reference.vide()
+        self._periode = periode_courante()
+        self._fin_periode = fin_periode()
+        # Esquisses d'heures terminées, pas encore fusionnées : (période, esquisses)
+        self._terminees = []
+        self._cumuls = {}
+        self._verrou = threading.Lock()
+        self._verrou_ecriture = threading.Lock()
+        self._arret = threading.Event()
+        self._thread = None
+
+    def observer_client(self, client, score):
+        with self._verrou:
+            if time.time() >= self._fin_periode:
+                self._basculer()
+            self._courant.observer_client(client, score)
+
+    def observer_clients(self, clients, scores):
+        with self._verrou:
+            if time.time() >= self._fin_periode:
+                self._basculer()
+            self._courant.observer_clients(clients, scores)
+
+    def observer_lot(self, df, scores):
+        with self._verrou:
+            if time.time() >= self._fin_periode:
+                self._basculer()
+            self._courant.observer_lot(df, scores)
+
+    def _basculer(self):
+        # Sous self._verrou : l'esquisse de l'heure écoulée est mise de côté avec sa période,
+        # les observations suivantes vont dans l'heure qui commence
+        self._terminees.append((self._periode, self._courant))
+        self._courant = self.reference.vide()
+        self._periode, self._fin_periode = periode_courante(), fin_periode()
+
+    def demarrer(self):
+        """Écriture périodique dans un thread (daemon)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._boucle, name="derive", daemon=True)
+            self._thread.start()
+        return self
+
+    def arreter(self):
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.ecrire()
+
+    def _boucle(self):
+        while not self._arret.wait(self.intervalle_s):
+            try:
+                self.ecrire()
+            except OSError:
+                # Dossier indisponible : on réessaiera au prochain tour, les comptes restent cumulés
+                pass
+
+    def esquisses(self):
+        """Cumul de la période en cours (y compris ce qui n'est pas encore écrit)."""
+        periode = self._collecter()
+        with self._verrou_ecriture:
+            return self.reference.vide().fusionner(self._cumuls.get(periode, self.reference.vide()))
+
+    def _collecter(self):
+        """Fusionne chaque delta dans le cumul de sa propre période ; renvoie la période en cours."""
+        vierge = self.reference.vide()
+        with self._verrou:
+            if time.time() >= self._fin_periode:
+                self._basculer()
+            deltas = self._terminees + [(self._periode, self._courant)]
+            periode, self._terminees, self._courant = self._periode, [], vierge
+        with self._verrou_ecriture:
+            for periode_delta, delta in deltas:
+                if periode_delta not in self._cumuls:
+                    self._cumuls[periode_delta] = self.reference.vide()
+                self._cumuls[periode_delta].fusionner(delta)
+        return periode
+
+    def ecrire(self):
+        """Écrit le cumul de chaque période ; change de fichier (et purge) à chaque nouvelle heure."""
+        periode = self._collecter()
+        with self._verrou_ecriture:
+            for periode_cumul, cumul in sorted(self._cumuls.items()):
+                if self.dossier and cumul.lignes:
+                    os.makedirs(self.dossier, exist_ok=True)
+                    chemin = os.path.join(self.dossier, f"{self.identifiant}-{periode_cumul}.json")
+                    temporaire = chemin + ".tmp"
+                    with open(temporaire, 'w', encoding='utf-8') as f:
+                        json.dump({'source': self.source, 'periode': periode_cumul, 'maj': time.time(),
+                                   'variables': cumul.vers_dict()}, f, ensure_ascii=False)
+                    os.replace(temporaire, chemin)
+            # Heures écoulées écrites pour la dernière fois : seul le cumul de l'heure en cours est gardé
+            if any(p != periode for p in self._cumuls):
+                self._cumuls = {p: c for p, c in self._cumuls.items() if p == periode}
+                if self.dossier:
+                    purger(self.dossier)
+
+
+def purger(dossier, retention_jours=RETENTION_JOURS):
+    limite = time.time() - retention_jours * 24 * 3600
+    for chemin in glob.glob(os.path.join(dossier, "*.json")):
+        try:
+            if os.path.getmtime(chemin) < limite:
+                os.remove(chemin)
+        except OSError:
+            pass
+
+
+def lire_observations(dossier, reference, depuis=None):
+    """Fusionne les esquisses écrites depuis la période `depuis` (toutes si None).
+
+    Renvoie (esquisses, clients par source, nb de fichiers ignorés car d'un
+    autre profil de référence).
+    """
+    total, sources, ignores = reference.vide(), Counter(), 0
+    for chemin in sorted(glob.glob(os.path.join(dossier, "*.json"))):
+        try:
+            with open(chemin, encoding='utf-8') as f:
+                contenu = json.load(f)
+            if depuis is not None and contenu['periode'] < depuis:
+                continue
+            esquisses = Esquisses.depuis_dict(contenu['variables'])
+            total.fusionner(esquisses)
+        except (OSError, ValueError, KeyError):
+            ignores += 1
+            continue
+        sources[contenu['source']] += esquisses.lignes
+    return total, dict(sources), ignores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profil de référence et rapport de dérive du modèle.")
+    sous = parser.add_subparsers(dest="commande", required=True)
+    ref = sous.add_parser("reference", help="Calcule le profil de référence d'un modèle sur ses données d'entraînement")
+    ref.add_argument("donnees", help="Données d'entraînement (.csv séparateur ';' ou .parquet)")
+    ref.add_argument("modele", help="Modèle (.joblib ou forêt aplatie .npz)")
+    ref.add_argument("sortie", help="Profil .json")
+    rapport = sous.add_parser("rapport", help="Compare les esquisses du dossier partagé au profil de référence")
+    rapport.add_argument("profil", help="Profil de référence .json")
+    rapport.add_argument("--dossier", default=None, help="Dossier des esquisses (défaut : BANK_MARKETING_DERIVE_DIR)")
+    rapport.add_argument("--heures", type=float, default=None, help="Fenêtre d'observation (défaut : tout)")
+    args = parser.parse_args()
+
+    if args.commande == "reference":
+        from bank_marketing.recherche import lire_dataset
+        from bank_marketing.scoring import charger_modele_local
+
+        debut = time.perf_counter()
+        profil = construire_reference(charger_modele_local(args.modele), lire_dataset(args.donnees))
+        profil.sauvegarder(args.sortie)
+        print(f"✅ Profil de référence ({profil.lignes:,} clients, {len(profil.variables)} variables) "
+              f"en {time.perf_counter() - debut:.1f}s -> {args.sortie}")
+        return
+
+    from bank_marketing.config import dossier_derive
+
+    reference = Esquisses.charger(args.profil)
+    depuis = None if args.heures is None else periode_courante(time.time() - args.heures * 3600)
+    courant, sources, ignores = lire_observations(args.dossier or dossier_derive(), reference, depuis)
+    print(f"📡 {courant.lignes:,} clients observés ({', '.join(f'{s} : {n:,}' for s, n in sources.items()) or 'aucun'})"
+          + (f", {ignores} fichier(s) ignoré(s)" if ignores else ""))
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(comparer(reference, courant).to_string(index=False))
+    for message in alertes(reference, courant):
+        print(message.replace("**", ""))
+
+
+if __name__ == "__main__":
+    main()
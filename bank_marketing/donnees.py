@@ -0,0 +1,239 @@
+"""Lecture et publication du dataset nettoyé (snapshot Parquet + repli CSV)."""
+import logging
+import os
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.cache_s3 import est_introuvable
+from bank_marketing.config import COLONNE_CIBLE, COLONNE_SOUSCRIT, COLONNES_CATEGORIELLES, COLONNES_DASHBOARD
+from bank_marketing.telechargement import avancement
+
+journal = logging.getLogger(__name__)
+
+# Lignes par lot pour les lectures en flux (réservoir du mode approché)
+TAILLE_LOT_LECTURE = 500_000
+
+
+def nom_snapshot(nom_du_fichier):
+    # bank_marketing_cleaned_v1.csv -> bank_marketing_cleaned_v1.parquet
+    return os.path.splitext(nom_du_fichier)[0] + ".parquet"
+
+
+def encoder_categories(df):
+    # Les colonnes texte passent en 'category' : Parquet les stocke en dictionnaire
+    df = df.copy()
+    for col in COLONNES_CATEGORIELLES:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+# --- 1. CÔTÉ ETL : PUBLICATION ---
+def ecrire_snapshot(df, destination):
+    """Écrit le snapshot colonnaire (fichier local ou buffer)."""
+    encoder_categories(df).to_parquet(destination, engine='pyarrow', index=False, compression='zstd')
+
+
+def publier_snapshot(df, nom_du_fichier, s3_client, bucket):
+    """Publie le snapshot Parquet à côté du CSV historique (même nom, extension .parquet)."""
+    buffer = BytesIO()
+    ecrire_snapshot(df, buffer)
+    s3_client.put_object(Bucket=bucket, Key=nom_snapshot(nom_du_fichier), Body=buffer.getvalue())
+
+
+def ecrire_csv(df, sortie, entete=True):
+    """CSV ';' via pyarrow (plusieurs fois plus rapide que to_csv sur des colonnes 'category')."""
+    import pyarrow as pa
+    from pyarrow import csv
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Le dictionnaire n'est pas sérialisable en CSV : on écrit les valeurs
+    table = table.cast(pa.schema([
+        pa.field(f.name, pa.string() if pa.types.is_dictionary(f.type) else f.type) for f in table.schema
+    ]))
+    # Les modalités du dataset ne contiennent ni ';' ni guillemets : pas de quotes, comme to_csv
+    # (en-tête écrit à la main, pyarrow le met toujours entre guillemets)
+    if entete:
+        sortie.write((";".join(table.column_names) + "\n").encode('utf-8'))
+    csv.write_csv(table, sortie, csv.WriteOptions(include_header=False, delimiter=';', quoting_style='none'))
+
+
+# --- 2. CÔTÉ DASHBOARD : LECTURE ---
+def lire_snapshot(source, colonnes=COLONNES_DASHBOARD):
+    """Lit uniquement `colonnes` d'un snapshot Parquet, catégories en dictionnaire."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        # BufferReader lit les octets sans recopie
+        source = pa.BufferReader(source)
+
+    # Fichier local (cache S3) : lecture mappée en mémoire
+    fichier = pq.ParquetFile(source, read_dictionary=COLONNES_CATEGORIELLES, memory_map=isinstance(source, str))
+    colonnes_dispo = fichier.schema_arrow.names
+    colonnes = [c for c in colonnes if c in colonnes_dispo] if colonnes else None
+    return fichier.read(columns=colonnes).to_pandas()
+
+
+def _lecteur_csv(source, colonnes):
+    import pyarrow as pa
+    from pyarrow import csv
+
+    return csv.open_csv(
+        source,
+        read_options=csv.ReadOptions(block_size=4 * 1024 * 1024),
+        parse_options=csv.ParseOptions(delimiter=';'),
+        convert_options=csv.ConvertOptions(
+            include_columns=colonnes,
+            include_missing_columns=True,
+            column_types={c: pa.dictionary(pa.int32(), pa.string()) for c in COLONNES_CATEGORIELLES}
+        )
+    )
+
+
+def lire_csv(source, colonnes=COLONNES_DASHBOARD, apres_bloc=None):
+    """Repli CSV, parsé en continu par blocs (pyarrow) : même élagage de colonnes,
+    texte en dictionnaire. `source` peut être un flux S3 en cours de téléchargement ;
+    `apres_bloc()` est appelé après chaque bloc parsé."""
+    import pyarrow as pa
+
+    lecteur = _lecteur_csv(source, colonnes)
+    blocs = []
+    for bloc in lecteur:
+        blocs.append(bloc)
+        if apres_bloc is not None:
+            apres_bloc()
+    table = pa.Table.from_batches(blocs, schema=lecteur.schema)
+    # include_missing_columns crée des colonnes nulles pour les absentes : on les retire
+    absentes = [champ.name for champ in table.schema if pa.types.is_null(champ.type)]
+    df = table.drop_columns(absentes).to_pandas()
+    # Modalités triées (ordre d'apparition sinon) : mêmes axes que le snapshot Parquet
+    for col in df.select_dtypes('category').columns:
+        df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
+
+
+def _snapshot_local(cache, bucket, nom_du_fichier, progression=None):
+    """Copie locale du snapshot Parquet, ou None s'il n'est pas publié."""
+    try:
+        return cache.recuperer(bucket, nom_snapshot(nom_du_fichier), progression)
+    except Exception as e:
+        if not est_introuvable(e):
+            # Snapshot publié mais inaccessible (S3 injoignable...) : signalé, puis repli CSV
+            journal.warning("Snapshot %s inaccessible, repli sur le CSV : %r", nom_snapshot(nom_du_fichier), e,
+                            exc_info=True)
+        return None
+
+
+def compter_lignes(cache, bucket, nom_du_fichier):
+    """Lignes du dataset lues dans le pied du snapshot Parquet (aucune donnée décodée), None sans snapshot."""
+    import pyarrow.parquet as pq
+
+    chemin = _snapshot_local(cache, bucket, nom_du_fichier)
+    return pq.ParquetFile(chemin).metadata.num_rows if chemin is not None else None
+
+
+def lire_par_lots(cache, bucket, nom_du_fichier, colonnes=COLONNES_DASHBOARD, taille_lot=TAILLE_LOT_LECTURE):
+    """DataFrames successifs du dataset, jamais tout en mémoire : snapshot par lots de
+    `taille_lot` lignes, sinon CSV parsé bloc par bloc pendant son téléchargement."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    chemin = _snapshot_local(cache, bucket, nom_du_fichier)
+    if chemin is not None:
+        fichier = pq.ParquetFile(chemin, read_dictionary=COLONNES_CATEGORIELLES, memory_map=True)
+        colonnes = [c for c in colonnes if c in fichier.schema_arrow.names] if colonnes else None
+        for lot in fichier.iter_batches(batch_size=taille_lot, columns=colonnes):
+            yield lot.to_pandas()
+        return
+
+    with cache.ouvrir(bucket, nom_du_fichier) as flux:
+        lecteur = _lecteur_csv(flux, colonnes)
+        absentes = [champ.name for champ in lecteur.schema if pa.types.is_null(champ.type)]
+        for bloc in lecteur:
+            yield pa.Table.from_batches([bloc]).drop_columns(absentes).to_pandas()
+
+
+def charger_dataset(cache, bucket, nom_du_fichier, colonnes=COLONNES_DASHBOARD, progression=None):
+    """Charge le snapshot Parquet s'il existe sur S3, sinon le CSV historique.
+
+    `cache` est un CacheArtefacts : les objets sont lus depuis leur copie locale
+    revalidée par ETag, sans retéléchargement s'ils n'ont pas changé. Le CSV est
+    parsé pendant son téléchargement (GET par plages parallèles).
+    `progression(octets_lus, total)` suit l'avancement.
+    """
+    try:
+        return lire_snapshot(cache.recuperer(bucket, nom_snapshot(nom_du_fichier), progression), colonnes)
+    except ImportError:
+        # pyarrow absent : on garde le chemin CSV
+        pass
+    except Exception as e:
+        if not est_introuvable(e):
+            # Snapshot publié mais illisible (S3 injoignable, fichier corrompu...) : signalé, puis repli CSV
+            journal.warning("Snapshot %s illisible, repli sur le CSV : %r", nom_snapshot(nom_du_fichier), e,
+                            exc_info=True)
+
+    with cache.ouvrir(bucket, nom_du_fichier) as flux:
+        suivi = (lambda: progression(*avancement(flux))) if progression is not None else None
+        return lire_csv(flux, colonnes, apres_bloc=suivi)
+
+
+# --- 3. CÔTÉ DASHBOARD : DATASET PARTAGÉ ---
+def compacter(df):
+    """Types compacts : texte en 'category', entiers réduits au plus petit type signé
+    suffisant (age, day -> int8, campaign -> int8/int16...), cible booléenne précalculée."""
+    df = encoder_categories(df)
+    for col in df.select_dtypes('integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='signed')
+    if COLONNE_CIBLE in df.columns:
+        df[COLONNE_SOUSCRIT] = (df[COLONNE_CIBLE] == 'yes').to_numpy()
+    return df
+
+
+def _lecture_seule(valeurs):
+    valeurs = np.array(valeurs, copy=True)
+    valeurs.flags.writeable = False
+    return valeurs
+
+
+def figer(df):
+    """Copie du DataFrame dont les tableaux NumPy (codes des catégories compris) sont
+    en lecture seule : une écriture en place lève au lieu de modifier les données partagées."""
+    colonnes = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            colonnes[col] = pd.Categorical.from_codes(_lecture_seule(serie.cat.codes), dtype=serie.dtype)
+        elif isinstance(serie.dtype, np.dtype):
+            colonnes[col] = _lecture_seule(serie.to_numpy())
+        else:
+            # Types extension (chaînes Arrow...) : déjà immuables
+            colonnes[col] = serie.array
+    # copy=False : pandas garde les tableaux tels quels (pas de consolidation en blocs recopiés)
+    return pd.DataFrame(colonnes, index=df.index, copy=False)
+
+
+class DatasetPartage:
+    """Dataset compacté et figé, chargé une fois par process et partagé par toutes
+    les sessions (st.cache_resource) : ni copie par rerun, ni copie par session.
+
+    `df` renvoie une vue superficielle : les colonnes ne sont pas recopiées ;
+    ajouter une colonne à la vue ne touche pas le dataset partagé, écrire dans
+    une colonne existante lève (ou recopie cette seule colonne en copy-on-write).
+    """
+
+    def __init__(self, df):
+        self._df = figer(compacter(df))
+
+    @property
+    def df(self):
+        return self._df.copy(deep=False)
+
+    @property
+    def octets(self):
+        return int(self._df.memory_usage(index=True, deep=True).sum())
+
+    def __len__(self):
+        return len(self._df)
@@ -0,0 +1,211 @@
+"""Mode approché du dashboard : échantillon stratifié par réservoir et intervalles de confiance.
+
+Un réservoir (algorithme R) de taille fixe est tenu par strate métier x mois,
+mis à jour lot par lot sans relire l'historique (l'ingestion le publie avec
+chaque version). Le cube d'échantillon a les mêmes dimensions et mesures que le
+cube exact (cube.py), pondérées par strate (N_h / n_h) : les roll-ups, filtres
+et figures du dashboard s'appliquent tels quels.
+
+Les strates sont les cellules de la matrice métier x mois : une cellule dont
+toutes les lignes tiennent dans le réservoir est exacte. Les taux d'un domaine
+(métier, tranche d'âge, sélection de filtres...) sont des estimateurs par
+quotient stratifiés ; leur variance (linéarisation) se calcule à partir des
+comptes par strate gardés dans le cube, donc aussi après filtrage.
+"""
+import numpy as np
+import pandas as pd
+
+from bank_marketing.config import COLONNES_DASHBOARD
+from bank_marketing.cube import MESURES_CUBE, construire_cube
+
+STRATES_ECHANTILLON = ['metier', 'mois']
+
+# Lignes gardées par strate : 144 strates -> au plus ~290 000 lignes, quel que soit l'historique
+TAILLE_PAR_STRATE = 2000
+
+# En dessous, un taux est signalé comme peu fiable (comme le 100 % entrepreneurs / mars)
+LIGNES_MIN_FIABLES = 30
+
+# Quantile de la loi normale pour des intervalles à 95 %
+Z_95 = 1.96
+
+
+def _cle(valeurs):
+    # NaN n'est pas égal à lui-même : None comme clé de dictionnaire
+    return tuple(None if pd.isna(v) else v for v in valeurs)
+
+
+class ReservoirStratifie:
+    """Échantillon aléatoire simple de taille bornée dans chaque strate, alimenté par lots.
+
+    `vus[strate]` compte toutes les lignes reçues (N_h), `reservoirs[strate]`
+    garde au plus `taille_par_strate` d'entre elles (n_h), colonne par colonne.
+    """
+
+    def __init__(self, taille_par_strate=TAILLE_PAR_STRATE, strates=STRATES_ECHANTILLON,
+                 colonnes=COLONNES_DASHBOARD, graine=0):
+        self.taille_par_strate = taille_par_strate
+        self.strates = list(strates)
+        self.colonnes = list(dict.fromkeys(list(strates) + list(colonnes)))
+        self.rng = np.random.default_rng(graine)
+        self.vus = {}
+        self.reservoirs = {}
+
+    @property
+    def lignes_vues(self):
+        return int(sum(self.vus.values()))
+
+    @property
+    def lignes_gardees(self):
+        return int(sum(len(r[self.strates[0]]) for r in self.reservoirs.values()))
+
+    def ajouter(self, lot):
+        """Passe un lot dans les réservoirs (vectorisé par strate, équivalent à l'algorithme R ligne à ligne)."""
+        colonnes = [c for c in self.colonnes if c in lot.columns]
+        if self.reservoirs and colonnes != list(next(iter(self.reservoirs.values()))):
+            raise ValueError("Le lot n'a pas les mêmes colonnes que l'échantillon.")
+
+        # 1. Tirages par strate (positions seulement) ; 2. lecture des seules lignes retenues
+        groupes = lot.groupby(self.strates, observed=True, dropna=False, sort=False).indices
+        tirages = {_cle(s if isinstance(s, tuple) else (s,)): self._tirer(s, p) for s, p in groupes.items()}
+        morceaux = [positions for entrees, _, lignes in tirages.values() for positions in (entrees, lignes)]
+        retenues = np.unique(np.concatenate(morceaux)) if morceaux else np.empty(0, dtype=np.intp)
+        sous_lot = lot.iloc[retenues]
+        # Catégories en objets : les lots successifs n'ont pas forcément les mêmes modalités
+        valeurs = {c: sous_lot[c].to_numpy(dtype=object if isinstance(sous_lot[c].dtype, pd.CategoricalDtype) else None)
+                   for c in colonnes}
+
+        for cle, (entrees, emplacements, lignes) in tirages.items():
+            entrees, lignes = np.searchsorted(retenues, entrees), np.searchsorted(retenues, lignes)
+            reservoir = self.reservoirs.get(cle)
+            if reservoir is None:
+                reservoir = {c: v[entrees] for c, v in valeurs.items()}
+            elif len(entrees):
+                reservoir = {c: np.concatenate([reservoir[c], valeurs[c][entrees]]) for c in reservoir}
+            for c in reservoir:
+                reservoir[c][emplacements] = valeurs[c][lignes]
+            self.reservoirs[cle] = reservoir
+        return self
+
+    def _tirer(self, strate, positions):
+        """(lignes ajoutées au réservoir, emplacements remplacés, lignes qui les remplacent) pour une strate."""
+        cle = _cle(strate if isinstance(strate, tuple) else (strate,))
+        vus = self.vus.get(cle, 0)
+        taille = len(self.reservoirs[cle][self.strates[0]]) if cle in self.reservoirs else 0
+
+        # Tant que le réservoir n'est pas plein, les lignes y entrent toutes
+        entrees = positions[:max(self.taille_par_strate - taille, 0)]
+
+        # Ligne de rang t (0-based dans la strate) : remplace l'emplacement j ~ U[0, t] si j < taille_par_strate
+        reste = positions[len(entrees):]
+        rangs = vus + len(entrees) + np.arange(len(reste))
+        tirages = self.rng.integers(0, rangs + 1)
+        gardes = tirages < self.taille_par_strate
+        emplacements, lignes = tirages[gardes][::-1], reste[gardes][::-1]
+        # Un emplacement tiré plusieurs fois garde la ligne la plus récente, comme en séquentiel
+        emplacements, derniers = np.unique(emplacements, return_index=True)
+
+        self.vus[cle] = vus + len(positions)
+        return entrees, emplacements, lignes[derniers]
+
+    def strates_table(self):
+        """Une ligne par strate : Population (N_h) et Echantillon (n_h)."""
+        lignes = [dict(zip(self.strates, cle), Population=self.vus[cle], Echantillon=len(r[self.strates[0]]))
+                  for cle, r in self.reservoirs.items()]
+        return pd.DataFrame(lignes, columns=self.strates + ['Population', 'Echantillon'])
+
+    def echantillon(self):
+        """Lignes gardées (DataFrame, texte en 'category') avec la taille de leur strate (Population)."""
+        if not self.reservoirs:
+            return pd.DataFrame(columns=self.colonnes)
+        colonnes = list(next(iter(self.reservoirs.values())))
+        df = pd.DataFrame({c: np.concatenate([r[c] for r in self.reservoirs.values()]) for c in colonnes})
+        df['Population'] = np.repeat([self.vus[cle] for cle in self.reservoirs],
+                                     [len(r[self.strates[0]]) for r in self.reservoirs.values()])
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].astype('category')
+        return df
+
+    @classmethod
+    def depuis_echantillon(cls, df, taille_par_strate=TAILLE_PAR_STRATE, strates=STRATES_ECHANTILLON, graine=0):
+        """Reconstruit un réservoir publié (sortie de `echantillon()`) pour continuer à l'alimenter."""
+        reservoir = cls(taille_par_strate, strates, [c for c in df.columns if c != 'Population'], graine)
+        valeurs = {c: df[c].to_numpy(dtype=object if isinstance(df[c].dtype, pd.CategoricalDtype) else None)
+                   for c in reservoir.colonnes}
+        for strate, positions in df.groupby(strates, observed=True, dropna=False, sort=False).indices.items():
+            cle = _cle(strate if isinstance(strate, tuple) else (strate,))
+            reservoir.reservoirs[cle] = {c: v[positions] for c, v in valeurs.items()}
+            reservoir.vus[cle] = int(df['Population'].iat[positions[0]])
+        return reservoir
+
+    def cube(self):
+        """Cube pondéré : mêmes dimensions et mesures que cube.construire_cube (estimations)."""
+        df = self.echantillon()
+        strates = self.strates_table()
+        cube = construire_cube(df.drop(columns='Population'))
+        cube['Lignes'] = cube['Volume']
+        cube['Lignes_conv'] = cube['Conversions']
+        cube = cube.merge(strates, on=self.strates, how='left')
+        poids = cube['Population'] / cube['Echantillon']
+        for mesure in MESURES_CUBE:
+            cube[mesure] = cube[mesure] * poids
+        return cube
+
+
+# --- INTERVALLES DE CONFIANCE ---
+def intervalles(cube, dimensions, strates=STRATES_ECHANTILLON, z=Z_95):
+    """Taux de conversion par `dimensions` (en %) avec bornes de l'intervalle de confiance.
+
+    Sur un cube d'échantillon (colonnes Lignes / Population / Echantillon) :
+    estimateur par quotient stratifié et variance par linéarisation, avec
+    correction de population finie (nulle pour une strate gardée entière).
+    Sur le cube exact, les bornes sont le taux lui-même. `Peu_de_lignes`
+    signale les taux calculés sur moins de LIGNES_MIN_FIABLES lignes.
+    """
+    if 'Lignes' not in cube.columns:
+        exact = cube.groupby(dimensions, observed=True)[['Volume', 'Conversions']].sum().reset_index()
+        exact = exact[exact['Volume'] > 0]
+        taux = exact['Conversions'] / exact['Volume'] * 100
+        return exact[dimensions].assign(
+            Taux_Conversion=taux.round(2), Borne_basse=taux.round(2), Borne_haute=taux.round(2),
+            Lignes=exact['Volume'], Peu_de_lignes=exact['Volume'] < LIGNES_MIN_FIABLES
+        ).reset_index(drop=True)
+
+    # X_h, Y_h : lignes et conversions de l'échantillon dans le domaine, par strate
+    cles = list(dict.fromkeys(list(dimensions) + list(strates)))
+    par_strate = (
+        cube.groupby(cles, observed=True, dropna=False)
+        .agg(X=('Lignes', 'sum'), Y=('Lignes_conv', 'sum'), N=('Population', 'first'), n=('Echantillon', 'first'))
+        .reset_index()
+    )
+    par_strate = par_strate[par_strate['X'] > 0]
+    poids = par_strate['N'] / par_strate['n']
+    domaines = par_strate.assign(Xw=par_strate['X'] * poids, Yw=par_strate['Y'] * poids)
+    totaux = domaines.groupby(dimensions, observed=True, dropna=False)[['Xw', 'Yw', 'X']].sum()
+    totaux['R'] = totaux['Yw'] / totaux['Xw']
+
+    # z_i = (y_i - R x_i) / X par ligne ; x, y valent 0/1 avec y <= x, d'où sommes de z et z² par strate
+    domaines = domaines.join(totaux[['R', 'Xw']].rename(columns={'Xw': 'Xd'}), on=dimensions)
+    R, X, Y, n, N = domaines['R'], domaines['X'], domaines['Y'], domaines['n'], domaines['N']
+    somme_z = (Y - R * X) / domaines['Xd']
+    somme_z2 = (Y * (1 - 2 * R) + R ** 2 * X) / domaines['Xd'] ** 2
+    variance_strate = ((somme_z2 - somme_z ** 2 / n) / (n - 1).clip(lower=1)).clip(lower=0)
+    domaines['V'] = N ** 2 * (1 - n / N) * variance_strate / n
+    totaux['V'] = domaines.groupby(dimensions, observed=True, dropna=False)['V'].sum()
+
+    ecart = z * np.sqrt(totaux['V'])
+    resultat = pd.DataFrame({
+        'Taux_Conversion': (totaux['R'] * 100).round(2),
+        'Borne_basse': ((totaux['R'] - ecart).clip(lower=0) * 100).round(2),
+        'Borne_haute': ((totaux['R'] + ecart).clip(upper=1) * 100).round(2),
+        'Lignes': totaux['X'].astype('int64'),
+        'Peu_de_lignes': totaux['X'] < LIGNES_MIN_FIABLES
+    })
+    return resultat.reset_index()
+
+
+def intervalle_global(cube, strates=STRATES_ECHANTILLON, z=Z_95):
+    """(taux, borne basse, borne haute) en % sur tout le cube."""
+    tout = intervalles(cube.assign(_tout=0), ['_tout'], strates, z).iloc[0]
+    return tout['Taux_Conversion'], tout['Borne_basse'], tout['Borne_haute']
+
@@ -0,0 +1,253 @@
+"""ETL hors mémoire du CSV brut (bank-full) vers le dataset nettoyé partitionné.
+
+Reprend les étapes du notebook 1_processing_eda : suppression des doublons,
+suppression de `contact`, renommage des colonnes, 'other'/'unknown' ->
+'no existant', segment_contact (segmenter_pdays vectorisé) et age_group.
+
+Le fichier est découpé en plages d'octets alignées sur les fins de ligne :
+chaque worker lit, nettoie et écrit sa plage, le processus principal ne fait
+que le dédoublonnage global (ensemble d'empreintes, dans l'ordre du fichier).
+La mémoire par worker est bornée par la taille d'une plage ; seul l'ensemble
+des empreintes grandit (8 octets par ligne distincte).
+
+Usage :
+    python -m bank_marketing.etl data/bank-full.csv sortie/ --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.donnees import ecrire_csv, encoder_categories
+from bank_marketing.features import segmenter_pdays
+
+# Octets de CSV brut par plage (~600k lignes bank-full)
+TAILLE_PLAGE = 64 * 1024 * 1024
+
+# --- 1. RÈGLES DE NETTOYAGE (notebook 1_processing_eda) ---
+RENOMMAGE = {
+    'job': 'metier',
+    'marital': 'statut_matrimonial',
+    'education': 'niveau_etudes',
+    'default': 'defaut_credit',
+    'housing': 'pret_immo',
+    'loan': 'pret_conso',
+    'balance': 'solde_bancaire',
+    'poutcome': 'resultat_precedent',
+    'month': 'mois',
+    'y': 'souscription'
+}
+BINS_AGE = [17, 30, 45, 63, 100]
+LABELS_AGE = ['Jeunes(17-30)', 'Adultes(31-45)', ' Matures(46-63)', 'Seniors(64+)']
+
+# Colonnes d'origine (hors colonnes dérivées) : base de l'empreinte d'une ligne nettoyée
+COLONNES_SOURCE = [
+    'age', 'metier', 'statut_matrimonial', 'niveau_etudes', 'defaut_credit', 'solde_bancaire',
+    'pret_immo', 'pret_conso', 'day', 'mois', 'duration', 'campaign', 'pdays', 'previous',
+    'resultat_precedent', 'souscription'
+]
+COLONNES_NETTOYEES = COLONNES_SOURCE + ['segment_contact', 'age_group']
+
+
+def appliquer_regles(df):
+    """Règles du notebook hors dédoublonnage, toutes vectorisées."""
+    df = df.drop(columns='contact', errors='ignore').rename(columns=RENOMMAGE)
+    df['resultat_precedent'] = df['resultat_precedent'].astype(object).replace(['other', 'unknown'], 'no existant')
+    df['segment_contact'] = segmenter_pdays(df['pdays'])
+    df['age_group'] = pd.cut(df['age'], bins=BINS_AGE, labels=LABELS_AGE)
+    return df[COLONNES_NETTOYEES].reset_index(drop=True)
+
+
+def nettoyer(df):
+    """Nettoyage complet d'un lot en mémoire (brut bank-full ou déjà renommé)."""
+    return appliquer_regles(df.drop_duplicates())
+
+
+def _canoniser(serie):
+    """Numérique -> Int64 (entiers tronqués, NaN -> NA) ; sinon texte (les manquants restent manquants).
+
+    Même empreinte qu'avant pour les lignes sans manquant : Int64 et int64 se hachent à l'identique.
+    """
+    if not pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(str)
+    if pd.api.types.is_float_dtype(serie):
+        serie = np.trunc(serie)
+    return serie.astype('Int64')
+
+
+def empreintes(df, colonnes=COLONNES_SOURCE):
+    """Empreinte uint64 par ligne, indépendante des dtypes (category/objet, int/float), manquants compris."""
+    canonique = pd.DataFrame({col: _canoniser(df[col]) for col in colonnes})
+    return pd.util.hash_pandas_object(canonique, index=False).to_numpy()
+
+
+def premieres_occurrences(hachages):
+    """Masque des lignes dont l'empreinte apparaît pour la première fois dans le tableau."""
+    _, premieres = np.unique(hachages, return_index=True)
+    masque = np.zeros(hachages.size, dtype=bool)
+    masque[premieres] = True
+    return masque
+
+
+class EnsembleEmpreintes:
+    """Ensemble d'empreintes uint64 compact : tableaux triés fusionnés par tailles voisines.
+
+    8 octets par empreinte (contre ~70 pour un set Python) ; une insertion
+    coûte O(log n) amorti, un test d'appartenance une recherche dichotomique
+    par niveau (au plus log2(n) niveaux).
+    """
+
+    def __init__(self):
+        self._niveaux = []
+
+    def __len__(self):
+        return sum(niveau.size for niveau in self._niveaux)
+
+    def contient(self, hachages):
+        present = np.zeros(hachages.size, dtype=bool)
+        for niveau in self._niveaux:
+            position = np.minimum(np.searchsorted(niveau, hachages), niveau.size - 1)
+            present |= niveau[position] == hachages
+        return present
+
+    def ajouter(self, hachages):
+        """Ajoute des empreintes absentes de l'ensemble (et distinctes entre elles)."""
+        if hachages.size == 0:
+            return
+        nouveau = np.sort(hachages)
+        while self._niveaux and self._niveaux[-1].size <= nouveau.size:
+            nouveau = np.concatenate([self._niveaux.pop(), nouveau])
+            nouveau.sort(kind='mergesort')
+        self._niveaux.append(nouveau)
+
+
+# --- 2. DÉCOUPAGE DU FICHIER EN PLAGES ---
+def decouper(chemin, taille_plage=TAILLE_PLAGE):
+    """En-tête + plages (début, fin) d'octets alignées sur les fins de ligne."""
+    taille = os.path.getsize(chemin)
+    with open(chemin, 'rb') as f:
+        entete = f.readline()
+        bornes = [len(entete)]
+        while bornes[-1] < taille:
+            f.seek(min(bornes[-1] + taille_plage, taille))
+            f.readline()
+            bornes.append(min(f.tell(), taille))
+    colonnes = [c.strip().strip('"') for c in entete.decode('utf-8').rstrip('\r\n').split(';')]
+    return colonnes, list(zip(bornes[:-1], bornes[1:]))
+
+
+def lire_plage(chemin, debut, fin, colonnes):
+    import pyarrow as pa
+    from pyarrow import csv
+
+    with open(chemin, 'rb') as f:
+        f.seek(debut)
+        contenu = f.read(fin - debut)
+    table = csv.read_csv(
+        pa.BufferReader(contenu),
+        read_options=csv.ReadOptions(column_names=colonnes, use_threads=False),
+        parse_options=csv.ParseOptions(delimiter=';')
+    )
+    return table.to_pandas()
+
+
+# --- 3. TRAITEMENT PARALLÈLE ---
+def _chemin_partition(dossier, indice, format_fichier):
+    return os.path.join(dossier, f"part-{indice:05d}.{format_fichier}")
+
+
+def _ecrire(df, chemin, format_fichier):
+    if format_fichier == 'parquet':
+        encoder_categories(df).to_parquet(chemin, engine='pyarrow', index=False, compression='zstd')
+    else:
+        with open(chemin, 'wb') as sortie:
+            ecrire_csv(df, sortie)
+
+
+def _lire(chemin, format_fichier):
+    if format_fichier == 'parquet':
+        return pd.read_parquet(chemin)
+    return pd.read_csv(chemin, sep=';')
+
+
+def _traiter_plage(tache):
+    """Worker : lecture, empreintes des lignes brutes, doublons internes, règles, écriture provisoire."""
+    indice, chemin, debut, fin, colonnes, dossier, format_fichier = tache
+    brut = lire_plage(chemin, debut, fin, colonnes)
+    # Comme df.drop_duplicates() du notebook : sur toutes les colonnes brutes (contact compris)
+    hachages = empreintes(brut, colonnes)
+    garder = premieres_occurrences(hachages)
+    propre = appliquer_regles(brut[garder])
+    provisoire = _chemin_partition(dossier, indice, format_fichier) + ".tmp"
+    _ecrire(propre, provisoire, format_fichier)
+    return provisoire, hachages[garder], len(brut)
+
+
+def _finaliser(provisoire, definitif, masque, format_fichier):
+    """Retire les doublons vus dans une plage précédente (rare) et publie la partition."""
+    if not masque.all():
+        _ecrire(_lire(provisoire, format_fichier)[masque].reset_index(drop=True), provisoire, format_fichier)
+    os.replace(provisoire, definitif)
+
+
+def executer(entree, dossier, n_workers=None, taille_plage=TAILLE_PLAGE, format_fichier='parquet'):
+    """Nettoie `entree` en partitions `dossier/part-XXXXX.<format>` + `_manifeste.json`. Renvoie le rapport."""
+    debut = time.perf_counter()
+    n_workers = n_workers or os.cpu_count() or 1
+    os.makedirs(dossier, exist_ok=True)
+    colonnes, plages = decouper(entree, taille_plage)
+    taches = [(i, entree, a, b, colonnes, dossier, format_fichier) for i, (a, b) in enumerate(plages)]
+
+    vues = EnsembleEmpreintes()
+    rapport = {'source': entree, 'lignes_lues': 0, 'doublons': 0, 'lignes_ecrites': 0, 'partitions': []}
+
+    def consommer(indice, resultat):
+        provisoire, hachages, nb_lus = resultat
+        # Dans l'ordre du fichier : la première occurrence d'une ligne est celle gardée
+        masque = ~vues.contient(hachages)
+        vues.ajouter(hachages[masque])
+        definitif = _chemin_partition(dossier, indice, format_fichier)
+        _finaliser(provisoire, definitif, masque, format_fichier)
+        rapport['lignes_lues'] += nb_lus
+        rapport['lignes_ecrites'] += int(masque.sum())
+        rapport['partitions'].append({'fichier': os.path.basename(definitif), 'lignes': int(masque.sum())})
+
+    en_vol = []
+    with ProcessPoolExecutor(n_workers) as pool:
+        # Au plus 2 plages par worker en vol : mémoire bornée quelle que soit la taille du fichier
+        for tache in taches:
+            en_vol.append((tache[0], pool.submit(_traiter_plage, tache)))
+            if len(en_vol) >= 2 * n_workers:
+                indice, futur = en_vol.pop(0)
+                consommer(indice, futur.result())
+        for indice, futur in en_vol:
+            consommer(indice, futur.result())
+
+    rapport['doublons'] = rapport['lignes_lues'] - rapport['lignes_ecrites']
+    rapport['secondes'] = round(time.perf_counter() - debut, 3)
+    with open(os.path.join(dossier, "_manifeste.json"), 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, indent=1, ensure_ascii=False)
+    return rapport
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nettoyage hors mémoire du CSV brut bank-full en partitions.")
+    parser.add_argument("entree", help="CSV brut (séparateur ';', colonnes bank-full)")
+    parser.add_argument("sortie", help="Dossier des partitions nettoyées")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nb de CPU)")
+    parser.add_argument("--plage-mo", type=int, default=TAILLE_PLAGE // (1024 * 1024), help="Mo de CSV par partition")
+    parser.add_argument("--format", choices=['parquet', 'csv'], default='parquet')
+    args = parser.parse_args()
+
+    rapport = executer(args.entree, args.sortie, args.workers, args.plage_mo * 1024 * 1024, args.format)
+    print(f"✅ {rapport['lignes_ecrites']:,} lignes écrites ({rapport['doublons']:,} doublons) en "
+          f"{len(rapport['partitions'])} partitions, {rapport['secondes']:.1f}s "
+          f"({rapport['lignes_lues'] / max(rapport['secondes'], 1e-9):,.0f} lignes/s) -> {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Schéma d'entrée du modèle de propension et encodage one-hot associé."""
+import numpy as np
+import pandas as pd
+
+# Colonnes saisies dans le simulateur (une ligne = un client)
+COLONNES_NUMERIQUES = ['age', 'solde_bancaire', 'day', 'campaign', 'pdays', 'previous']
+
+COLONNES_CATEGORIELLES_MODELE = [
+    'metier', 'statut_matrimonial', 'niveau_etudes', 'defaut_credit',
+    'pret_immo', 'pret_conso', 'mois', 'resultat_precedent', 'segment_contact'
+]
+
+COLONNES_CLIENT = COLONNES_NUMERIQUES + COLONNES_CATEGORIELLES_MODELE
+
+# Colonnes attendues par le modèle, dans l'ordre de l'entraînement
+COLONNES_MODELE = [
+    'age', 'solde_bancaire', 'day', 'campaign', 'pdays', 'previous',
+    'defaut_credit_yes', 'pret_immo_yes', 'pret_conso_yes',
+    'metier_blue-collar', 'metier_entrepreneur', 'metier_housemaid', 'metier_management', 'metier_retired',
+    'metier_self-employed', 'metier_services', 'metier_student', 'metier_technician', 'metier_unemployed', 'metier_unknown',
+    'statut_matrimonial_married', 'statut_matrimonial_single',
+    'niveau_etudes_secondary', 'niveau_etudes_tertiary', 'niveau_etudes_unknown',
+    'mois_aug', 'mois_dec', 'mois_feb', 'mois_jan', 'mois_jul', 'mois_jun', 'mois_mar', 'mois_may', 'mois_nov', 'mois_oct', 'mois_sep',
+    'resultat_precedent_no existant', 'resultat_precedent_success',
+    'segment_contact_Intermediaire (31-90j)', 'segment_contact_Jamais contacte', 'segment_contact_Recent (0-30j)'
+]
+
+
+def segmenter_pdays(pdays):
+    """Version vectorisée de segmenter_pdays (notebook 1_processing_eda)."""
+    pdays = np.asarray(pdays)
+    return np.select(
+        [pdays == -1, pdays <= 30, pdays <= 90],
+        ["Jamais contacte", "Recent (0-30j)", "Intermediaire (31-90j)"],
+        default="Ancien (>90j)"
+    )
+
+
+def preparer_clients(df):
+    """Complète les colonnes dérivables (segment_contact) et ne garde que le schéma client."""
+    if 'segment_contact' not in df.columns and 'pdays' in df.columns:
+        df = df.assign(segment_contact=segmenter_pdays(df['pdays']))
+    if 'pdays' not in df.columns:
+        # Le simulateur ne saisit pas pdays : valeur "jamais contacté"
+        df = df.assign(pdays=-1)
+    return df[COLONNES_CLIENT]
+
+
+def attacher_schema(model, colonnes_modele=COLONNES_MODELE,
+                    colonnes_numeriques=COLONNES_NUMERIQUES,
+                    colonnes_categorielles=COLONNES_CATEGORIELLES_MODELE):
+    """Enregistre le schéma des features sur le modèle (sauvegardé avec lui par joblib.dump)."""
+    model.schema_features_ = {
+        'colonnes_modele': list(colonnes_modele),
+        'colonnes_numeriques': list(colonnes_numeriques),
+        'colonnes_categorielles': list(colonnes_categorielles)
+    }
+    return model
+
+
+def schema_du_modele(model):
+    """Schéma stocké avec l'artefact, sinon déduit de feature_names_in_, sinon schéma historique."""
+    schema = getattr(model, 'schema_features_', None)
+    if schema:
+        return schema
+    noms = getattr(model, 'feature_names_in_', None)
+    return {
+        'colonnes_modele': list(noms) if noms is not None else list(COLONNES_MODELE),
+        'colonnes_numeriques': list(COLONNES_NUMERIQUES),
+        'colonnes_categorielles': list(COLONNES_CATEGORIELLES_MODELE)
+    }
+
+
+class EncodeurCompile:
+    """Encodeur one-hot précompilé : (colonne, valeur) -> indice de feature.
+
+    Reproduit get_dummies + alignement sur les colonnes du modèle sans construire
+    de DataFrame : les modalités de référence (drop='first') et les valeurs
+    inconnues n'ont pas d'indice et laissent la ligne à 0.
+    """
+
+    def __init__(self, colonnes_modele, colonnes_numeriques, colonnes_categorielles):
+        self.colonnes_modele = list(colonnes_modele)
+        position = {nom: i for i, nom in enumerate(self.colonnes_modele)}
+        self.numeriques = [(col, position[col]) for col in colonnes_numeriques if col in position]
+        self.categorielles = list(colonnes_categorielles)
+
+        # Préfixes les plus longs d'abord pour éviter les collisions (ex. pret_ / pret_immo_)
+        self.index = {}
+        self.modalites = {col: [] for col in self.categorielles}
+        for nom, i in position.items():
+            for col in sorted(self.categorielles, key=len, reverse=True):
+                if nom.startswith(col + '_'):
+                    valeur = nom[len(col) + 1:]
+                    self.index[(col, valeur)] = i
+                    self.modalites[col].append(valeur)
+                    break
+
+    @classmethod
+    def depuis_modele(cls, model):
+        schema = schema_du_modele(model)
+        return cls(schema['colonnes_modele'], schema['colonnes_numeriques'], schema['colonnes_categorielles'])
+
+    @property
+    def nb_features(self):
+        return len(self.colonnes_modele)
+
+    def encoder_client(self, client, out=None):
+        """Encode un client (dict) dans une ligne (1, nb_features).
+
+        `out` : ligne préallouée par l'appelant (une par thread ou par lot) ;
+        sans `out`, une ligne neuve est allouée. L'encodeur est partagé entre
+        sessions et threads : il ne garde aucun tampon.
+        """
+        ligne = np.zeros((1, self.nb_features), dtype=np.float64) if out is None else out
+        ligne.fill(0.0)
+        for col, i in self.numeriques:
+            ligne[0, i] = client.get(col, -1 if col == 'pdays' else 0)
+        for col in self.categorielles:
+            i = self.index.get((col, client.get(col)))
+            if i is not None:
+                ligne[0, i] = 1.0
+        return ligne
+
+    def affecter(self, matrice, col, valeurs):
+        """Écrase la colonne client `col` (numérique ou one-hot) dans une matrice déjà encodée."""
+        position = dict(self.numeriques)
+        if col in position:
+            matrice[:, position[col]] = valeurs
+            return matrice
+        cibles = [self.index[(col, v)] for v in self.modalites[col]]
+        matrice[:, cibles] = 0.0
+        for ligne, valeur in enumerate(valeurs):
+            i = self.index.get((col, valeur))
+            if i is not None:
+                matrice[ligne, i] = 1.0
+        return matrice
+
+    def encoder_lot(self, df):
+        """Encode un DataFrame de clients en matrice (n, nb_features)."""
+        df = preparer_clients(df)
+        matrice = np.zeros((len(df), self.nb_features), dtype=np.float64)
+        lignes = np.arange(len(df))
+        for col, i in self.numeriques:
+            matrice[:, i] = df[col].to_numpy(dtype=np.float64)
+        for col in self.categorielles:
+            modalites = self.modalites[col]
+            if not modalites:
+                continue
+            # Codes -1 = valeur de référence, inconnue ou manquante -> aucune colonne activée
+            codes = pd.Categorical(df[col], categories=modalites).codes
+            cibles = np.array([self.index[(col, v)] for v in modalites])
+            presents = codes >= 0
+            matrice[lignes[presents], cibles[codes[presents]]] = 1.0
+        return matrice
@@ -0,0 +1,51 @@
+"""Figures Plotly mémorisées entre reruns et sessions du dashboard.
+
+Une figure est rangée sous (graphique, option, version des données) : revenir
+sur un mois ou un critère déjà affiché ne reconstruit rien. Une nouvelle version
+publiée par l'ingestion change la clé ; les figures de l'ancienne version ne
+sont plus demandées et sortent du cache par LRU.
+"""
+import threading
+from collections import OrderedDict
+
+# Zooms du dashboard : 3 critères + 12 mois par version, avec de la marge pour une version précédente
+TAILLE_CACHE_FIGURES = 64
+
+
+class CacheFigures:
+    """Cache LRU borné de figures, partagé par les sessions (thread-safe)."""
+
+    def __init__(self, taille_max=TAILLE_CACHE_FIGURES):
+        self.taille_max = taille_max
+        self._cache = OrderedDict()
+        self._verrou = threading.Lock()
+        self.trouvees = 0
+        self.construites = 0
+
+    def obtenir(self, graphique, option, version, construire):
+        """Figure mémorisée, sinon `construire()` (hors verrou) puis mise en cache.
+
+        Les figures sont partagées : ne pas les modifier après coup.
+        """
+        cle = (graphique, option, version)
+        with self._verrou:
+            if cle in self._cache:
+                self._cache.move_to_end(cle)
+                self.trouvees += 1
+                return self._cache[cle]
+
+        figure = construire()
+        with self._verrou:
+            self.construites += 1
+            self._cache[cle] = figure
+            self._cache.move_to_end(cle)
+            while len(self._cache) > self.taille_max:
+                self._cache.popitem(last=False)
+        return figure
+
+    def vider(self):
+        with self._verrou:
+            self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,115 @@
+"""Filtres croisés du dashboard : un bitmap compressé par modalité, construit au chargement.
+
+Les bitmaps portent sur les cellules du cube (une ligne par combinaison de
+segments), pas sur les lignes brutes : une sélection se résout par des OR
+(modalités d'une même dimension) et des AND (entre dimensions) sur quelques
+Ko de bits, puis chaque KPI / graphique est un roll-up des seules cellules
+retenues. Le coût d'un clic dépend du nombre de cellules, quel que soit le
+nombre d'appels agrégés (des dizaines de millions de lignes brutes donnent
+au plus quelques centaines de milliers de cellules).
+
+Bitmaps compressés par np.packbits (1 bit par cellule, 8x moins qu'un masque
+booléen) : assez pour des cubes de cette taille, sans dépendance.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Dimensions proposées en filtre dans la sidebar (celles absentes du cube sont ignorées)
+DIMENSIONS_FILTRABLES = ['age_group', 'niveau_etudes', 'segment_contact', 'statut_matrimonial', 'metier', 'mois']
+
+LIBELLES_FILTRES = {
+    'age_group': "Tranche d'âge",
+    'niveau_etudes': "Niveau d'études",
+    'segment_contact': "Segment contact",
+    'statut_matrimonial': "Statut matrimonial",
+    'metier': "Métier",
+    'mois': "Mois de l'appel"
+}
+
+# Sélections résolues gardées en mémoire (LRU)
+TAILLE_CACHE_SELECTIONS = 32
+
+
+class IndexBitmap:
+    """Bitmaps par (dimension, modalité) sur les lignes d'un cube figé.
+
+    Une sélection est un dict {dimension: [modalités]} ; une dimension absente
+    ou une liste vide ne filtre pas.
+    """
+
+    def __init__(self, cube, dimensions=DIMENSIONS_FILTRABLES, taille_cache=TAILLE_CACHE_SELECTIONS):
+        self.nb_lignes = len(cube)
+        self.dimensions = [d for d in dimensions if d in cube.columns]
+        self.modalites = {}
+        self._rangs = {}
+        self._bitmaps = {}
+        positions = np.arange(self.nb_lignes)
+        for dim in self.dimensions:
+            codes, modalites = pd.factorize(cube[dim], sort=True)
+            bits = np.zeros((len(modalites), self.nb_lignes), dtype=bool)
+            # code -1 : cellule sans modalité (NaN), retenue seulement si la dimension ne filtre pas
+            connus = codes >= 0
+            bits[codes[connus], positions[connus]] = True
+            self.modalites[dim] = [str(m) for m in modalites]
+            self._rangs[dim] = {m: i for i, m in enumerate(self.modalites[dim])}
+            self._bitmaps[dim] = np.packbits(bits, axis=1)
+
+        self.taille_cache = taille_cache
+        self._cache = OrderedDict()
+        self._verrou = threading.Lock()
+
+    @property
+    def octets(self):
+        return sum(b.nbytes for b in self._bitmaps.values())
+
+    @staticmethod
+    def cle(selection):
+        """Forme canonique (hashable) d'une sélection ; () si rien n'est filtré."""
+        return tuple(sorted((dim, tuple(sorted(map(str, valeurs)))) for dim, valeurs in selection.items() if valeurs))
+
+    def bits(self, selection):
+        """Bitmap compressé des cellules retenues, ou None si la sélection ne filtre rien."""
+        resultat = None
+        for dim, valeurs in self.cle(selection):
+            if dim not in self._bitmaps:
+                raise KeyError(f"Dimension non indexée : {dim}")
+            rangs = [self._rangs[dim][v] for v in valeurs if v in self._rangs[dim]]
+            if rangs:
+                union = np.bitwise_or.reduce(self._bitmaps[dim][rangs], axis=0)
+            else:
+                union = np.zeros(self._bitmaps[dim].shape[1], dtype=np.uint8)
+            resultat = union if resultat is None else np.bitwise_and(resultat, union, out=resultat)
+        return resultat
+
+    def masque(self, selection):
+        """Masque booléen des cellules retenues (None : tout le cube)."""
+        bits = self.bits(selection)
+        if bits is None:
+            return None
+        return np.unpackbits(bits, count=self.nb_lignes).astype(bool)
+
+    def positions(self, selection):
+        """Indices des cellules retenues (mémorisés par sélection), None si rien n'est filtré."""
+        cle = self.cle(selection)
+        if not cle:
+            return None
+        with self._verrou:
+            if cle in self._cache:
+                self._cache.move_to_end(cle)
+                return self._cache[cle]
+        positions = np.flatnonzero(self.masque(selection))
+        with self._verrou:
+            self._cache[cle] = positions
+            while len(self._cache) > self.taille_cache:
+                self._cache.popitem(last=False)
+        return positions
+
+    def filtrer(self, cube, selection):
+        """Sous-cube de la sélection (le cube indexé, mêmes lignes dans le même ordre)."""
+        if len(cube) != self.nb_lignes:
+            raise ValueError("Le cube ne correspond pas à l'index (nombre de lignes différent).")
+        positions = self.positions(selection)
+        return cube if positions is None else cube.iloc[positions]
@@ -0,0 +1,203 @@
+"""Forêt aléatoire aplatie en tableaux NumPy contigus + moteur d'inférence vectorisé.
+
+L'export lit le RandomForestClassifier scikit-learn une seule fois ; le service
+n'a ensuite besoin que de NumPy (pas d'import sklearn au moment du scoring).
+
+Usage :
+    python -m bank_marketing.foret model_bank_marketing_v1.joblib model_bank_marketing_v1_foret.npz
+"""
+import argparse
+import json
+import struct
+import zipfile
+
+import numpy as np
+
+# Lignes traitées par bloc : n_lignes x n_arbres indices de nœuds en mémoire (tient en cache)
+TAILLE_BLOC = 1024
+
+
+def aplatir_foret(model):
+    """Concatène les arbres du modèle en tableaux (feature, seuil, enfants, valeur feuille)."""
+    features, seuils, gauches, droites, valeurs, racines = [], [], [], [], [], []
+    decalage = 0
+    profondeur = 0
+    positif = list(model.classes_).index(1) if 1 in list(model.classes_) else len(model.classes_) - 1
+
+    for estimateur in model.estimators_:
+        arbre = estimateur.tree_
+        n = arbre.node_count
+        feuille = arbre.children_left == -1
+        ids = np.arange(n)
+
+        # Une feuille pointe sur elle-même : le parcours peut continuer sans masque
+        features.append(np.where(feuille, 0, arbre.feature))
+        seuils.append(np.where(feuille, np.inf, arbre.threshold))
+        gauches.append(np.where(feuille, ids, arbre.children_left) + decalage)
+        droites.append(np.where(feuille, ids, arbre.children_right) + decalage)
+
+        effectifs = arbre.value[:, 0, :]
+        valeurs.append(effectifs[:, positif] / effectifs.sum(axis=1))
+
+        racines.append(decalage)
+        profondeur = max(profondeur, arbre.max_depth)
+        decalage += n
+
+    return {
+        'feature': np.concatenate(features).astype(np.int32),
+        'seuil': np.concatenate(seuils).astype(np.float64),
+        'gauche': np.concatenate(gauches).astype(np.int32),
+        'droite': np.concatenate(droites).astype(np.int32),
+        'valeur': np.concatenate(valeurs).astype(np.float64),
+        'racines': np.asarray(racines, dtype=np.int32),
+        'profondeur': np.asarray(profondeur, dtype=np.int32)
+    }
+
+
+class ForetAplatie:
+    """Moteur d'inférence : parcourt tous les arbres pour un bloc de lignes à la fois."""
+
+    def __init__(self, tableaux, schema=None):
+        self.feature = tableaux['feature']
+        self.seuil = tableaux['seuil']
+        self.gauche = tableaux['gauche']
+        self.droite = tableaux['droite']
+        self.valeur = tableaux['valeur']
+        self.racines = tableaux['racines']
+        self.profondeur = int(tableaux['profondeur'])
+        # Enfants entrelacés [gauche, droite] : un seul gather par niveau (stockés depuis
+        # la version mappable, recalculés pour les anciennes archives)
+        self.enfants = tableaux.get('enfants')
+        if self.enfants is None:
+            self.enfants = np.empty(2 * self.gauche.size, dtype=np.int32)
+            self.enfants[0::2] = self.gauche
+            self.enfants[1::2] = self.droite
+        # Même attribut que sur le modèle sklearn : lu par EncodeurCompile.depuis_modele
+        self.schema_features_ = schema
+        self.classes_ = np.array([0, 1])
+
+    @classmethod
+    def depuis_modele(cls, model):
+        return cls(aplatir_foret(model), getattr(model, 'schema_features_', None) or _schema_sklearn(model))
+
+    # --- PERSISTANCE ---
+    def sauvegarder(self, chemin):
+        # np.savez n'est pas compressé : chaque tableau reste mappable en mémoire dans l'archive
+        np.savez(
+            chemin,
+            feature=self.feature, seuil=self.seuil, gauche=self.gauche, droite=self.droite,
+            valeur=self.valeur, racines=self.racines, profondeur=np.asarray(self.profondeur),
+            enfants=self.enfants, schema=np.asarray(json.dumps(self.schema_features_ or {}))
+        )
+
+    @classmethod
+    def charger(cls, source, mmap=True):
+        """Charge une forêt .npz. Depuis un chemin local, les tableaux sont mappés en
+        mémoire (lecture seule) : les processus d'un même hôte partagent les pages
+        via le cache du système au lieu d'en garder chacun une copie."""
+        tableaux = None
+        if mmap and isinstance(source, str):
+            try:
+                tableaux = mapper_npz(source)
+            except ValueError:
+                # Archive compressée : repli sur une lecture en mémoire
+                pass
+        if tableaux is None:
+            with np.load(source, allow_pickle=False) as archive:
+                tableaux = {nom: archive[nom] for nom in archive.files}
+        schema = json.loads(str(tableaux.pop('schema'))) or None
+        return cls(tableaux, schema)
+
+    # --- INFÉRENCE ---
+    def _proba_bloc(self, X):
+        # sklearn compare en float32 : même arrondi pour des décisions identiques
+        X = np.ascontiguousarray(X, dtype=np.float32).astype(np.float64)
+        n, nb_features = X.shape
+        valeurs_x = X.ravel()
+        debut_ligne = (np.arange(n, dtype=np.int64) * nb_features)[:, None]
+        noeuds = np.broadcast_to(self.racines, (n, self.racines.size))
+        for _ in range(self.profondeur):
+            x = np.take(valeurs_x, debut_ligne + np.take(self.feature, noeuds))
+            a_droite = x > np.take(self.seuil, noeuds)
+            noeuds = np.take(self.enfants, 2 * noeuds + a_droite)
+        return np.take(self.valeur, noeuds).mean(axis=1)
+
+    def predict_proba(self, X):
+        """Même sortie que RandomForestClassifier.predict_proba : colonnes [non, oui]."""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[None, :]
+        oui = np.empty(X.shape[0], dtype=np.float64)
+        for debut in range(0, X.shape[0], TAILLE_BLOC):
+            oui[debut:debut + TAILLE_BLOC] = self._proba_bloc(X[debut:debut + TAILLE_BLOC])
+        return np.column_stack([1.0 - oui, oui])
+
+
+def mapper_npz(chemin):
+    """{nom: tableau} d'une archive .npz non compressée, chaque tableau en np.memmap
+    sur sa plage d'octets dans le fichier (les scalaires 0-d sont lus normalement)."""
+    tableaux = {}
+    with zipfile.ZipFile(chemin) as archive, open(chemin, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} est compressé : mappage impossible")
+            # En-tête local : 30 octets fixes + nom + champ extra (longueurs aux octets 26-29)
+            f.seek(info.header_offset)
+            longueur_nom, longueur_extra = struct.unpack('<HH', f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + longueur_nom + longueur_extra)
+            version = np.lib.format.read_magic(f)
+            lire_entete = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            forme, fortran, dtype = lire_entete(f)
+            nom = info.filename[:-len('.npy')] if info.filename.endswith('.npy') else info.filename
+            if dtype.hasobject:
+                raise ValueError(f"{nom} contient des objets Python : mappage impossible")
+            if forme == ():
+                tableaux[nom] = np.frombuffer(f.read(dtype.itemsize), dtype=dtype).reshape(())
+            else:
+                # Vue ndarray simple sur le memmap (garde le mappage ouvert, sans la sous-classe)
+                tableaux[nom] = np.asarray(np.memmap(chemin, dtype=dtype, mode='r', offset=f.tell(),
+                                                     shape=forme, order='F' if fortran else 'C'))
+    return tableaux
+
+
+def _schema_sklearn(model):
+    from bank_marketing.features import schema_du_modele
+
+    return schema_du_modele(model)
+
+
+def exporter_foret(chemin_modele, chemin_sortie, tolerance=1e-9, n_controle=2000):
+    """Aplatit un modèle .joblib et vérifie l'écart de probabilité sur des lignes synthétiques."""
+    import joblib
+
+    from bank_marketing.scoring import predire_proba
+
+    model = joblib.load(chemin_modele)
+    foret = ForetAplatie.depuis_modele(model)
+
+    # Contrôle : valeurs tirées autour des seuils de la forêt
+    rng = np.random.default_rng(0)
+    X = rng.choice(foret.seuil[np.isfinite(foret.seuil)], size=(n_controle, model.n_features_in_))
+    X += rng.normal(scale=0.5, size=X.shape)
+    ecart = np.abs(predire_proba(model, X) - foret.predict_proba(X)[:, 1]).max()
+    if ecart > tolerance:
+        raise ValueError(f"Forêt aplatie non conforme : écart max {ecart:.2e} > {tolerance:.0e}")
+
+    foret.sauvegarder(chemin_sortie)
+    return foret, ecart
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export d'un RandomForest .joblib en forêt aplatie (.npz).")
+    parser.add_argument("modele", help="Chemin du modèle .joblib")
+    parser.add_argument("sortie", help="Chemin de la forêt aplatie .npz")
+    args = parser.parse_args()
+
+    foret, ecart = exporter_foret(args.modele, args.sortie)
+    print(f"✅ {foret.racines.size} arbres / {foret.feature.size} nœuds exportés -> {args.sortie} "
+          f"(écart max vs sklearn : {ecart:.1e})")
+
+
+if __name__ == "__main__":
+    main()
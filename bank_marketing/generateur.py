@@ -0,0 +1,253 @@
+"""Générateur de données synthétiques fidèles au schéma nettoyé, pour les tests de charge.
+
+Les marges reprennent celles de bank-full (métiers, mois, âge, soldes, durées,
+campagnes, pdays...) et la souscription suit un modèle logistique qui conserve
+les effets visibles dans le dashboard : pic de volume en mai avec le pire taux,
+chute de la conversion après 3 appels, motifs métier x mois (entrepreneurs en
+mars, "unknown" en avril, étudiants et retraités à la rentrée / en fin d'année).
+
+Génération par chunks indépendants (une graine dérivée par chunk : résultat
+identique quel que soit le nombre de processus), un fichier de partition par
+chunk, mémoire bornée par la taille d'un chunk.
+
+Usage :
+    python -m bank_marketing.generateur sortie/ 100000000 --format parquet --workers 8
+    python -m bank_marketing.generateur sortie/ 500000 --colonnes brut   # schéma bank-full (ETL)
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.donnees import ecrire_csv
+from bank_marketing.etl import BINS_AGE, COLONNES_NETTOYEES, LABELS_AGE, RENOMMAGE
+from bank_marketing.features import segmenter_pdays
+
+TAILLE_CHUNK = 1_000_000
+
+# --- 1. PROFIL (marges observées sur bank-full) ---
+METIERS = {
+    'blue-collar': 0.215, 'management': 0.209, 'technician': 0.168, 'admin.': 0.114,
+    'services': 0.092, 'retired': 0.050, 'self-employed': 0.035, 'entrepreneur': 0.033,
+    'unemployed': 0.029, 'housemaid': 0.027, 'student': 0.021, 'unknown': 0.007
+}
+STATUTS = {'married': 0.602, 'single': 0.283, 'divorced': 0.115}
+ETUDES = {'secondary': 0.513, 'tertiary': 0.294, 'primary': 0.152, 'unknown': 0.041}
+# Mai concentre près d'un tiers des appels
+MOIS = {
+    'jan': 0.031, 'feb': 0.059, 'mar': 0.011, 'apr': 0.065, 'may': 0.304, 'jun': 0.118,
+    'jul': 0.153, 'aug': 0.138, 'sep': 0.013, 'oct': 0.016, 'nov': 0.088, 'dec': 0.004
+}
+CONTACTS = {'cellular': 0.648, 'unknown': 0.288, 'telephone': 0.064}
+# Résultat précédent quand le client a déjà été contacté (sinon 'unknown')
+RESULTATS_PRECEDENTS = {'failure': 0.59, 'other': 0.23, 'success': 0.18}
+PART_JAMAIS_CONTACTES = 0.817
+
+# --- 2. MODÈLE DE SOUSCRIPTION (log-odds) ---
+# Constante calibrée pour ~11.7 % de 'yes' au global
+CONSTANTE = -1.95
+EFFET_MOIS = {
+    'jan': -0.1, 'feb': 0.45, 'mar': 2.2, 'apr': 0.65, 'may': -0.65, 'jun': -0.05,
+    'jul': -0.2, 'aug': -0.05, 'sep': 1.9, 'oct': 1.8, 'nov': -0.05, 'dec': 1.9
+}
+EFFET_METIER = {
+    'student': 0.9, 'retired': 0.75, 'unemployed': 0.3, 'management': 0.15, 'admin.': 0.05,
+    'self-employed': 0.0, 'unknown': 0.0, 'technician': -0.05, 'services': -0.25,
+    'housemaid': -0.25, 'entrepreneur': -0.35, 'blue-collar': -0.45
+}
+EFFET_METIER_MOIS = {
+    ('entrepreneur', 'mar'): 3.0, ('unknown', 'apr'): 3.0,
+    ('student', 'mar'): 0.8, ('student', 'sep'): 0.8,
+    ('retired', 'oct'): 0.8, ('retired', 'dec'): 0.8,
+    ('blue-collar', 'may'): -0.4
+}
+EFFET_RESULTAT_PRECEDENT = {'failure': 0.1, 'other': 0.4, 'success': 3.0}
+
+
+def effet_campagne(campaign):
+    """Légère baisse jusqu'à 3 appels, chute nette au-delà (plafonnée)."""
+    campaign = np.asarray(campaign)
+    return -0.12 * (np.minimum(campaign, 3) - 1) - 0.35 * np.minimum(np.maximum(campaign - 3, 0), 6)
+
+
+def _codes(rng, loi, n):
+    # Tirage d'indices (int8) : bien plus rapide que choice() sur des chaînes
+    probas = np.array(list(loi.values()))
+    return np.searchsorted(np.cumsum(probas / probas.sum()), rng.random(n), side='right').astype(np.int8)
+
+
+def _categorie(modalites, codes):
+    """Colonne 'category' construite depuis les codes, modalités triées comme le snapshot."""
+    modalites = list(modalites)
+    ordre = np.argsort(modalites)
+    rang = np.empty(len(modalites), dtype=np.int8)
+    rang[ordre] = np.arange(len(modalites))
+    return pd.Categorical.from_codes(rang[codes], [modalites[k] for k in ordre])
+
+
+def _oui_non(masque):
+    return pd.Categorical.from_codes(masque.astype(np.int8), ['no', 'yes'])
+
+
+def _table_effets(loi, effets):
+    return np.array([effets.get(valeur, 0.0) for valeur in loi])
+
+
+def _table_interactions():
+    table = np.zeros((len(METIERS), len(MOIS)))
+    for (metier, mois), effet in EFFET_METIER_MOIS.items():
+        table[list(METIERS).index(metier), list(MOIS).index(mois)] = effet
+    return table
+
+
+# --- 3. GÉNÉRATION ---
+def generer_lot(n, rng, colonnes='nettoye', taux_doublons=0.0):
+    """n lignes au schéma nettoyé (`colonnes='nettoye'`) ou brut bank-full (`'brut'`)."""
+    code_metier = _codes(rng, METIERS, n)
+    code_mois = _codes(rng, MOIS, n)
+
+    age = rng.normal(40, 9.5, n)
+    age = np.where(code_metier == list(METIERS).index('retired'), rng.normal(62, 8, n), age)
+    age = np.where(code_metier == list(METIERS).index('student'), rng.normal(26, 4, n), age)
+    age = np.clip(np.rint(age), 18, 95).astype(np.int64)
+
+    jamais = rng.random(n) < PART_JAMAIS_CONTACTES
+    pdays = np.where(
+        rng.random(n) < 0.7,
+        np.clip(rng.normal(180, 80, n), 1, 871),
+        rng.integers(1, 872, n)
+    ).astype(np.int64)
+    pdays = np.where(jamais, -1, pdays)
+    previous = np.where(jamais, 0, np.minimum(rng.geometric(0.45, n), 275))
+    code_resultat = _codes(rng, RESULTATS_PRECEDENTS, n)
+
+    campaign = np.minimum(rng.geometric(0.39, n), 63)
+    duration = np.clip(np.rint(rng.lognormal(5.2, 0.75, n)), 0, 4918).astype(np.int64)
+    immo = rng.random(n) < 0.556
+    conso = rng.random(n) < 0.16
+
+    log_odds = (
+        CONSTANTE
+        + _table_effets(MOIS, EFFET_MOIS)[code_mois]
+        + _table_effets(METIERS, EFFET_METIER)[code_metier]
+        + _table_interactions()[code_metier, code_mois]
+        + np.where(jamais, 0.0, _table_effets(RESULTATS_PRECEDENTS, EFFET_RESULTAT_PRECEDENT)[code_resultat])
+        + effet_campagne(campaign)
+        + 0.9 * (np.log1p(duration) - 5.2)
+        + np.where((age < 25) | (age > 60), 0.6, 0.0)
+        - 0.5 * immo - 0.3 * conso
+    )
+    oui = rng.random(n) < 1 / (1 + np.exp(-log_odds))
+
+    # Jamais contacté : 'unknown' (brut) ; 'other' et 'unknown' -> 'no existant' (nettoyé)
+    if colonnes == 'brut':
+        resultat = _categorie(list(RESULTATS_PRECEDENTS) + ['unknown'],
+                              np.where(jamais, len(RESULTATS_PRECEDENTS), code_resultat))
+    else:
+        modalites = ['failure', 'no existant', 'success']
+        nettoye = np.array([modalites.index(v) if v in modalites else 1 for v in RESULTATS_PRECEDENTS])
+        resultat = _categorie(modalites, np.where(jamais, 1, nettoye[code_resultat]))
+
+    df = pd.DataFrame({
+        'age': age,
+        'metier': _categorie(METIERS, code_metier),
+        'statut_matrimonial': _categorie(STATUTS, _codes(rng, STATUTS, n)),
+        'niveau_etudes': _categorie(ETUDES, _codes(rng, ETUDES, n)),
+        'defaut_credit': _oui_non(rng.random(n) < 0.018),
+        'solde_bancaire': np.clip(np.rint(rng.lognormal(6.5, 1.4, n)) - 300, -8019, 102127).astype(np.int64),
+        'pret_immo': _oui_non(immo),
+        'pret_conso': _oui_non(conso),
+        'day': rng.integers(1, 32, n),
+        'mois': _categorie(MOIS, code_mois),
+        'duration': duration,
+        'campaign': campaign,
+        'pdays': pdays,
+        'previous': previous,
+        'resultat_precedent': resultat,
+        'souscription': _oui_non(oui)
+    })
+
+    if colonnes == 'brut':
+        df.insert(df.columns.get_loc('day'), 'contact', _categorie(CONTACTS, _codes(rng, CONTACTS, n)))
+        df = df.rename(columns={v: k for k, v in RENOMMAGE.items()})
+    else:
+        df['segment_contact'] = pd.Categorical(segmenter_pdays(pdays))
+        df['age_group'] = pd.cut(df['age'], bins=BINS_AGE, labels=LABELS_AGE)
+        df = df[COLONNES_NETTOYEES]
+
+    if taux_doublons > 0:
+        # Copies exactes de lignes du même chunk (tests de dédoublonnage)
+        source = np.arange(n)
+        cibles = np.flatnonzero(rng.random(n) < taux_doublons)
+        source[cibles] = rng.integers(0, n, cibles.size)
+        df = df.iloc[source].reset_index(drop=True)
+    return df
+
+
+def graines(seed, n_chunks):
+    """Une graine indépendante par chunk, stable quel que soit le découpage en processus."""
+    return np.random.SeedSequence(seed).spawn(n_chunks)
+
+
+def _ecrire_partition(tache):
+    indice, n, graine, dossier, format_fichier, colonnes, taux_doublons = tache
+    df = generer_lot(n, np.random.default_rng(graine), colonnes, taux_doublons)
+    chemin = os.path.join(dossier, f"part-{indice:05d}.{format_fichier}")
+    if format_fichier == 'parquet':
+        df.to_parquet(chemin, engine='pyarrow', index=False, compression='zstd')
+    else:
+        with open(chemin, 'wb') as sortie:
+            ecrire_csv(df, sortie)
+    return chemin, n
+
+
+def generer(dossier, n_lignes, taille_chunk=TAILLE_CHUNK, n_workers=None, format_fichier='parquet',
+            colonnes='nettoye', taux_doublons=0.0, seed=0):
+    """Écrit `n_lignes` en partitions (une par chunk) dans `dossier`. Renvoie les chemins."""
+    os.makedirs(dossier, exist_ok=True)
+    tailles = [min(taille_chunk, n_lignes - debut) for debut in range(0, n_lignes, taille_chunk)]
+    taches = [
+        (i, n, graine, dossier, format_fichier, colonnes, taux_doublons)
+        for i, (n, graine) in enumerate(zip(tailles, graines(seed, len(tailles))))
+    ]
+    if n_workers == 1 or len(taches) == 1:
+        return [_ecrire_partition(t)[0] for t in taches]
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        # chunksize=1 : un chunk par tâche, au plus n_workers chunks en mémoire
+        return [chemin for chemin, _ in pool.map(_ecrire_partition, taches, chunksize=1)]
+
+
+def generer_fichier(chemin, n_lignes, taille_chunk=TAILLE_CHUNK, colonnes='nettoye', seed=0):
+    """Variante séquentielle en un seul CSV (ex. objet S3 unique), mêmes données que `generer`."""
+    tailles = [min(taille_chunk, n_lignes - debut) for debut in range(0, n_lignes, taille_chunk)]
+    with open(chemin, 'wb') as sortie:
+        for i, (n, graine) in enumerate(zip(tailles, graines(seed, len(tailles)))):
+            ecrire_csv(generer_lot(n, np.random.default_rng(graine), colonnes), sortie, entete=(i == 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un dataset Bank Marketing synthétique partitionné.")
+    parser.add_argument("dossier", help="Dossier de sortie (une partition par chunk)")
+    parser.add_argument("lignes", type=int, help="Nombre total de lignes")
+    parser.add_argument("--format", choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument("--colonnes", choices=['nettoye', 'brut'], default='nettoye',
+                        help="Schéma nettoyé (dashboard, scoring) ou brut bank-full (ETL)")
+    parser.add_argument("--chunk", type=int, default=TAILLE_CHUNK, help="Lignes par partition")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nb de CPU)")
+    parser.add_argument("--doublons", type=float, default=0.0, help="Part de lignes dupliquées (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    chemins = generer(args.dossier, args.lignes, args.chunk, args.workers, args.format,
+                      args.colonnes, args.doublons, args.seed)
+    duree = time.perf_counter() - debut
+    print(f"✅ {args.lignes:,} lignes en {len(chemins)} partitions en {duree:.1f}s "
+          f"({args.lignes / max(duree, 1e-9):,.0f} lignes/s) -> {args.dossier}")
+
+
+if __name__ == "__main__":
+    main()
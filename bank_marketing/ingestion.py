@@ -0,0 +1,234 @@
+"""Ingestion incrémentale des appels de campagne (lots delta) sans retraiter l'historique.
+
+Chaque lot est nettoyé avec les règles du notebook (etl.py), dédoublonné
+par empreinte contre tout l'historique, écrit comme une nouvelle partition
+Parquet, et le cube d'agrégats stocké est mis à jour par simple addition.
+
+Organisation sur S3 (préfixe PREFIXE_INGESTION) :
+    manifeste.json            version courante, partitions, clés d'état
+    partitions/lot-00001.parquet ...
+    etat/empreintes-v00001.npy  empreintes uint64 triées de toutes les lignes
+    etat/cube-v00001.parquet    cube (voir cube.py) de tout l'historique
+    etat/echantillon-v00001.parquet  échantillon stratifié (voir echantillon.py) de tout l'historique
+
+Le manifeste est écrit en dernier : c'est lui qui publie une version. Un lot
+interrompu laisse au pire des objets orphelins, jamais un état incohérent.
+Un seul ingesteur à la fois (pas de verrou).
+
+Usage :
+    python -m bank_marketing.ingestion initialiser
+    python -m bank_marketing.ingestion ajouter appels_du_jour.csv
+"""
+import argparse
+import json
+import time
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.cache_s3 import est_introuvable
+from bank_marketing.config import FICHIER_CSV
+from bank_marketing.cube import DIMENSIONS_CUBE, MESURES_CUBE, construire_cube
+from bank_marketing.donnees import encoder_categories
+from bank_marketing.echantillon import ReservoirStratifie
+from bank_marketing.etl import empreintes, nettoyer, premieres_occurrences
+
+PREFIXE_INGESTION = "bank_marketing_cleaned"
+
+# --- 1. DÉDOUBLONNAGE CONTRE L'HISTORIQUE ---
+def dedoublonner(df, connues):
+    """Retire les lignes dont l'empreinte est dans `connues` (triées) ou répétée dans le lot."""
+    hachages = empreintes(df)
+    deja_vue = np.zeros(len(df), dtype=bool)
+    if connues.size:
+        # Recherche dichotomique : O(lot x log historique), l'historique n'est jamais trié à nouveau
+        position = np.minimum(np.searchsorted(connues, hachages), connues.size - 1)
+        deja_vue = connues[position] == hachages
+    garder = premieres_occurrences(hachages) & ~deja_vue
+    return df[garder].reset_index(drop=True), hachages[garder]
+
+
+# --- 2. AGRÉGATS INCRÉMENTAUX ---
+def fusionner_cubes(cubes):
+    """Cube de l'union = somme des mesures par cellule (les mesures sont additives)."""
+    dimensions = [d for d in DIMENSIONS_CUBE if d in cubes[0].columns]
+    # Dimensions en texte pour concaténer des catégories différentes
+    parties = [c.astype({d: object for d in dimensions if d != 'campaign_bucket'}) for c in cubes]
+    fusion = (
+        pd.concat(parties, ignore_index=True)
+        .groupby(dimensions, dropna=False)[MESURES_CUBE]
+        .sum()
+        .reset_index()
+    )
+    # Modalités triées, comme à la lecture du snapshot
+    for dim in dimensions:
+        if dim != 'campaign_bucket':
+            fusion[dim] = pd.Categorical(fusion[dim], categories=sorted(fusion[dim].dropna().unique()))
+    return fusion
+
+
+# --- 3. STOCKAGE S3 ---
+class Entrepot:
+    """État de l'ingestion sur S3 : manifeste, partitions et agrégats."""
+
+    def __init__(self, s3_client, bucket, prefixe=PREFIXE_INGESTION):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefixe = prefixe
+
+    def cle(self, *parties):
+        return "/".join((self.prefixe,) + parties)
+
+    def _lire(self, cle):
+        return self.s3_client.get_object(Bucket=self.bucket, Key=cle)['Body'].read()
+
+    def _ecrire(self, cle, contenu):
+        self.s3_client.put_object(Bucket=self.bucket, Key=cle, Body=contenu)
+
+    def manifeste(self):
+        try:
+            return json.loads(self._lire(self.cle("manifeste.json")))
+        except Exception as e:
+            if est_introuvable(e):
+                return None
+            raise
+
+    def lire_empreintes(self, manifeste):
+        return np.load(BytesIO(self._lire(manifeste['empreintes'])), allow_pickle=False)
+
+    def lire_cube(self, manifeste):
+        return pd.read_parquet(BytesIO(self._lire(manifeste['cube'])))
+
+    def lire_echantillon(self, manifeste):
+        """Réservoir de la version publiée (None si l'ingestion a démarré sans échantillon)."""
+        if 'echantillon' not in manifeste:
+            return None
+        # Nouveaux tirages à chaque version (la graine 0 a servi à la première)
+        return ReservoirStratifie.depuis_echantillon(pd.read_parquet(BytesIO(self._lire(manifeste['echantillon']))),
+                                                     graine=manifeste['version'])
+
+    def publier(self, manifeste, partition, connues, cube, reservoir=None):
+        """Écrit la partition et le nouvel état, puis le manifeste qui les référence."""
+        version = manifeste['version'] + 1 if manifeste else 1
+        nouveau = {
+            'version': version,
+            'partitions': list(manifeste['partitions']) if manifeste else [],
+            'lignes': (manifeste['lignes'] if manifeste else 0) + len(partition),
+            'empreintes': self.cle("etat", f"empreintes-v{version:05d}.npy"),
+            'cube': self.cle("etat", f"cube-v{version:05d}.parquet"),
+            'mis_a_jour_le': time.time()
+        }
+        cle_partition = self.cle("partitions", f"lot-{version:05d}.parquet")
+        tampon = BytesIO()
+        encoder_categories(partition).to_parquet(tampon, engine='pyarrow', index=False, compression='zstd')
+        self._ecrire(cle_partition, tampon.getvalue())
+        nouveau['partitions'].append({'cle': cle_partition, 'lignes': len(partition), 'ajoute_le': time.time()})
+
+        tampon = BytesIO()
+        np.save(tampon, connues, allow_pickle=False)
+        self._ecrire(nouveau['empreintes'], tampon.getvalue())
+        tampon = BytesIO()
+        cube.to_parquet(tampon, engine='pyarrow', index=False)
+        self._ecrire(nouveau['cube'], tampon.getvalue())
+        if reservoir is not None:
+            nouveau['echantillon'] = self.cle("etat", f"echantillon-v{version:05d}.parquet")
+            tampon = BytesIO()
+            reservoir.echantillon().to_parquet(tampon, engine='pyarrow', index=False, compression='zstd')
+            self._ecrire(nouveau['echantillon'], tampon.getvalue())
+
+        self._ecrire(self.cle("manifeste.json"), json.dumps(nouveau, indent=1))
+        return nouveau
+
+
+def ingerer(entrepot, lot):
+    """Ajoute un lot d'appels : nettoyage, dédoublonnage, partition, cube. Renvoie un rapport."""
+    debut = time.perf_counter()
+    manifeste = entrepot.manifeste()
+    connues = entrepot.lire_empreintes(manifeste) if manifeste else np.empty(0, dtype=np.uint64)
+
+    propre = nettoyer(lot)
+    nouvelles, hachages = dedoublonner(propre, connues)
+    rapport = {'recues': len(lot), 'doublons': len(lot) - len(nouvelles), 'ajoutees': len(nouvelles)}
+    if nouvelles.empty:
+        rapport.update(version=manifeste['version'] if manifeste else 0, secondes=time.perf_counter() - debut)
+        return rapport
+
+    cubes = [entrepot.lire_cube(manifeste)] if manifeste else []
+    cube = fusionner_cubes(cubes + [construire_cube(nouvelles)])
+    # Un échantillon ne se complète que s'il couvre déjà tout l'historique
+    reservoir = entrepot.lire_echantillon(manifeste) if manifeste else ReservoirStratifie()
+    if reservoir is not None:
+        reservoir.ajouter(nouvelles)
+    connues = np.union1d(connues, hachages)
+    manifeste = entrepot.publier(manifeste, nouvelles, connues, cube, reservoir)
+
+    rapport.update(version=manifeste['version'], total=manifeste['lignes'], secondes=time.perf_counter() - debut)
+    return rapport
+
+
+# --- 4. LECTURE (dashboard, réentraînement) ---
+def charger_cube_stocke(cache, bucket, prefixe=PREFIXE_INGESTION):
+    """Cube à jour publié par l'ingestion, ou None si aucune ingestion n'a eu lieu."""
+    manifeste = Entrepot(cache.s3_client, bucket, prefixe).manifeste()
+    if manifeste is None:
+        return None
+    return pd.read_parquet(cache.recuperer(bucket, manifeste['cube']))
+
+
+def charger_echantillon_stocke(cache, bucket, prefixe=PREFIXE_INGESTION):
+    """Échantillon stratifié à jour publié par l'ingestion, ou None."""
+    manifeste = Entrepot(cache.s3_client, bucket, prefixe).manifeste()
+    if manifeste is None or 'echantillon' not in manifeste:
+        return None
+    return ReservoirStratifie.depuis_echantillon(pd.read_parquet(cache.recuperer(bucket, manifeste['echantillon'])))
+
+
+def charger_historique(cache, bucket, colonnes=None, prefixe=PREFIXE_INGESTION):
+    """Concatène toutes les partitions (copies locales revalidées par ETag)."""
+    from bank_marketing.donnees import lire_snapshot
+
+    manifeste = Entrepot(cache.s3_client, bucket, prefixe).manifeste()
+    if manifeste is None:
+        return None
+    parties = [lire_snapshot(cache.recuperer(bucket, p['cle']), colonnes) for p in manifeste['partitions']]
+    return pd.concat(parties, ignore_index=True)
+
+
+def version_courante(s3_client, bucket, prefixe=PREFIXE_INGESTION):
+    manifeste = Entrepot(s3_client, bucket, prefixe).manifeste()
+    return manifeste['version'] if manifeste else 0
+
+
+def main():
+    from dotenv import load_dotenv
+
+    from bank_marketing.config import cache_artefacts, client_s3, nom_bucket
+    from bank_marketing.donnees import charger_dataset
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Ingestion incrémentale des appels de campagne.")
+    sous = parser.add_subparsers(dest="commande", required=True)
+    init = sous.add_parser("initialiser", help="Crée la première partition depuis le CSV nettoyé publié")
+    init.add_argument("--fichier", default=FICHIER_CSV)
+    ajout = sous.add_parser("ajouter", help="Ajoute un lot delta (.csv séparateur ';' ou .parquet)")
+    ajout.add_argument("lot")
+    args = parser.parse_args()
+
+    entrepot = Entrepot(client_s3(), nom_bucket())
+    if args.commande == "initialiser":
+        if entrepot.manifeste() is not None:
+            parser.error("ingestion déjà initialisée")
+        lot = charger_dataset(cache_artefacts(), nom_bucket(), args.fichier, colonnes=None)
+    elif args.lot.lower().endswith((".parquet", ".pq")):
+        lot = pd.read_parquet(args.lot)
+    else:
+        lot = pd.read_csv(args.lot, sep=';')
+
+    rapport = ingerer(entrepot, lot)
+    print(f"✅ {rapport['ajoutees']} lignes ajoutées ({rapport['doublons']} doublons ignorés) "
+          f"-> version {rapport['version']} en {rapport['secondes']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
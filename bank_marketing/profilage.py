@@ -0,0 +1,123 @@
+"""Instrumentation des reruns Streamlit : durée et mémoire par section du script.
+
+Un `Profileur` (partagé par le process) garde les N dernières mesures de chaque
+section et en tire des percentiles glissants. Dans un script, un `Chrono` par
+rerun découpe le temps en étapes successives, sans réindenter les sections :
+
+    chrono = Chrono(profileur)
+    chrono.etape("1. Chargement S3")
+    ...
+    chrono.etape("2. Profil client")
+    ...
+    chrono.fin()
+"""
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Mesures gardées par section (fenêtre glissante des percentiles)
+FENETRE = 200
+SECTION_TOTALE = "Total rerun"
+
+_PAGE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def memoire_mo():
+    """RSS courant du process en Mo (pic RSS hors Linux, faute de /proc)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE / 1024 ** 2
+    except OSError:
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pic / 1024 ** 2 if sys.platform == 'darwin' else pic / 1024
+
+
+class Profileur:
+
+    def __init__(self, fenetre=FENETRE):
+        self.fenetre = fenetre
+        self._mesures = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, nom, duree, delta_memoire):
+        with self._verrou:
+            if nom not in self._mesures:
+                self._mesures[nom] = deque(maxlen=self.fenetre)
+            self._mesures[nom].append((duree, delta_memoire))
+
+    @contextmanager
+    def section(self, nom):
+        debut, memoire = time.perf_counter(), memoire_mo()
+        try:
+            yield
+        finally:
+            self.enregistrer(nom, time.perf_counter() - debut, memoire_mo() - memoire)
+
+    def reinitialiser(self):
+        with self._verrou:
+            self._mesures.clear()
+
+    def statistiques(self):
+        """Une ligne par section : nb de reruns, p50/p95/dernier (ms), delta mémoire (Mo)."""
+        with self._verrou:
+            copie = [(nom, np.asarray(mesures)) for nom, mesures in self._mesures.items()]
+        lignes = []
+        for nom, mesures in copie:
+            durees, memoire = mesures[:, 0] * 1000, mesures[:, 1]
+            lignes.append({
+                'Section': nom,
+                'Reruns': len(durees),
+                'p50_ms': round(float(np.percentile(durees, 50)), 2),
+                'p95_ms': round(float(np.percentile(durees, 95)), 2),
+                'Dernier_ms': round(float(durees[-1]), 2),
+                'Delta_memoire_p50_Mo': round(float(np.percentile(memoire, 50)), 2),
+                'Delta_memoire_max_Mo': round(float(memoire.max()), 2)
+            })
+        # Import local : pandas n'est pas chargé avant le premier affichage des pages
+        import pandas as pd
+
+        return pd.DataFrame(lignes)
+
+    def exporter_json(self):
+        """Statistiques + mesures brutes, pour comparer deux versions hors de l'app."""
+        with self._verrou:
+            brutes = {nom: [[round(d, 6), round(m, 3)] for d, m in mesures] for nom, mesures in self._mesures.items()}
+        return json.dumps({
+            'genere_le': time.time(),
+            'fenetre': self.fenetre,
+            'statistiques': self.statistiques().to_dict(orient='records'),
+            'mesures': brutes
+        }, indent=1, ensure_ascii=False)
+
+
+class Chrono:
+    """Découpe un rerun en étapes : chaque `etape` clôt la précédente."""
+
+    def __init__(self, profileur):
+        self.profileur = profileur
+        self._debut_rerun = time.perf_counter()
+        self._memoire_rerun = memoire_mo()
+        self._courante = None
+
+    def etape(self, nom):
+        self._cloturer()
+        self._courante = (nom, time.perf_counter(), memoire_mo())
+
+    def _cloturer(self):
+        if self._courante is not None:
+            nom, debut, memoire = self._courante
+            self.profileur.enregistrer(nom, time.perf_counter() - debut, memoire_mo() - memoire)
+            self._courante = None
+
+    def fin(self):
+        self._cloturer()
+        self.profileur.enregistrer(
+            SECTION_TOTALE, time.perf_counter() - self._debut_rerun, memoire_mo() - self._memoire_rerun
+        )
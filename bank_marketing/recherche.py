@@ -0,0 +1,389 @@
+"""Recherche d'hyperparamètres par élimination successive (successive halving), parallèle et reprenable.
+
+Remplace les GridSearchCV commentés des notebooks 2_machine_learning et
+3_machine_learningV2 (grille RandomForest et grille XGBoost de 486 combinaisons) :
+
+- le préprocesseur du notebook (StandardScaler + OneHotEncoder(drop='first'))
+  est ajusté une seule fois par fold ; les matrices sont stockées en .npy et
+  relues en mémoire mappée par tous les workers ;
+- chaque tour évalue les candidats restants sur une fraction croissante des
+  lignes d'entraînement, puis ne garde que le meilleur 1/facteur ;
+- chaque essai terminé (candidat x tour) est ajouté à `essais.jsonl` : une
+  recherche interrompue reprend là où elle s'était arrêtée. L'en-tête du
+  journal (empreinte des folds, famille, plan des tours) doit correspondre à
+  la recherche relancée, sinon le journal est mis de côté et tout est rejoué ;
+- le classement se fait sur la classe minoritaire 'yes' (F1 ou recall).
+
+Usage :
+    python -m bank_marketing.recherche data/bank_marketing_cleaned_v1.csv recherche_foret/ --grille foret
+    python -m bank_marketing.recherche donnees.parquet recherche_xgb/ --grille xgboost --workers 16 \
+        --modele-sortie model_bank_marketing_v2.joblib
+
+Avec --modele-sortie, le profil de référence de la dérive (derive.py) est
+écrit à côté du modèle (model_bank_marketing_v2_profil.json).
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.config import COLONNE_CIBLE
+from bank_marketing.features import COLONNES_CATEGORIELLES_MODELE, COLONNES_NUMERIQUES, preparer_clients
+
+journal = logging.getLogger(__name__)
+
+# --- 1. GRILLES (notebooks) ---
+GRILLES = {
+    'foret': {
+        'n_estimators': [100, 150],
+        'max_depth': [15, 20, None],
+        'min_samples_split': [5, 10],
+        'min_samples_leaf': [2, 4]
+    },
+    # Grille complète du notebook 2 (3 x 3 x 2 x 3 x 3 x 3 = 486 combinaisons)
+    'xgboost': {
+        'max_depth': [4, 6, 8],
+        'min_child_weight': [1, 3, 5],
+        'n_estimators': [200, 300],
+        'learning_rate': [0.01, 0.05, 0.1],
+        'subsample': [0.7, 0.8, 0.9],
+        'colsample_bytree': [0.7, 0.8, 0.9]
+    }
+}
+
+METRIQUES = ('f1', 'recall')
+N_FOLDS = 3
+FACTEUR = 3
+# Lignes d'entraînement par fold au premier tour
+RESSOURCES_MIN = 2_000
+SEED = 42
+
+FICHIER_ESSAIS = "essais.jsonl"
+DOSSIER_FOLDS = "folds"
+
+
+def candidats(grille):
+    """Combinaisons de la grille, dans un ordre stable (clé de reprise)."""
+    noms = sorted(grille)
+    return [dict(zip(noms, valeurs)) for valeurs in product(*(grille[nom] for nom in noms))]
+
+
+def cle_candidat(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def creer_estimateur(famille, params, poids_positif=1.0):
+    """Même configuration de base que les notebooks ; un seul thread (le parallélisme est entre essais)."""
+    if famille == 'foret':
+        from sklearn.ensemble import RandomForestClassifier
+
+        return RandomForestClassifier(class_weight='balanced', random_state=SEED, n_jobs=1, **params)
+    if famille == 'xgboost':
+        # Dépendance optionnelle : seulement pour la grille XGBoost
+        from xgboost import XGBClassifier
+
+        return XGBClassifier(objective='binary:logistic', eval_metric='logloss', random_state=SEED,
+                             scale_pos_weight=poids_positif, n_jobs=1, **params)
+    raise ValueError(f"Famille de modèles inconnue : {famille}")
+
+
+# --- 2. PRÉTRAITEMENT MIS EN CACHE PAR FOLD ---
+def preparer_donnees(df):
+    """Schéma client du simulateur (sans `duration`, fuite de la cible) + cible 0/1."""
+    X = preparer_clients(df).reset_index(drop=True)
+    y = (df[COLONNE_CIBLE].astype(str) == 'yes').to_numpy(dtype=np.int8)
+    return X, y
+
+
+def empreinte_donnees(X, y, n_folds):
+    hachage = hashlib.sha1(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    hachage.update(y.tobytes())
+    hachage.update(str(n_folds).encode())
+    return hachage.hexdigest()[:16]
+
+
+def creer_preprocesseur():
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    # sparse_threshold=0 : matrice dense, stockable en .npy et mappable en mémoire
+    return ColumnTransformer([
+        ('num', StandardScaler(), COLONNES_NUMERIQUES),
+        ('cat', OneHotEncoder(drop='first', handle_unknown='ignore'), COLONNES_CATEGORIELLES_MODELE)
+    ], sparse_threshold=0)
+
+
+def preparer_folds(X, y, dossier, n_folds=N_FOLDS):
+    """Ajuste le préprocesseur sur chaque fold d'entraînement et stocke les matrices.
+
+    Réutilise les fichiers existants si les données et le nombre de folds n'ont pas changé.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    repertoire = os.path.join(dossier, DOSSIER_FOLDS)
+    empreinte = empreinte_donnees(X, y, n_folds)
+    chemin_manifeste = os.path.join(repertoire, "manifeste.json")
+    if os.path.isfile(chemin_manifeste):
+        with open(chemin_manifeste, encoding='utf-8') as f:
+            manifeste = json.load(f)
+        if manifeste.get('empreinte') == empreinte:
+            return repertoire, manifeste
+
+    os.makedirs(repertoire, exist_ok=True)
+    rng = np.random.default_rng(SEED)
+    folds = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=SEED)
+    for i, (idx_train, idx_valid) in enumerate(folds.split(X, y)):
+        preprocesseur = creer_preprocesseur()
+        X_train = preprocesseur.fit_transform(X.iloc[idx_train]).astype(np.float32)
+        X_valid = preprocesseur.transform(X.iloc[idx_valid]).astype(np.float32)
+        # Ordre aléatoire fixe : un tour à r lignes prend les r premières (tirage stratifié)
+        ordre = _ordre_stratifie(y[idx_train], rng)
+        np.save(os.path.join(repertoire, f"X_train_{i}.npy"), X_train[ordre])
+        np.save(os.path.join(repertoire, f"y_train_{i}.npy"), y[idx_train][ordre])
+        np.save(os.path.join(repertoire, f"X_valid_{i}.npy"), X_valid)
+        np.save(os.path.join(repertoire, f"y_valid_{i}.npy"), y[idx_valid])
+
+    manifeste = {
+        'empreinte': empreinte,
+        'n_folds': n_folds,
+        'lignes_train': int(len(y) - len(y) // n_folds),
+        'poids_positif': float((y == 0).sum() / max((y == 1).sum(), 1))
+    }
+    with open(chemin_manifeste, 'w', encoding='utf-8') as f:
+        json.dump(manifeste, f)
+    return repertoire, manifeste
+
+
+def _ordre_stratifie(y, rng):
+    """Permutation où chaque préfixe garde la proportion de 'yes' du fold."""
+    positions = np.empty(len(y))
+    for classe in (0, 1):
+        idx = np.flatnonzero(y == classe)
+        # Rang fractionnaire dans la classe : les deux classes s'entrelacent régulièrement
+        positions[rng.permutation(idx)] = (np.arange(idx.size) + rng.random()) / max(idx.size, 1)
+    return np.argsort(positions, kind='stable')
+
+
+# --- 3. ÉVALUATION (WORKERS) ---
+_FOLDS_WORKER = None
+
+
+def _init_worker(repertoire, n_folds):
+    # Matrices mappées en mémoire : partagées par le cache de pages entre workers
+    global _FOLDS_WORKER
+    _FOLDS_WORKER = [
+        tuple(np.load(os.path.join(repertoire, f"{nom}_{i}.npy"), mmap_mode='r')
+              for nom in ('X_train', 'y_train', 'X_valid', 'y_valid'))
+        for i in range(n_folds)
+    ]
+
+
+def evaluer(famille, params, ressources, poids_positif, folds):
+    """F1 / recall / précision de la classe 'yes', moyennés sur les folds."""
+    from sklearn.metrics import f1_score, precision_score, recall_score
+
+    scores = {'f1': [], 'recall': [], 'precision': []}
+    for X_train, y_train, X_valid, y_valid in folds:
+        modele = creer_estimateur(famille, params, poids_positif)
+        modele.fit(X_train[:ressources], y_train[:ressources])
+        pred = modele.predict(X_valid)
+        scores['f1'].append(f1_score(y_valid, pred, zero_division=0))
+        scores['recall'].append(recall_score(y_valid, pred, zero_division=0))
+        scores['precision'].append(precision_score(y_valid, pred, zero_division=0))
+    return {nom: float(np.mean(valeurs)) for nom, valeurs in scores.items()}
+
+
+def _evaluer_worker(tache):
+    famille, params, tour, ressources, poids_positif = tache
+    debut = time.perf_counter()
+    scores = evaluer(famille, params, ressources, poids_positif, _FOLDS_WORKER)
+    return {'tour': tour, 'candidat': cle_candidat(params), 'ressources': ressources,
+            'secondes': round(time.perf_counter() - debut, 3), **scores}
+
+
+# --- 4. ÉLIMINATION SUCCESSIVE ---
+def plan_tours(n_candidats, lignes_train, facteur=FACTEUR, ressources_min=RESSOURCES_MIN):
+    """[(candidats gardés, lignes par fold)] : le dernier tour utilise tout le fold."""
+    n_tours = max(1, 1 + math.floor(math.log(max(n_candidats, 1), facteur)))
+    # Inutile de prévoir un tour de plus si l'avant-dernier utilise déjà tout le fold
+    while n_tours > 1 and ressources_min * facteur ** (n_tours - 2) >= lignes_train:
+        n_tours -= 1
+    plan = []
+    for tour in range(n_tours):
+        garder = max(1, math.ceil(n_candidats / facteur ** tour))
+        ressources = lignes_train if tour == n_tours - 1 else min(ressources_min * facteur ** tour, lignes_train)
+        plan.append((garder, ressources))
+    return plan
+
+
+def classer(essais, metrique):
+    """Tri décroissant sur la métrique, l'autre métrique 'yes' départage."""
+    autre = 'recall' if metrique == 'f1' else 'f1'
+    return sorted(essais, key=lambda e: (e[metrique], e[autre]), reverse=True)
+
+
+def entete_journal(manifeste, famille, plan):
+    """Ce qui rend un essai (tour, candidat) comparable d'un lancement à l'autre."""
+    return {'empreinte': manifeste['empreinte'], 'famille': famille, 'plan': [list(etape) for etape in plan]}
+
+
+def lire_essais(chemin, entete):
+    """Essais déjà faits par la même recherche (mêmes folds, famille et plan).
+
+    Un journal d'une autre recherche (ou sans en-tête) est renommé en
+    `essais.jsonl.ancien` : ses scores ne sont pas comparables.
+    """
+    essais = {}
+    if not os.path.isfile(chemin):
+        return essais
+    with open(chemin, encoding='utf-8') as f:
+        try:
+            trouve = json.loads(f.readline()).get('entete')
+        except (ValueError, AttributeError):
+            trouve = None
+        if trouve == entete:
+            for ligne in f:
+                try:
+                    essai = json.loads(ligne)
+                except ValueError:
+                    # Dernière ligne tronquée par un arrêt brutal : l'essai sera rejoué
+                    continue
+                essais[(essai['tour'], essai['candidat'])] = essai
+            return essais
+    journal.warning("%s vient d'une autre recherche (folds, famille ou plan différents) : "
+                    "renommé en %s.ancien, essais rejoués", chemin, os.path.basename(chemin))
+    os.replace(chemin, chemin + ".ancien")
+    return essais
+
+
+def _tronquer_ligne_incomplete(chemin, taille_bloc=64 * 1024):
+    """Coupe le journal après son dernier saut de ligne : un essai ajouté après un arrêt
+    brutal commence sur une ligne neuve au lieu de prolonger la ligne tronquée."""
+    with open(chemin, 'rb+') as f:
+        taille = position = f.seek(0, os.SEEK_END)
+        fin = 0
+        while position > 0:
+            debut = max(position - taille_bloc, 0)
+            f.seek(debut)
+            dernier = f.read(position - debut).rfind(b"\n")
+            if dernier >= 0:
+                fin = debut + dernier + 1
+                break
+            position = debut
+        if fin < taille:
+            f.truncate(fin)
+
+
+def rechercher(df, dossier, famille='foret', grille=None, metrique='f1', n_folds=N_FOLDS,
+               facteur=FACTEUR, ressources_min=RESSOURCES_MIN, n_workers=None):
+    """Lance (ou reprend) la recherche dans `dossier`. Renvoie le classement du dernier tour."""
+    if metrique not in METRIQUES:
+        raise ValueError(f"Métrique inconnue : {metrique} (attendu : {', '.join(METRIQUES)})")
+    n_workers = n_workers or os.cpu_count() or 1
+    os.makedirs(dossier, exist_ok=True)
+
+    X, y = preparer_donnees(df)
+    repertoire, manifeste = preparer_folds(X, y, dossier, n_folds)
+    restants = candidats(grille or GRILLES[famille])
+    plan = plan_tours(len(restants), manifeste['lignes_train'], facteur, ressources_min)
+
+    chemin_essais = os.path.join(dossier, FICHIER_ESSAIS)
+    entete = entete_journal(manifeste, famille, plan)
+    faits = lire_essais(chemin_essais, entete)
+    if os.path.isfile(chemin_essais):
+        _tronquer_ligne_incomplete(chemin_essais)
+    classement = []
+    with ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(repertoire, n_folds)) as pool, \
+            open(chemin_essais, 'a', encoding='utf-8') as fichier_essais:
+        if fichier_essais.tell() == 0:
+            fichier_essais.write(json.dumps({'entete': entete}) + "\n")
+            fichier_essais.flush()
+        for tour, (garder, ressources) in enumerate(plan):
+            restants = restants[:garder]
+            a_faire = [p for p in restants if (tour, cle_candidat(p)) not in faits]
+            journal.info("Tour %d/%d : %d candidats x %s lignes (%d déjà faits)", tour + 1, len(plan),
+                         len(restants), f"{ressources:,}", len(restants) - len(a_faire))
+            futurs = [pool.submit(_evaluer_worker, (famille, p, tour, ressources, manifeste['poids_positif']))
+                      for p in a_faire]
+            for futur in as_completed(futurs):
+                essai = futur.result()
+                # Point de reprise : une ligne par essai, écrite dès qu'il se termine
+                fichier_essais.write(json.dumps(essai) + "\n")
+                fichier_essais.flush()
+                faits[(tour, essai['candidat'])] = essai
+
+            classement = classer([faits[(tour, cle_candidat(p))] for p in restants], metrique)
+            restants = [json.loads(e['candidat']) for e in classement]
+
+    with open(os.path.join(dossier, "classement.json"), 'w', encoding='utf-8') as f:
+        json.dump({'famille': famille, 'metrique': metrique, 'plan': plan, 'classement': classement},
+                  f, indent=1, ensure_ascii=False)
+    return classement
+
+
+def reentrainer(df, famille, params):
+    """Réentraîne le meilleur candidat sur tout le dataset, au format servi par le simulateur.
+
+    Les arbres sont insensibles à la mise à l'échelle : le modèle est ajusté sur
+    l'encodage one-hot du simulateur (EncodeurCompile), schéma attaché à l'artefact.
+    """
+    from bank_marketing.features import COLONNES_MODELE, EncodeurCompile, attacher_schema
+
+    X, y = preparer_donnees(df)
+    encodeur = EncodeurCompile(COLONNES_MODELE, COLONNES_NUMERIQUES, COLONNES_CATEGORIELLES_MODELE)
+    modele = creer_estimateur(famille, params, float((y == 0).sum() / max((y == 1).sum(), 1)))
+    modele.set_params(n_jobs=-1)
+    modele.fit(encodeur.encoder_lot(X), y)
+    return attacher_schema(modele)
+
+
+def lire_dataset(chemin):
+    if str(chemin).lower().endswith((".parquet", ".pq")):
+        return pd.read_parquet(chemin)
+    return pd.read_csv(chemin, sep=';')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recherche d'hyperparamètres par élimination successive (reprenable).")
+    parser.add_argument("donnees", help="Dataset nettoyé (.csv séparateur ';' ou .parquet)")
+    parser.add_argument("dossier", help="Dossier de travail (cache des folds, essais, classement)")
+    parser.add_argument("--grille", choices=list(GRILLES), default='foret')
+    parser.add_argument("--metrique", choices=METRIQUES, default='f1', help="Classement sur la classe 'yes'")
+    parser.add_argument("--folds", type=int, default=N_FOLDS)
+    parser.add_argument("--facteur", type=int, default=FACTEUR, help="Candidats divisés par ce facteur à chaque tour")
+    parser.add_argument("--ressources-min", type=int, default=RESSOURCES_MIN, help="Lignes par fold au premier tour")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nb de CPU)")
+    parser.add_argument("--modele-sortie", help="Réentraîne le meilleur candidat et l'écrit en .joblib")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    df = lire_dataset(args.donnees)
+    debut = time.perf_counter()
+    classement = rechercher(df, args.dossier, args.grille, metrique=args.metrique, n_folds=args.folds,
+                            facteur=args.facteur, ressources_min=args.ressources_min, n_workers=args.workers)
+    meilleur = classement[0]
+    print(f"✅ Recherche terminée en {time.perf_counter() - debut:.1f}s")
+    print(f"🏆 {meilleur['candidat']} : F1 'yes' {meilleur['f1']:.4f} | recall 'yes' {meilleur['recall']:.4f}")
+
+    if args.modele_sortie:
+        import joblib
+
+        from bank_marketing.derive import construire_reference
+
+        modele = reentrainer(df, args.grille, json.loads(meilleur['candidat']))
+        joblib.dump(modele, args.modele_sortie)
+        chemin_profil = os.path.splitext(args.modele_sortie)[0] + "_profil.json"
+        construire_reference(modele, df).sauvegarder(chemin_profil)
+        print(f"💾 Modèle réentraîné -> {args.modele_sortie} (profil de référence -> {chemin_profil})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Faux client S3 adossé au disque : même sous-ensemble d'API que boto3 (get/head/put_object).
+
+Sert au développement hors ligne et aux benchmarks : S3_LOCAL_DIR=/chemin/vers/racine
+(un sous-dossier par bucket, un fichier par clé).
+"""
+import os
+import shutil
+
+
+class ErreurS3(Exception):
+    """Erreur au format botocore.exceptions.ClientError (attribut `response`)."""
+
+    def __init__(self, code, statut, message=""):
+        super().__init__(f"{code} ({statut}) {message}".strip())
+        self.response = {
+            'Error': {'Code': code, 'Message': message},
+            'ResponseMetadata': {'HTTPStatusCode': statut}
+        }
+
+
+class CorpsFichier:
+    """Équivalent de botocore StreamingBody sur une tranche de fichier."""
+
+    def __init__(self, chemin, debut=0, taille=None):
+        self._fichier = open(chemin, 'rb')
+        self._fichier.seek(debut)
+        self._reste = taille if taille is not None else os.path.getsize(chemin) - debut
+
+    def read(self, n=-1):
+        if n is None or n < 0 or n > self._reste:
+            n = self._reste
+        donnees = self._fichier.read(n)
+        self._reste -= len(donnees)
+        return donnees
+
+    def iter_chunks(self, chunk_size=1024 * 1024):
+        while True:
+            morceau = self.read(chunk_size)
+            if not morceau:
+                break
+            yield morceau
+
+    def close(self):
+        self._fichier.close()
+
+
+class ClientS3Local:
+
+    def __init__(self, racine):
+        self.racine = racine
+
+    def _chemin(self, bucket, key):
+        return os.path.join(self.racine, bucket or "_", *key.split('/'))
+
+    def _etag(self, chemin):
+        info = os.stat(chemin)
+        return f'"{info.st_size:x}-{info.st_mtime_ns:x}"'
+
+    def head_object(self, Bucket, Key, **kwargs):
+        chemin = self._chemin(Bucket, Key)
+        if not os.path.isfile(chemin):
+            raise ErreurS3('404', 404, f"{Key} introuvable")
+        return {'ContentLength': os.path.getsize(chemin), 'ETag': self._etag(chemin)}
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None, Range=None, **kwargs):
+        chemin = self._chemin(Bucket, Key)
+        if not os.path.isfile(chemin):
+            raise ErreurS3('NoSuchKey', 404, f"{Key} introuvable")
+        etag = self._etag(chemin)
+        if IfNoneMatch is not None and IfNoneMatch == etag:
+            raise ErreurS3('304', 304, "Not Modified")
+
+        taille_totale = os.path.getsize(chemin)
+        debut, fin = 0, taille_totale - 1
+        if Range:
+            bornes = Range.replace('bytes=', '').split('-')
+            debut = int(bornes[0])
+            fin = min(int(bornes[1]), taille_totale - 1) if bornes[1] else taille_totale - 1
+        taille = max(fin - debut + 1, 0)
+        reponse = {'Body': CorpsFichier(chemin, debut, taille), 'ContentLength': taille, 'ETag': etag}
+        if Range:
+            reponse['ContentRange'] = f"bytes {debut}-{fin}/{taille_totale}"
+        return reponse
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        chemin = self._chemin(Bucket, Key)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        with open(chemin, 'wb') as sortie:
+            if isinstance(Body, str):
+                sortie.write(Body.encode('utf-8'))
+            elif isinstance(Body, (bytes, bytearray, memoryview)):
+                sortie.write(Body)
+            else:
+                shutil.copyfileobj(Body, sortie)
+        return {'ETag': self._etag(chemin)}
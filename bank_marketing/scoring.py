@@ -0,0 +1,226 @@
+"""Scoring en masse d'un fichier de prospects (CSV ou Parquet) avec le modèle du simulateur.
+
+Usage :
+    python -m bank_marketing.scoring model_bank_marketing_v1_foret.npz prospects.csv scores.csv
+"""
+import argparse
+import logging
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.cache_s3 import est_introuvable
+from bank_marketing.features import EncodeurCompile
+
+journal = logging.getLogger(__name__)
+
+# Seuils de priorité du simulateur (score en %)
+SEUIL_HAUTE = 40
+SEUIL_MOYENNE = 15
+
+TAILLE_CHUNK = 100_000
+
+
+def niveau_priorite(score):
+    """HAUTE / MOYENNE / BASSE à partir du score de propension (en %)."""
+    score = np.asarray(score)
+    return np.select(
+        [score >= SEUIL_HAUTE, score >= SEUIL_MOYENNE],
+        ["HAUTE", "MOYENNE"],
+        default="BASSE"
+    )
+
+
+def predire_proba(model, X):
+    """Probabilité de souscription pour une matrice déjà encodée."""
+    with warnings.catch_warnings():
+        # Modèle entraîné sur un DataFrame : X est ici un tableau NumPy aligné sur ses colonnes
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return model.predict_proba(X)[:, 1]
+
+
+def scorer_clients(model, df, encodeur=None, segmentation=None):
+    """Ajoute `propension` (en %, 2 décimales) et `priorite` à un DataFrame de clients,
+    et `segment` (n° de groupe, à partir de 1) si une segmentation est fournie."""
+    encodeur = encodeur or EncodeurCompile.depuis_modele(model)
+    proba = predire_proba(model, encodeur.encoder_lot(df))
+    score = np.round(proba * 100, 2)
+    df = df.assign(propension=score, priorite=niveau_priorite(score))
+    if segmentation is not None:
+        df['segment'] = segmentation.affecter(df) + 1
+    return df
+
+
+# --- LECTURE / ÉCRITURE PAR CHUNKS ---
+def est_parquet(chemin):
+    return str(chemin).lower().endswith((".parquet", ".pq"))
+
+
+def lire_par_chunks(chemin, taille_chunk=TAILLE_CHUNK, colonnes=None):
+    if est_parquet(chemin):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(chemin).iter_batches(batch_size=taille_chunk, columns=colonnes):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(chemin, sep=';', chunksize=taille_chunk, usecols=colonnes)
+
+
+class EcrivainScores:
+    """Écrit les chunks scorés dans l'ordre, en CSV (;) ou en Parquet selon l'extension."""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self.parquet = est_parquet(chemin)
+        self._writer = None
+        self._premier = True
+
+    def ecrire(self, chunk):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.chemin, table.schema)
+            else:
+                table = table.cast(self._writer.schema)
+            self._writer.write_table(table)
+        else:
+            chunk.to_csv(self.chemin, sep=';', index=False, mode='w' if self._premier else 'a', header=self._premier)
+        self._premier = False
+
+    def fermer(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def predire_proba_lot(model, encodeur, df, taille_chunk=TAILLE_CHUNK):
+    """Probabilités d'un grand DataFrame, encodé par chunks (matrice bornée à `taille_chunk` lignes)."""
+    proba = np.empty(len(df), dtype=np.float64)
+    for debut in range(0, len(df), taille_chunk):
+        chunk = df.iloc[debut:debut + taille_chunk]
+        proba[debut:debut + len(chunk)] = predire_proba(model, encodeur.encoder_lot(chunk))
+    return proba
+
+
+# --- MODÈLE PUBLIÉ SUR S3 ---
+CLE_MODELE = "model_bank_marketing_v1.joblib"
+CLE_FORET = "model_bank_marketing_v1_foret.npz"
+
+
+def charger_modele_publie(cache, bucket):
+    """Forêt aplatie si elle est publiée (NumPy pur, sans sklearn), sinon le .joblib."""
+    try:
+        from bank_marketing.foret import ForetAplatie
+
+        return ForetAplatie.charger(cache.recuperer(bucket, CLE_FORET))
+    except Exception as e:
+        if not est_introuvable(e):
+            # Forêt publiée mais illisible (S3 injoignable, fichier corrompu...) : signalée, puis repli joblib
+            journal.warning("Forêt aplatie %s illisible, repli sur %s : %r", CLE_FORET, CLE_MODELE, e, exc_info=True)
+    import joblib
+
+    return joblib.load(cache.recuperer(bucket, CLE_MODELE))
+
+
+def charger_modele_local(chemin):
+    """Forêt aplatie (.npz, sans sklearn) ou modèle scikit-learn (.joblib)."""
+    if str(chemin).lower().endswith(".npz"):
+        from bank_marketing.foret import ForetAplatie
+
+        return ForetAplatie.charger(chemin)
+    import joblib
+
+    return joblib.load(chemin)
+
+
+# --- POOL DE PROCESSUS ---
+_MODELE_WORKER = None
+_ENCODEUR_WORKER = None
+_SEGMENTATION_WORKER = None
+
+
+def _init_worker(chemin_modele, chemin_segments=None):
+    # Chaque worker charge le modèle (et la segmentation) et compile l'encodeur une seule fois
+    global _MODELE_WORKER, _ENCODEUR_WORKER, _SEGMENTATION_WORKER
+    _MODELE_WORKER = charger_modele_local(chemin_modele)
+    _ENCODEUR_WORKER = EncodeurCompile.depuis_modele(_MODELE_WORKER)
+    if chemin_segments:
+        from bank_marketing.segmentation import Segmentation
+
+        _SEGMENTATION_WORKER = Segmentation.charger(chemin_segments)
+
+
+def _scorer_chunk(chunk):
+    return scorer_clients(_MODELE_WORKER, chunk, _ENCODEUR_WORKER, _SEGMENTATION_WORKER)
+
+
+def scorer_chunks(chemin_modele, entree, taille_chunk=TAILLE_CHUNK, n_workers=None, chemin_segments=None):
+    """Chunks scorés de `entree`, dans l'ordre du fichier, calculés sur un pool de processus.
+
+    Au plus 2 chunks par worker sont en vol : la mémoire reste bornée quelle que
+    soit la taille du fichier.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    en_vol = []
+    with ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(chemin_modele, chemin_segments)) as pool:
+        for chunk in lire_par_chunks(entree, taille_chunk):
+            en_vol.append(pool.submit(_scorer_chunk, chunk))
+            if len(en_vol) >= 2 * n_workers:
+                yield en_vol.pop(0).result()
+        for futur in en_vol:
+            yield futur.result()
+
+
+def scorer_fichier(chemin_modele, entree, sortie, taille_chunk=TAILLE_CHUNK, n_workers=None, chemin_segments=None,
+                   moniteur=None):
+    """Score `entree` chunk par chunk et écrit `sortie`. Retourne le nombre de lignes scorées.
+
+    Avec un MoniteurDerive, les entrées et scores de chaque chunk alimentent ses esquisses.
+    """
+    ecrivain = EcrivainScores(sortie)
+    nb_lignes = 0
+    try:
+        for resultat in scorer_chunks(chemin_modele, entree, taille_chunk, n_workers, chemin_segments):
+            ecrivain.ecrire(resultat)
+            nb_lignes += len(resultat)
+            if moniteur is not None:
+                moniteur.observer_lot(resultat, resultat['propension'])
+    finally:
+        ecrivain.fermer()
+        if moniteur is not None:
+            moniteur.ecrire()
+    return nb_lignes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring en masse des prospects (propension + priorité).")
+    parser.add_argument("modele", help="Chemin local du modèle (.joblib ou forêt aplatie .npz)")
+    parser.add_argument("entree", help="Fichier prospects (.csv séparateur ';' ou .parquet)")
+    parser.add_argument("sortie", help="Fichier scoré (.csv ou .parquet)")
+    parser.add_argument("--chunk", type=int, default=TAILLE_CHUNK, help="Lignes par chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nb de CPU)")
+    parser.add_argument("--segments", default=None, help="Segmentation .npz : ajoute la colonne `segment`")
+    parser.add_argument("--profil", default=None, help="Profil de référence .json : esquisses de dérive du fichier scoré")
+    args = parser.parse_args()
+
+    moniteur = None
+    if args.profil:
+        from bank_marketing.config import dossier_derive
+        from bank_marketing.derive import Esquisses, MoniteurDerive
+
+        moniteur = MoniteurDerive(Esquisses.charger(args.profil), "scoring", dossier_derive())
+
+    debut = time.perf_counter()
+    nb = scorer_fichier(args.modele, args.entree, args.sortie, args.chunk, args.workers, args.segments, moniteur)
+    duree = time.perf_counter() - debut
+    print(f"✅ {nb} prospects scorés en {duree:.1f}s ({nb / max(duree, 1e-9):,.0f} lignes/s) -> {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
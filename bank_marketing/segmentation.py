@@ -0,0 +1,216 @@
+"""Segmentation des souscripteurs (ÉTAPE 11 du notebook 3) entraînée en flux et publiée.
+
+L'entraînement lit les données par chunks, en deux passes à mémoire bornée :
+1. moyennes / écarts-types des variables (fusion des statistiques par chunk) ;
+2. K-Means par mini-lots (MiniBatchKMeans.partial_fit) sur les chunks standardisés.
+Seuls le scaler, les centroïdes et les profils sont sauvegardés (.npz, NumPy pur
+comme la forêt aplatie) : l'affectation d'un client au segment le plus proche
+ne demande ni sklearn ni DataFrame.
+
+Une variable absente des lignes à affecter (ex. `duration`, inconnue avant
+l'appel dans le simulateur) est ignorée : distance calculée sur les autres.
+
+Usage :
+    python -m bank_marketing.segmentation historique.parquet model_bank_marketing_v1_segments.npz
+"""
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+
+from bank_marketing.cache_s3 import est_introuvable
+from bank_marketing.config import COLONNE_CIBLE
+
+journal = logging.getLogger(__name__)
+
+FEATURES_SEGMENTATION = ['age', 'solde_bancaire', 'duration', 'campaign']
+N_SEGMENTS = 3
+
+CLE_SEGMENTS = "model_bank_marketing_v1_segments.npz"
+
+
+def surnom(profil):
+    """Surnom d'un segment à partir de son profil moyen (règles du notebook)."""
+    age, solde, duree = (profil.get(c, np.nan) for c in ('age', 'solde_bancaire', 'duration'))
+    if age > 55:
+        return "👴 LE SENIOR ÉCONOME"
+    if age < 33 and solde < 1000:
+        return "🎓 LE JUNIOR / DÉBUT DE CARRIÈRE"
+    if solde > 2000:
+        return "💎 LE PROFIL PREMIUM"
+    if duree > 500:
+        return "📞 LE PROFIL 'BESOIN D'ÉCOUTE'"
+    return "Profil Standard"
+
+
+class StatistiquesFlux:
+    """Moyenne et variance par colonne, fusionnées chunk par chunk (Chan et al.)."""
+
+    def __init__(self, n_colonnes):
+        self.n = 0
+        self.moyenne = np.zeros(n_colonnes)
+        self.m2 = np.zeros(n_colonnes)
+
+    def ajouter(self, X):
+        n_b = X.shape[0]
+        if n_b == 0:
+            return
+        moyenne_b = X.mean(axis=0)
+        m2_b = ((X - moyenne_b) ** 2).sum(axis=0)
+        total = self.n + n_b
+        delta = moyenne_b - self.moyenne
+        self.moyenne = self.moyenne + delta * n_b / total
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.n * n_b / total
+        self.n = total
+
+    @property
+    def ecart_type(self):
+        ecart = np.sqrt(self.m2 / max(self.n, 1))
+        # Variable constante : pas de mise à l'échelle (comme StandardScaler)
+        return np.where(ecart > 0, ecart, 1.0)
+
+
+class Segmentation:
+    """Scaler + centroïdes : affectation vectorisée au centroïde le plus proche."""
+
+    def __init__(self, moyenne, ecart, centres, effectifs, features=FEATURES_SEGMENTATION, noms=None):
+        self.features = list(features)
+        self.moyenne = np.asarray(moyenne, dtype=np.float64)
+        self.ecart = np.asarray(ecart, dtype=np.float64)
+        self.centres = np.asarray(centres, dtype=np.float64)
+        self.effectifs = np.asarray(effectifs, dtype=np.int64)
+        self.noms = list(noms) if noms is not None else [surnom(p) for p in self.profils()]
+
+    @property
+    def n_segments(self):
+        return self.centres.shape[0]
+
+    def profils(self):
+        """Centroïdes dans les unités d'origine, un dict par segment."""
+        return [dict(zip(self.features, c)) for c in self.centres * self.ecart + self.moyenne]
+
+    # --- AFFECTATION ---
+    def affecter_matrice(self, X, colonnes=None):
+        """Indice du segment le plus proche pour chaque ligne de X (colonnes = sous-ensemble de features)."""
+        indices = [self.features.index(c) for c in colonnes] if colonnes is not None else slice(None)
+        Z = (np.asarray(X, dtype=np.float64) - self.moyenne[indices]) / self.ecart[indices]
+        # Valeur manquante : à la moyenne (n'influence pas le choix du segment)
+        Z = np.nan_to_num(Z, nan=0.0)
+        centres = self.centres[:, indices]
+        # ||z - c||² = ||z||² - 2 z.c + ||c||² ; ||z||² ne change pas l'argmin
+        distances = (centres ** 2).sum(axis=1) - 2 * Z @ centres.T
+        return distances.argmin(axis=1).astype(np.int8)
+
+    def affecter(self, df):
+        """Segments (int8) d'un DataFrame ; variables absentes ignorées."""
+        colonnes = [c for c in self.features if c in df.columns]
+        if not colonnes:
+            raise ValueError(f"Aucune variable de segmentation ({', '.join(self.features)}) dans les données.")
+        return self.affecter_matrice(df[colonnes].to_numpy(dtype=np.float64), colonnes)
+
+    def affecter_client(self, client):
+        """Segment d'un client saisi (dict) ; variables absentes ignorées."""
+        colonnes = [c for c in self.features if client.get(c) is not None]
+        return int(self.affecter_matrice(np.array([[client[c] for c in colonnes]], dtype=np.float64), colonnes)[0])
+
+    # --- PERSISTANCE ---
+    def sauvegarder(self, chemin):
+        np.savez(
+            chemin,
+            moyenne=self.moyenne, ecart=self.ecart, centres=self.centres, effectifs=self.effectifs,
+            meta=np.asarray(json.dumps({'features': self.features, 'noms': self.noms}, ensure_ascii=False))
+        )
+
+    @classmethod
+    def charger(cls, source):
+        with np.load(source, allow_pickle=False) as archive:
+            meta = json.loads(str(archive['meta']))
+            return cls(archive['moyenne'], archive['ecart'], archive['centres'], archive['effectifs'],
+                       meta['features'], meta['noms'])
+
+
+def charger_segmentation_publiee(cache, bucket):
+    """Segmentation publiée à côté du modèle (cache disque S3), ou None si elle ne l'est pas."""
+    try:
+        return Segmentation.charger(cache.recuperer(bucket, CLE_SEGMENTS))
+    except Exception as e:
+        if not est_introuvable(e):
+            # Segments publiés mais illisibles (S3 injoignable, fichier corrompu...) : signalés, pas pris pour une absence
+            journal.warning("Segmentation %s illisible : %r", CLE_SEGMENTS, e, exc_info=True)
+        return None
+
+
+# --- ENTRAÎNEMENT EN FLUX ---
+def _matrice(chunk, features, souscripteurs_seulement):
+    if souscripteurs_seulement:
+        chunk = chunk[chunk[COLONNE_CIBLE] == 'yes']
+    return chunk[features].to_numpy(dtype=np.float64)
+
+
+def entrainer(lots, n_segments=N_SEGMENTS, features=FEATURES_SEGMENTATION, souscripteurs_seulement=True,
+              graine=42):
+    """Entraîne la segmentation sur un flux rejouable : `lots()` renvoie un itérateur de DataFrames.
+
+    Mémoire bornée par la taille d'un chunk. Par défaut, comme le notebook,
+    seuls les clients qui ont souscrit sont segmentés.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    statistiques = StatistiquesFlux(len(features))
+    for chunk in lots():
+        statistiques.ajouter(_matrice(chunk, features, souscripteurs_seulement))
+    if statistiques.n < n_segments:
+        raise ValueError(f"Pas assez de lignes pour {n_segments} segments ({statistiques.n}).")
+    moyenne, ecart = statistiques.moyenne, statistiques.ecart_type
+
+    kmeans = MiniBatchKMeans(n_clusters=n_segments, random_state=graine, n_init=3)
+    effectifs = np.zeros(n_segments, dtype=np.int64)
+    en_attente = []
+    for chunk in lots():
+        Z = (_matrice(chunk, features, souscripteurs_seulement) - moyenne) / ecart
+        # Mini-lots d'au moins 1024 lignes : un chunk filtré sur les souscripteurs peut être presque vide
+        en_attente.append(Z)
+        if sum(len(z) for z in en_attente) < max(n_segments, 1024):
+            continue
+        effectifs += _mise_a_jour(kmeans, en_attente, n_segments)
+        en_attente = []
+    if en_attente:
+        effectifs += _mise_a_jour(kmeans, en_attente, n_segments)
+
+    return Segmentation(moyenne, ecart, kmeans.cluster_centers_, effectifs, features)
+
+
+def _mise_a_jour(kmeans, blocs, n_segments):
+    # Effectifs comptés avec les centres du moment : approximation suffisante pour le poids des segments
+    kmeans.partial_fit(np.concatenate(blocs))
+    return np.bincount(kmeans.labels_, minlength=n_segments)
+
+
+def main():
+    from bank_marketing.scoring import lire_par_chunks
+
+    parser = argparse.ArgumentParser(description="Segmentation des souscripteurs (MiniBatchKMeans en flux).")
+    parser.add_argument("entree", help="Historique (.csv séparateur ';' ou .parquet)")
+    parser.add_argument("sortie", help="Segmentation .npz (scaler + centroïdes)")
+    parser.add_argument("--segments", type=int, default=N_SEGMENTS)
+    parser.add_argument("--chunk", type=int, default=500_000, help="Lignes lues par chunk")
+    parser.add_argument("--tous", action='store_true', help="Segmenter tous les clients, pas seulement les souscripteurs")
+    args = parser.parse_args()
+
+    colonnes = FEATURES_SEGMENTATION + ([] if args.tous else [COLONNE_CIBLE])
+    debut = time.perf_counter()
+    segmentation = entrainer(lambda: lire_par_chunks(args.entree, args.chunk, colonnes), args.segments,
+                             souscripteurs_seulement=not args.tous)
+    segmentation.sauvegarder(args.sortie)
+    print(f"✅ {segmentation.effectifs.sum():,} clients segmentés en {time.perf_counter() - debut:.1f}s -> {args.sortie}")
+    part = segmentation.effectifs / max(segmentation.effectifs.sum(), 1) * 100
+    for i, (nom, profil) in enumerate(zip(segmentation.noms, segmentation.profils())):
+        print(f"🧬 GROUPE N°{i + 1} : {nom} | {part[i]:.1f}% | âge {profil['age']:.0f} ans | "
+              f"solde {profil['solde_bancaire']:.0f} € | appel {profil['duration'] / 60:.1f} min | "
+              f"{profil['campaign']:.1f} contacts")
+
+
+if __name__ == "__main__":
+    main()
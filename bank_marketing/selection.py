@@ -0,0 +1,155 @@
+"""Sélection en continu des K meilleurs leads sous budget d'appels.
+
+Les chunks scorés traversent un tampon de K lignes au plus : chaque chunk est
+réduit à ses meilleurs candidats (argpartition), fusionné au tampon, puis le
+tout est recoupé à K. La mémoire reste en O(K + taille d'un chunk), quel que
+soit le nombre de prospects scorés ; rien n'est écrit avant la liste finale.
+
+Options :
+- règle des 3 appels (section « Acharnement vs Efficacité » du dashboard) :
+  les prospects déjà appelés plus de `max_appels` fois sont écartés ;
+- quotas par modalité d'une colonne (`metier` ou `mois`) : au plus q leads
+  par valeur, les places libérées reviennent aux suivants du classement.
+
+Usage :
+    python -m bank_marketing.selection model_bank_marketing_v1_foret.npz prospects.parquet appels.csv --top 5000
+    python -m bank_marketing.selection modele.joblib prospects.csv appels.csv --top 5000 \
+        --quota-colonne metier --quota 800 --quota-valeur student=200
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.scoring import TAILLE_CHUNK, EcrivainScores, scorer_chunks
+
+# Au-delà de 3 appels, la probabilité de vente devient quasi nulle (dashboard, section 3.B)
+MAX_APPELS = 3
+COLONNE_SCORE = 'propension'
+
+
+class SelecteurTopK:
+    """Garde les `k` leads de meilleur score parmi tous les chunks reçus.
+
+    `quotas` : dict {valeur: plafond} pour `colonne_quota` ; `quota_defaut`
+    plafonne les valeurs absentes du dict (None : pas de plafond). À score égal,
+    le lead arrivé le premier est gardé.
+    """
+
+    def __init__(self, k, colonne_quota=None, quotas=None, quota_defaut=None,
+                 max_appels=MAX_APPELS, colonne_score=COLONNE_SCORE):
+        if k <= 0:
+            raise ValueError("Le nombre de leads à garder doit être positif.")
+        self.k = int(k)
+        self.colonne_quota = colonne_quota
+        self.quotas = dict(quotas or {})
+        self.quota_defaut = quota_defaut
+        self.max_appels = max_appels
+        self.colonne_score = colonne_score
+        self._tampon = None
+        self._recus = 0
+        self.ecartes_regle_appels = 0
+
+    @property
+    def avec_quotas(self):
+        return self.colonne_quota is not None and (self.quotas or self.quota_defaut is not None)
+
+    def ajouter(self, chunk):
+        """Intègre un chunk scoré (contient `colonne_score`)."""
+        ordre = np.arange(self._recus, self._recus + len(chunk))
+        self._recus += len(chunk)
+        if self.max_appels is not None and 'campaign' in chunk.columns:
+            eligibles = (chunk['campaign'] <= self.max_appels).to_numpy()
+            self.ecartes_regle_appels += int((~eligibles).sum())
+            chunk, ordre = chunk[eligibles], ordre[eligibles]
+        if len(chunk) == 0:
+            return
+
+        if not self.avec_quotas and len(chunk) > self.k:
+            # Préfiltre O(n) : seuls les k meilleurs du chunk peuvent entrer dans le tampon
+            # (les ex-aequo du k-ième score sont tous gardés, l'ordre d'arrivée tranche ensuite)
+            scores = chunk[self.colonne_score].to_numpy()
+            kieme = np.partition(scores, len(scores) - self.k)[len(scores) - self.k]
+            candidats = scores >= kieme
+            chunk, ordre = chunk[candidats], ordre[candidats]
+
+        chunk = chunk.assign(_ordre=ordre)
+        fusion = chunk if self._tampon is None else pd.concat([self._tampon, chunk], ignore_index=True)
+        self._tampon = self._reduire(fusion)
+
+    def _reduire(self, df):
+        df = df.sort_values([self.colonne_score, '_ordre'], ascending=[False, True], kind='stable')
+        if self.avec_quotas:
+            rang = df.groupby(self.colonne_quota, observed=True, sort=False).cumcount().to_numpy()
+            plafonds = df[self.colonne_quota].map(self.quotas).astype('float64')
+            if self.quota_defaut is not None:
+                plafonds = plafonds.fillna(self.quota_defaut)
+            # Sans plafond (NaN) : la comparaison est fausse, la ligne reste
+            df = df[~(rang >= plafonds.to_numpy())]
+        return df.head(self.k).reset_index(drop=True)
+
+    def resultat(self):
+        """Liste d'appels finale, triée par score décroissant (colonne `rang` à partir de 1)."""
+        if self._tampon is None:
+            return pd.DataFrame()
+        liste = self._tampon.drop(columns='_ordre')
+        liste.insert(0, 'rang', np.arange(1, len(liste) + 1))
+        return liste
+
+
+def selectionner_fichier(chemin_modele, entree, sortie, selecteur, taille_chunk=TAILLE_CHUNK, n_workers=None):
+    """Score `entree` sur le pool de scoring et n'écrit que la liste d'appels. Renvoie (lus, gardés)."""
+    nb_lus = 0
+    for chunk in scorer_chunks(chemin_modele, entree, taille_chunk, n_workers):
+        selecteur.ajouter(chunk)
+        nb_lus += len(chunk)
+    liste = selecteur.resultat()
+    ecrivain = EcrivainScores(sortie)
+    try:
+        ecrivain.ecrire(liste)
+    finally:
+        ecrivain.fermer()
+    return nb_lus, len(liste)
+
+
+def lire_quotas(valeurs):
+    """['student=200', 'retired=300'] -> {'student': 200, 'retired': 300}."""
+    quotas = {}
+    for texte in valeurs or []:
+        valeur, _, plafond = texte.rpartition('=')
+        if not valeur:
+            raise ValueError(f"Quota invalide : {texte} (attendu valeur=plafond)")
+        quotas[valeur] = int(plafond)
+    return quotas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Liste d'appels : les K meilleurs prospects, en mémoire bornée.")
+    parser.add_argument("modele", help="Chemin local du modèle (.joblib ou forêt aplatie .npz)")
+    parser.add_argument("entree", help="Fichier prospects (.csv séparateur ';' ou .parquet)")
+    parser.add_argument("sortie", help="Liste d'appels (.csv ou .parquet)")
+    parser.add_argument("--top", type=int, required=True, help="Nombre de leads à appeler (budget d'appels)")
+    parser.add_argument("--quota-colonne", choices=['metier', 'mois'], help="Colonne soumise à quotas")
+    parser.add_argument("--quota", type=int, default=None, help="Plafond par valeur de la colonne")
+    parser.add_argument("--quota-valeur", action='append', metavar="VALEUR=PLAFOND",
+                        help="Plafond propre à une valeur (répétable)")
+    parser.add_argument("--max-appels", type=int, default=MAX_APPELS,
+                        help="Écarte les prospects déjà appelés plus de N fois (0 : désactivé)")
+    parser.add_argument("--chunk", type=int, default=TAILLE_CHUNK, help="Lignes par chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nb de CPU)")
+    args = parser.parse_args()
+
+    selecteur = SelecteurTopK(
+        args.top, args.quota_colonne, lire_quotas(args.quota_valeur), args.quota,
+        max_appels=args.max_appels or None
+    )
+    debut = time.perf_counter()
+    nb_lus, nb_gardes = selectionner_fichier(args.modele, args.entree, args.sortie, selecteur, args.chunk, args.workers)
+    duree = time.perf_counter() - debut
+    regle = f", {selecteur.ecartes_regle_appels} écartés par la règle des {args.max_appels} appels" if args.max_appels else ""
+    print(f"✅ {nb_gardes} leads retenus sur {nb_lus} scorés{regle} en {duree:.1f}s -> {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""Service HTTP de scoring pour le CRM : même modèle et même schéma de features que le simulateur.
+
+Les requêtes concurrentes sont regroupées en micro-lots : un thread unique
+attend au plus `attente_max_ms` après la première requête (ou `taille_max`
+clients), encode tout le lot dans une matrice préallouée et fait un seul
+predict_proba. Chaque requête est validée avant d'entrer dans la file (400
+sinon) et ses erreurs restent les siennes : une requête invalide ne fait
+jamais échouer les autres requêtes du lot. Au-delà de `delai_s`, la requête
+est abandonnée (503). Serveur HTTP de la bibliothèque standard (aucune dépendance).
+
+    POST /score     {"clients": [{...}, ...]} ou un seul client {...}
+                    -> {"resultats": [{"propension": 42.1, "priorite": "HAUTE"}, ...]}
+    GET  /health    modèle chargé, taille de la file
+    GET  /metrics   requêtes, clients, lots, taille moyenne des lots, latences p50/p99
+    GET  /derive    PSI / KS des entrées et du score de l'heure en cours contre le profil de référence
+
+Usage :
+    python -m bank_marketing.service model_bank_marketing_v1_foret.npz --port 8080
+    python -m bank_marketing.service --s3 --port 8080          # modèle publié (cache S3)
+    python -m bank_marketing.service modele.joblib --taille-max 1   # sans micro-lots
+    python -m bank_marketing.service modele.joblib --delai-s 1      # 503 au-delà d'une seconde
+    python -m bank_marketing.service modele.joblib --profil model_bank_marketing_v1_profil.json  # + dérive
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as DelaiDepasse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from bank_marketing.features import EncodeurCompile, segmenter_pdays
+from bank_marketing.scoring import niveau_priorite, predire_proba
+
+TAILLE_MAX = 256
+ATTENTE_MAX_MS = 2.0
+# Attente max d'une requête HTTP (file + lot) avant de répondre 503
+DELAI_S = 5.0
+# Latences gardées pour les percentiles de /metrics
+FENETRE_LATENCES = 10_000
+
+
+class MicroLots:
+    """File de requêtes servie par un thread : un predict_proba par micro-lot."""
+
+    def __init__(self, model, encodeur=None, taille_max=TAILLE_MAX, attente_max_ms=ATTENTE_MAX_MS, moniteur=None,
+                 delai_s=DELAI_S):
+        self.model = model
+        self.encodeur = encodeur or EncodeurCompile.depuis_modele(model)
+        self.moniteur = moniteur
+        self.taille_max = taille_max
+        self.attente_max = attente_max_ms / 1000
+        self.delai_s = delai_s
+        self._file = deque()
+        self._condition = threading.Condition()
+        self._matrice = np.zeros((taille_max, self.encodeur.nb_features), dtype=np.float64)
+        self._arret = False
+
+        self.nb_lots = 0
+        self.nb_clients = 0
+        self._tailles_lots = deque(maxlen=FENETRE_LATENCES)
+        self._thread = threading.Thread(target=self._boucle, name="micro-lots", daemon=True)
+        self._thread.start()
+
+    def soumettre(self, clients):
+        """Future résolue avec (propensions en %, priorités) pour cette liste de clients."""
+        futur = Future()
+        with self._condition:
+            self._file.append((clients, futur))
+            self._condition.notify()
+        return futur
+
+    def scorer(self, clients):
+        """(propensions, priorités) ; DelaiDepasse si le lot n'est pas servi dans `delai_s`."""
+        futur = self.soumettre(clients)
+        try:
+            return futur.result(timeout=self.delai_s)
+        except DelaiDepasse:
+            # Encore dans la file : retirée du prochain lot (déjà en cours : résultat ignoré)
+            futur.cancel()
+            raise
+
+    def arreter(self):
+        with self._condition:
+            self._arret = True
+            self._condition.notify()
+        self._thread.join()
+
+    @property
+    def en_attente(self):
+        return len(self._file)
+
+    def _collecter(self):
+        """Requêtes du prochain lot : dès `taille_max` clients ou `attente_max` après la première."""
+        with self._condition:
+            while not self._file and not self._arret:
+                self._condition.wait()
+            if self._arret:
+                return []
+            echeance = time.perf_counter() + self.attente_max
+            lot, nb = [], 0
+            while True:
+                while self._file and nb + len(self._file[0][0]) <= self.taille_max:
+                    requete = self._file.popleft()
+                    # Requête abandonnée (délai dépassé) : pas scorée
+                    if requete[1].set_running_or_notify_cancel():
+                        lot.append(requete)
+                        nb += len(requete[0])
+                if not lot and self._file:
+                    # Requête plus grosse qu'un lot : servie seule
+                    requete = self._file.popleft()
+                    if requete[1].set_running_or_notify_cancel():
+                        lot.append(requete)
+                        break
+                    continue
+                reste = echeance - time.perf_counter()
+                if nb >= self.taille_max or (self._file and nb > 0) or reste <= 0:
+                    break
+                self._condition.wait(reste)
+            return lot
+
+    def _boucle(self):
+        while not self._arret:
+            lot = []
+            try:
+                lot = self._collecter()
+                if lot:
+                    self._traiter(lot)
+            except Exception as e:
+                # Le thread ne doit jamais s'arrêter : sinon toutes les requêtes suivantes attendent
+                for _, futur in lot:
+                    if not futur.done():
+                        futur.set_exception(e)
+
+    def _traiter(self, lot):
+        nb = sum(len(requete) for requete, _ in lot)
+        if nb <= self.taille_max:
+            matrice = self._matrice
+        else:
+            matrice = np.zeros((nb, self.encodeur.nb_features), dtype=np.float64)
+
+        # Encodage requête par requête : une requête en erreur échoue seule, ses lignes
+        # sont réécrites par la suivante
+        servies, clients = [], []
+        for requete, futur in lot:
+            try:
+                completes = [completer_client(client) for client in requete]
+                for i, client in enumerate(completes, start=len(clients)):
+                    self.encodeur.encoder_client(client, out=matrice[i:i + 1])
+            except Exception as e:
+                futur.set_exception(e)
+                continue
+            servies.append((requete, futur))
+            clients.extend(completes)
+        if not servies:
+            return
+
+        try:
+            score = np.round(predire_proba(self.model, matrice[:len(clients)]) * 100, 2)
+            priorite = niveau_priorite(score)
+            if self.moniteur is not None:
+                self.moniteur.observer_clients(clients, score.tolist())
+        except Exception as e:
+            for _, futur in servies:
+                futur.set_exception(e)
+            return
+
+        self.nb_lots += 1
+        self.nb_clients += len(clients)
+        self._tailles_lots.append(len(clients))
+        debut = 0
+        for requete, futur in servies:
+            fin = debut + len(requete)
+            futur.set_result((score[debut:fin], priorite[debut:fin]))
+            debut = fin
+
+    def taille_moyenne_lots(self):
+        tailles = list(self._tailles_lots)
+        return float(np.mean(tailles)) if tailles else 0.0
+
+
+class Metriques:
+
+    def __init__(self):
+        self.debut = time.time()
+        self.requetes = 0
+        self.erreurs = 0
+        self._latences = deque(maxlen=FENETRE_LATENCES)
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, duree, erreur=False):
+        with self._verrou:
+            self.requetes += 1
+            self.erreurs += int(erreur)
+            self._latences.append(duree)
+
+    def resume(self, lots):
+        with self._verrou:
+            latences = np.asarray(self._latences) * 1000
+        return {
+            'uptime_s': round(time.time() - self.debut, 1),
+            'requetes': self.requetes,
+            'erreurs': self.erreurs,
+            'clients_scores': lots.nb_clients,
+            'lots': lots.nb_lots,
+            'taille_moyenne_lot': round(lots.taille_moyenne_lots(), 2),
+            'en_attente': lots.en_attente,
+            'latence_p50_ms': round(float(np.percentile(latences, 50)), 3) if latences.size else None,
+            'latence_p99_ms': round(float(np.percentile(latences, 99)), 3) if latences.size else None
+        }
+
+
+def completer_client(client):
+    """segment_contact dérivé de pdays quand le CRM ne l'envoie pas (comme preparer_clients)."""
+    if 'segment_contact' not in client and 'pdays' in client:
+        return {**client, 'segment_contact': str(segmenter_pdays(client['pdays']))}
+    return client
+
+
+def valider_client(client, encodeur):
+    """Client complété, ou ValueError (400) avant d'entrer dans la file."""
+    for col, _ in encodeur.numeriques:
+        valeur = client.get(col, 0)
+        if isinstance(valeur, bool) or not isinstance(valeur, (int, float)):
+            raise ValueError(f"{col} : nombre attendu, reçu {valeur!r}")
+    for col in encodeur.categorielles:
+        if isinstance(client.get(col), (dict, list)):
+            raise ValueError(f"{col} : modalité attendue, reçu {client[col]!r}")
+    return completer_client(client)
+
+
+def lire_clients(corps):
+    """Corps JSON -> liste de dicts clients (un client, une liste, ou {"clients": [...]})."""
+    donnees = json.loads(corps)
+    if isinstance(donnees, dict) and 'clients' in donnees:
+        donnees = donnees['clients']
+    clients = [donnees] if isinstance(donnees, dict) else donnees
+    if not isinstance(clients, list) or not all(isinstance(c, dict) for c in clients):
+        raise ValueError("Attendu : un client (objet JSON), une liste de clients ou {\"clients\": [...]}")
+    return clients
+
+
+def creer_gestionnaire(lots, metriques):
+
+    class Gestionnaire(BaseHTTPRequestHandler):
+        # HTTP/1.1 : connexions persistantes (Content-Length toujours renseigné)
+        protocol_version = "HTTP/1.1"
+
+        def _repondre(self, statut, contenu):
+            corps = json.dumps(contenu, ensure_ascii=False).encode('utf-8')
+            self.send_response(statut)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._repondre(200, {'statut': 'ok', 'features': lots.encodeur.nb_features, 'en_attente': lots.en_attente})
+            elif self.path == "/metrics":
+                self._repondre(200, metriques.resume(lots))
+            elif self.path == "/derive" and lots.moniteur is not None:
+                from bank_marketing.derive import comparer
+
+                comparaison = comparer(lots.moniteur.reference, lots.moniteur.esquisses())
+                self._repondre(200, json.loads(comparaison.to_json(orient='records', force_ascii=False)))
+            else:
+                self._repondre(404, {'erreur': f"Route inconnue : {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._repondre(404, {'erreur': f"Route inconnue : {self.path}"})
+                return
+            debut = time.perf_counter()
+            try:
+                clients = lire_clients(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                clients = [valider_client(client, lots.encodeur) for client in clients]
+            except ValueError as e:
+                metriques.enregistrer(time.perf_counter() - debut, erreur=True)
+                self._repondre(400, {'erreur': str(e)})
+                return
+            if not clients:
+                metriques.enregistrer(time.perf_counter() - debut)
+                self._repondre(200, {'resultats': []})
+                return
+            try:
+                score, priorite = lots.scorer(clients)
+            except DelaiDepasse:
+                metriques.enregistrer(time.perf_counter() - debut, erreur=True)
+                self._repondre(503, {'erreur': f"Scoring non servi en {lots.delai_s} s, réessayer"})
+                return
+            except Exception as e:
+                metriques.enregistrer(time.perf_counter() - debut, erreur=True)
+                self._repondre(500, {'erreur': str(e)})
+                return
+            resultats = [{'propension': float(s), 'priorite': str(p)} for s, p in zip(score, priorite)]
+            metriques.enregistrer(time.perf_counter() - debut)
+            self._repondre(200, {'resultats': resultats})
+
+        def log_message(self, format, *args):
+            # Pas de ligne de log par requête sur le chemin chaud
+            pass
+
+    return Gestionnaire
+
+
+class ServeurScoring(ThreadingHTTPServer):
+    daemon_threads = True
+    # File d'attente du listen() (5 par défaut) : au-delà, les connexions simultanées sont refusées
+    request_queue_size = 256
+
+
+def creer_serveur(model, hote="0.0.0.0", port=8080, taille_max=TAILLE_MAX, attente_max_ms=ATTENTE_MAX_MS,
+                  moniteur=None, delai_s=DELAI_S):
+    """Serveur prêt à `serve_forever()` ; `serveur.lots` et `serveur.metriques` restent accessibles."""
+    lots = MicroLots(model, taille_max=taille_max, attente_max_ms=attente_max_ms, moniteur=moniteur, delai_s=delai_s)
+    metriques = Metriques()
+    serveur = ServeurScoring((hote, port), creer_gestionnaire(lots, metriques))
+    serveur.lots = lots
+    serveur.metriques = metriques
+    return serveur
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP de scoring par micro-lots.")
+    parser.add_argument("modele", nargs='?', help="Chemin local du modèle (.joblib ou forêt aplatie .npz)")
+    parser.add_argument("--s3", action='store_true', help="Charge le modèle publié sur S3 (cache disque)")
+    parser.add_argument("--hote", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--taille-max", type=int, default=TAILLE_MAX, help="Clients max par micro-lot (1 : sans micro-lots)")
+    parser.add_argument("--attente-max-ms", type=float, default=ATTENTE_MAX_MS, help="Attente max avant de lancer un lot")
+    parser.add_argument("--delai-s", type=float, default=DELAI_S, help="Attente max d'une requête avant 503")
+    parser.add_argument("--profil", help="Profil de référence .json : surveillance de la dérive (défaut avec --s3 : profil publié)")
+    args = parser.parse_args()
+
+    reference = None
+    if args.s3:
+        from dotenv import load_dotenv
+
+        from bank_marketing.config import cache_artefacts, nom_bucket
+        from bank_marketing.scoring import charger_modele_publie
+
+        load_dotenv()
+        model = charger_modele_publie(cache_artefacts(), nom_bucket())
+        if not args.profil:
+            from bank_marketing.derive import charger_profil_publie
+
+            reference = charger_profil_publie(cache_artefacts(), nom_bucket())
+    elif args.modele:
+        from bank_marketing.scoring import charger_modele_local
+
+        model = charger_modele_local(args.modele)
+    else:
+        parser.error("Indiquez un chemin de modèle ou --s3")
+
+    moniteur = None
+    if args.profil or reference is not None:
+        from bank_marketing.config import dossier_derive
+        from bank_marketing.derive import Esquisses, MoniteurDerive
+
+        reference = reference or Esquisses.charger(args.profil)
+        moniteur = MoniteurDerive(reference, "service", dossier_derive()).demarrer()
+
+    serveur = creer_serveur(model, args.hote, args.port, args.taille_max, args.attente_max_ms, moniteur,
+                            args.delai_s)
+    print(f"✅ Service de scoring sur http://{args.hote}:{args.port} "
+          f"(lots de {args.taille_max} max, attente {args.attente_max_ms} ms)", flush=True)
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+        serveur.lots.arreter()
+        if moniteur is not None:
+            moniteur.arreter()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Balayages what-if du simulateur : toutes les variantes d'un profil scorées en un seul appel."""
+import threading
+from collections import OrderedDict
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.config import ORDRE_MOIS
+from bank_marketing.scoring import predire_proba
+
+# Valeurs balayées pour chaque levier (mêmes bornes que les widgets de la sidebar)
+LEVIERS = {
+    'age': list(range(18, 96)),
+    'solde_bancaire': [-5000, -2000, -1000, 0, 500, 1000, 1500, 2000, 3000, 5000,
+                       7500, 10000, 15000, 20000, 30000, 50000, 75000, 100000],
+    'campaign': list(range(1, 11)),
+    'mois': ORDRE_MOIS,
+    'previous': list(range(0, 31))
+}
+
+LIBELLES_LEVIERS = {
+    'age': "Âge du client",
+    'solde_bancaire': "Solde Bancaire (€)",
+    'campaign': "Nb appels cette campagne",
+    'mois': "Mois de l'appel",
+    'previous': "Nombre d'interactions passées"
+}
+
+
+def construire_grille(encodeur, client, leviers):
+    """Matrice encodée de toutes les combinaisons des `leviers` autour du profil `client`."""
+    combinaisons = list(product(*(LEVIERS[levier] for levier in leviers)))
+    base = encodeur.encoder_client(client, out=np.zeros((1, encodeur.nb_features), dtype=np.float64))
+    matrice = np.repeat(base, len(combinaisons), axis=0)
+    for j, levier in enumerate(leviers):
+        encodeur.affecter(matrice, levier, [combo[j] for combo in combinaisons])
+    return pd.DataFrame(combinaisons, columns=list(leviers)), matrice
+
+
+class BalayageSensibilite:
+    """Balayages mémorisés (LRU) par profil de base et leviers choisis, partagés par les sessions (thread-safe)."""
+
+    def __init__(self, model, encodeur, taille_cache=128):
+        self.model = model
+        self.encodeur = encodeur
+        self.taille_cache = taille_cache
+        self._cache = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def balayer(self, client, leviers):
+        """DataFrame (leviers..., propension en %) pour 1 ou 2 leviers."""
+        leviers = tuple(leviers)
+        if not 1 <= len(leviers) <= 2:
+            raise ValueError("Le balayage porte sur un ou deux leviers.")
+        cle = (tuple(sorted(client.items())), leviers)
+        with self._verrou:
+            if cle in self._cache:
+                self._cache.move_to_end(cle)
+                return self._cache[cle]
+
+        # Grille et scoring hors verrou : les autres sessions lisent le cache pendant ce temps
+        grille, matrice = construire_grille(self.encodeur, client, leviers)
+        grille['propension'] = np.round(predire_proba(self.model, matrice) * 100, 2)
+
+        with self._verrou:
+            self._cache[cle] = grille
+            self._cache.move_to_end(cle)
+            while len(self._cache) > self.taille_cache:
+                self._cache.popitem(last=False)
+        return grille
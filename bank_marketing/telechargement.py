@@ -0,0 +1,125 @@
+"""Téléchargement S3 en GET par plages parallèles, exposé comme un flux lisible en continu.
+
+Le parseur consomme les octets au fil de l'eau pendant que les plages suivantes
+arrivent : téléchargement et parsing se recouvrent, et seule une fenêtre de
+`n_threads` plages est gardée en mémoire.
+"""
+import io
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+TAILLE_PART = 8 * 1024 * 1024
+N_THREADS = 8
+
+
+def taille_totale(reponse):
+    # "bytes 0-8388607/123456789" -> 123456789
+    plage = reponse.get('ContentRange')
+    if plage:
+        return int(plage.rsplit('/', 1)[1])
+    return int(reponse['ContentLength'])
+
+
+class FluxParallele(io.RawIOBase):
+    """Flux binaire en lecture seule alimenté par des GET par plages concurrents.
+
+    `premiere_reponse` est la réponse (partielle) déjà obtenue pour la première
+    plage. Chaque plage lue est recopiée dans `copie` si fourni ; `octets_lus`
+    et `total` donnent l'avancement (voir `avancement`).
+    """
+
+    def __init__(self, s3_client, bucket, key, premiere_reponse,
+                 taille_part=TAILLE_PART, n_threads=N_THREADS, copie=None, a_la_fin=None):
+        super().__init__()
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.etag = premiere_reponse.get('ETag')
+        self.total = taille_totale(premiere_reponse)
+        self.copie = copie
+        self.a_la_fin = a_la_fin
+        self.a_la_fermeture = None
+        self.octets_lus = 0
+
+        premiere_taille = int(premiere_reponse['ContentLength'])
+        self._plages = deque(
+            (debut, min(debut + taille_part, self.total) - 1)
+            for debut in range(premiere_taille, self.total, taille_part)
+        )
+        self._pool = ThreadPoolExecutor(max_workers=n_threads, thread_name_prefix="s3-plage")
+        self._en_vol = deque([self._pool.submit(premiere_reponse['Body'].read)])
+        for _ in range(n_threads):
+            self._planifier()
+        self._tampon = memoryview(b"")
+        self._termine = False
+
+    def _planifier(self):
+        if self._plages:
+            debut, fin = self._plages.popleft()
+            self._en_vol.append(self._pool.submit(self._lire_plage, debut, fin))
+
+    def _lire_plage(self, debut, fin):
+        options = {'IfMatch': self.etag} if self.etag else {}
+        reponse = self.s3_client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={debut}-{fin}", **options)
+        return reponse['Body'].read()
+
+    def readable(self):
+        return True
+
+    def readinto(self, destination):
+        while not self._tampon:
+            if not self._en_vol:
+                self._terminer()
+                return 0
+            morceau = self._en_vol.popleft().result()
+            self._planifier()
+            if self.copie is not None:
+                self.copie.write(morceau)
+            self.octets_lus += len(morceau)
+            self._tampon = memoryview(morceau)
+
+        n = min(len(destination), len(self._tampon))
+        destination[:n] = self._tampon[:n]
+        self._tampon = self._tampon[n:]
+        return n
+
+    def _terminer(self):
+        if not self._termine:
+            self._termine = True
+            if self.a_la_fin is not None and self.octets_lus == self.total:
+                self.a_la_fin(self)
+
+    def close(self):
+        if not self.closed:
+            for futur in self._en_vol:
+                futur.cancel()
+            self._pool.shutdown(wait=False)
+            if self.a_la_fermeture is not None:
+                self.a_la_fermeture()
+        super().close()
+
+
+def avancement(flux):
+    """(octets lus, taille totale) d'un flux parallèle ou d'un fichier local.
+
+    Le lecteur (ex. parseur CSV pyarrow) peut lire depuis ses propres threads :
+    l'appelant interroge l'avancement depuis le sien, où l'UI peut être mise à jour.
+    """
+    brut = getattr(flux, 'raw', flux)
+    if isinstance(brut, FluxParallele):
+        return brut.octets_lus, brut.total
+    return flux.tell(), os.fstat(flux.fileno()).st_size
+
+
+def ouvrir_flux(s3_client, bucket, key, etag_connu=None, taille_part=TAILLE_PART,
+                n_threads=N_THREADS, copie=None, a_la_fin=None):
+    """Ouvre `key` en flux parallèle ; lève l'erreur 304 de S3 si `etag_connu` est toujours valide.
+
+    La première plage sert aussi de requête conditionnelle (If-None-Match) et
+    donne la taille totale de l'objet.
+    """
+    options = {'IfNoneMatch': etag_connu} if etag_connu else {}
+    premiere = s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{taille_part - 1}", **options)
+    brut = FluxParallele(s3_client, bucket, key, premiere, taille_part, n_threads, copie, a_la_fin)
+    return io.BufferedReader(brut, buffer_size=1024 * 1024)
@@ -0,0 +1 @@
+"""Benchmarks reproductibles (hors application), contre le faux S3 local."""
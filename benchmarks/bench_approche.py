@@ -0,0 +1,101 @@
+"""Mode approché du dashboard : précision et vitesse de l'échantillon stratifié contre le cube exact.
+
+Le dataset synthétique arrive par lots (comme l'ingestion). Pour chaque taille
+de réservoir par strate :
+- exact   : cube de toutes les lignes (construire_cube) puis roll-ups du dashboard ;
+- approché : réservoirs alimentés lot par lot, cube pondéré de l'échantillon,
+  mêmes roll-ups + intervalles de confiance.
+Précision sur les taux affichés (global, métier, tranche d'âge, statut, mois,
+cellules métier x mois) : écart absolu en points et part des taux exacts
+couverts par l'intervalle à 95 %.
+
+Usage :
+    python -m benchmarks.bench_approche --lignes 5000000 --tailles 500 2000 5000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.config import COLONNES_DASHBOARD, ORDRE_MOIS
+from bank_marketing.cube import agreger, construire_cube, kpis, matrice, taux_par
+from bank_marketing.donnees import encoder_categories
+from bank_marketing.echantillon import ReservoirStratifie, intervalles
+from bank_marketing.generateur import generer_lot
+
+TAILLE_LOT = 1_000_000
+DOMAINES = [['metier'], ['age_group'], ['statut_matrimonial'], ['mois'], ['metier', 'mois']]
+
+
+def lots(n_lignes, seed=0):
+    rng = np.random.default_rng(seed)
+    for debut in range(0, n_lignes, TAILLE_LOT):
+        yield encoder_categories(generer_lot(min(TAILLE_LOT, n_lignes - debut), rng)[COLONNES_DASHBOARD])
+
+
+def roll_ups(cube):
+    """Ce que le dashboard calcule à chaque rerun sur le cube (hors figures)."""
+    return (kpis(cube), agreger(cube, ['metier']), taux_par(cube, 'age_group'),
+            taux_par(cube, 'statut_matrimonial'), agreger(cube, ['mois']), matrice(cube, 'metier', 'mois', ORDRE_MOIS))
+
+
+def chronometrer(fonction, repetitions=5):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        durees.append(time.perf_counter() - debut)
+    return np.median(durees), resultat
+
+
+def comparer(exact, approche):
+    """Écarts (points) et couverture des IC sur tous les domaines affichés."""
+    ecarts, couverts, signales = [], [], 0
+    for dimensions in DOMAINES + [['_tout']]:
+        e = intervalles(exact.assign(_tout=0), dimensions).set_index(dimensions)
+        a = intervalles(approche.assign(_tout=0), dimensions).set_index(dimensions).reindex(e.index)
+        ecarts.append((a['Taux_Conversion'] - e['Taux_Conversion']).abs().dropna())
+        couverts.append(((a['Borne_basse'] <= e['Taux_Conversion']) & (e['Taux_Conversion'] <= a['Borne_haute']))[a['Lignes'].notna()])
+        signales += int(a['Peu_de_lignes'].fillna(False).sum()) if dimensions == ['metier', 'mois'] else 0
+    ecarts, couverts = pd.concat(ecarts), pd.concat(couverts)
+    return ecarts.median(), ecarts.max(), couverts.mean() * 100, signales
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Précision / vitesse du mode approché du dashboard.")
+    parser.add_argument("--lignes", type=int, default=5_000_000)
+    parser.add_argument("--tailles", type=int, nargs='+', default=[500, 2000, 5000], help="Lignes gardées par strate")
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    tous_les_lots = list(lots(args.lignes))
+    print(f"{args.lignes:,} lignes générées en {time.perf_counter() - debut:.1f} s")
+
+    # Exact : tout l'historique en mémoire, cube complet
+    df = pd.concat(tous_les_lots, ignore_index=True)
+    duree_cube, exact = chronometrer(lambda: construire_cube(df), repetitions=1)
+    duree_rollups, _ = chronometrer(lambda: roll_ups(exact))
+    print(f"exact    | données {df.memory_usage(deep=True).sum() / 1024 ** 2:7.1f} Mo | cube {duree_cube:6.2f} s "
+          f"({len(exact):,} cellules) | roll-ups {duree_rollups * 1000:6.1f} ms")
+    del df
+
+    print("approché | taille/strate | échantillon | ajout/lot | cube     | roll-ups + IC | écart méd./max (pts) | couverture IC | cellules ⚠")
+    for taille in args.tailles:
+        reservoir = ReservoirStratifie(taille_par_strate=taille)
+        ajouts = []
+        for lot in tous_les_lots:
+            debut = time.perf_counter()
+            reservoir.ajouter(lot)
+            ajouts.append(time.perf_counter() - debut)
+        duree_cube, approche = chronometrer(reservoir.cube, repetitions=1)
+        duree_rollups, _ = chronometrer(lambda: (roll_ups(approche), intervalles(approche, ['metier']),
+                                                 intervalles(approche, ['metier', 'mois'])))
+        mediane, maximum, couverture, signales = comparer(exact, approche)
+        print(f"         | {taille:13,} | {reservoir.lignes_gardees:11,} | {np.median(ajouts):7.2f} s | "
+              f"{duree_cube:6.2f} s | {duree_rollups * 1000:10.1f} ms | {mediane:8.2f} / {maximum:5.2f}     | "
+              f"{couverture:10.1f} % | {signales:4d}")
+
+
+if __name__ == "__main__":
+    main()
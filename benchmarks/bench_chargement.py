@@ -0,0 +1,101 @@
+"""Chargement du CSV depuis S3 : ancien chargeur (Body.read + decode + read_csv)
+contre le flux par plages parallèles parsé en continu.
+
+Chaque chargeur tourne dans un sous-processus neuf pour mesurer son pic de
+mémoire (ru_maxrss) sans interférence. Le S3 est simulé sur disque (ClientS3Local).
+
+Usage :
+    python -m benchmarks.bench_chargement --lignes 2000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import StringIO
+
+import pandas as pd
+
+from bank_marketing.generateur import generer_fichier
+
+BUCKET = "bench"
+CLE = "bank_marketing_cleaned_v1.csv"
+
+
+# --- 1. CHARGEURS ---
+def charger_ancien(s3_client):
+    # Chargeur historique du dashboard : tout en mémoire, puis parsing
+    reponse = s3_client.get_object(Bucket=BUCKET, Key=CLE)
+    contenu = reponse['Body'].read().decode('utf-8')
+    return pd.read_csv(StringIO(contenu), sep=';')
+
+
+def charger_nouveau(s3_client, cache_dir):
+    from bank_marketing.cache_s3 import CacheArtefacts
+    from bank_marketing.donnees import lire_csv
+
+    # Cache vide : on mesure le téléchargement, pas la relecture disque.
+    # Toutes les colonnes, comme l'ancien chargeur (le dashboard n'en lit que 9)
+    cache = CacheArtefacts(s3_client, cache_dir)
+    with cache.ouvrir(BUCKET, CLE) as flux:
+        return lire_csv(flux, colonnes=None)
+
+
+def mesurer(mode, racine, cache_dir):
+    """Exécuté dans le sous-processus : temps mur et pic RSS d'un chargement."""
+    from bank_marketing.s3_local import ClientS3Local
+
+    s3_client = ClientS3Local(racine)
+    debut = time.perf_counter()
+    df = charger_ancien(s3_client) if mode == 'ancien' else charger_nouveau(s3_client, cache_dir)
+    duree = time.perf_counter() - debut
+    # ru_maxrss : Ko sous Linux, octets sous macOS
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pic_mo = pic / 1024 ** 2 if sys.platform == 'darwin' else pic / 1024
+    return {'mode': mode, 'lignes': len(df), 'secondes': round(duree, 3), 'pic_rss_mo': round(pic_mo, 1),
+            'memoire_df_mo': round(df.memory_usage(deep=True).sum() / 1024 ** 2, 1)}
+
+
+def lancer(mode, racine, cache_dir):
+    commande = [sys.executable, '-m', 'benchmarks.bench_chargement', '--mesurer', mode,
+                '--racine', racine, '--cache', cache_dir]
+    sortie = subprocess.run(commande, check=True, capture_output=True, text=True).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+# --- 2. POINT D'ENTRÉE ---
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du chargement CSV depuis S3 (faux S3 local).")
+    parser.add_argument("--lignes", type=int, default=1_000_000, help="Taille du CSV synthétique")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--mesurer", choices=['ancien', 'nouveau'], help=argparse.SUPPRESS)
+    parser.add_argument("--racine", help=argparse.SUPPRESS)
+    parser.add_argument("--cache", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mesurer:
+        print(json.dumps(mesurer(args.mesurer, args.racine, args.cache)))
+        return
+
+    with tempfile.TemporaryDirectory() as racine:
+        chemin = os.path.join(racine, BUCKET, CLE)
+        os.makedirs(os.path.dirname(chemin))
+        generer_fichier(chemin, args.lignes)
+        print(f"CSV : {args.lignes:,} lignes, {os.path.getsize(chemin) / 1024 ** 2:.0f} Mo")
+
+        for mode in ('ancien', 'nouveau'):
+            mesures = []
+            for _ in range(args.repetitions):
+                with tempfile.TemporaryDirectory() as cache_dir:
+                    mesures.append(lancer(mode, racine, cache_dir))
+            secondes = sorted(m['secondes'] for m in mesures)
+            print(f"{mode:8s} | médiane {secondes[len(secondes) // 2]:6.2f} s | "
+                  f"pic RSS {max(m['pic_rss_mo'] for m in mesures):7.0f} Mo | "
+                  f"DataFrame {mesures[0]['memoire_df_mo']:6.0f} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Démarrage à froid des pages : premier affichage et rendu complet de la première session.
+
+Chaque mesure tourne dans un process Python neuf (rien en mémoire, cache disque
+vide), avec le S3 simulé sur disque (ClientS3Local). La page est exécutée par
+streamlit.testing (même script, même moteur que le serveur). La première
+session arrive `--arrivee` secondes après le lancement du process (démarrage
+du serveur, health check, routage du répartiteur) ; les durées sont comptées
+depuis cette arrivée.
+
+Modes :
+- imports_en_tete  : imports lourds avant le premier élément (ancien ordre des pages) ;
+- imports_differes : pages actuelles, sans préchauffage (`streamlit run` direct) ;
+- prechauffage     : lanceur bank_marketing.demarrage (thread de fond dès le lancement).
+
+Usage :
+    python -m benchmarks.bench_demarrage --lignes 45211 --repetitions 5 --arrivee 0 2
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BUCKET = "bench"
+RACINE_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    'dashboard': ("1_Dashboard.py", "Premier affichage (dashboard)"),
+    'simulateur': (os.path.join("pages", "2_Simulateur.py"), "Premier affichage (simulateur)")
+}
+MODES = ('imports_en_tete', 'imports_differes', 'prechauffage')
+# Modules que les pages importaient en tête avant le premier élément
+MODULES_PAGES = ('bank_marketing.cube', 'bank_marketing.donnees', 'bank_marketing.ingestion',
+                 'bank_marketing.features', 'bank_marketing.scoring', 'bank_marketing.simulation')
+
+
+def mesurer(mode, page, arrivee):
+    """Exécuté dans le process neuf : jalons en secondes depuis l'arrivée de la session."""
+    from bank_marketing.demarrage import (MODULES_LOURDS, PRECHAUFFAGE, secondes_depuis_lancement,
+                                          taches_application)
+
+    # Comme le lanceur : Streamlit importé avant le thread de préchauffage
+    from streamlit.testing.v1 import AppTest
+
+    if mode == 'prechauffage':
+        PRECHAUFFAGE.lancer(taches_application())
+
+    script, jalon = PAGES[page]
+    app = AppTest.from_file(os.path.join(RACINE_PROJET, script), default_timeout=300)
+    time.sleep(max(arrivee - secondes_depuis_lancement(), 0))
+    debut = secondes_depuis_lancement()
+    if mode == 'imports_en_tete':
+        # Ancien ordre : la session importe tout avant son premier élément
+        for module in MODULES_LOURDS + MODULES_PAGES:
+            importlib.import_module(module)
+    app.run()
+    rendu = secondes_depuis_lancement() - debut
+    etapes = {ligne['Étape']: ligne['Début_s'] for ligne in PRECHAUFFAGE.rapport()}
+    return {
+        'premier_affichage_s': round(etapes[jalon] - debut, 3),
+        'rendu_complet_s': round(rendu, 3),
+        'exceptions': [e.message for e in app.exception]
+    }
+
+
+def lancer(mode, page, arrivee, racine):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, S3_LOCAL_DIR=racine, BUCKET_NAME=BUCKET, BANK_MARKETING_CACHE_DIR=cache_dir)
+        commande = [sys.executable, '-m', 'benchmarks.bench_demarrage', '--mesurer', mode, '--page', page,
+                    '--arrivee', str(arrivee)]
+        sortie = subprocess.run(commande, check=True, capture_output=True, text=True, env=env, cwd=RACINE_PROJET).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def publier_artefacts(racine, n_lignes):
+    """Dataset synthétique + forêt aplatie dans le faux bucket."""
+    import joblib
+
+    from bank_marketing.config import FICHIER_CSV
+    from bank_marketing.foret import exporter_foret
+    from bank_marketing.generateur import generer_fichier
+    from bank_marketing.scoring import CLE_FORET
+    from benchmarks.bench_suite import entrainer_modele
+
+    dossier = os.path.join(racine, BUCKET)
+    os.makedirs(dossier)
+    generer_fichier(os.path.join(dossier, FICHIER_CSV), n_lignes)
+    chemin_modele = os.path.join(racine, "modele.joblib")
+    joblib.dump(entrainer_modele(), chemin_modele)
+    exporter_foret(chemin_modele, os.path.join(dossier, CLE_FORET))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Démarrage à froid : premier affichage et rendu des pages.")
+    parser.add_argument("--lignes", type=int, default=45_211, help="Taille du dataset synthétique")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--arrivee", type=float, nargs='+', default=[0.0, 2.0],
+                        help="Secondes entre le lancement du process et la première session")
+    parser.add_argument("--mesurer", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--page", choices=list(PAGES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mesurer:
+        print(json.dumps(mesurer(args.mesurer, args.page, args.arrivee[0])))
+        return
+
+    with tempfile.TemporaryDirectory() as racine:
+        publier_artefacts(racine, args.lignes)
+        print(f"Dataset : {args.lignes:,} lignes ; médianes sur {args.repetitions} process neufs")
+        for arrivee in args.arrivee:
+            for page in PAGES:
+                for mode in MODES:
+                    mesures = [lancer(mode, page, arrivee, racine) for _ in range(args.repetitions)]
+                    erreurs = sorted({e for m in mesures for e in m['exceptions']})
+                    if erreurs:
+                        print(f"⚠️ {page}/{mode} : {erreurs}")
+                    print(f"arrivée {arrivee:3.1f} s | {page:10s} | {mode:16s} | premier affichage "
+                          f"{np.median([m['premier_affichage_s'] for m in mesures]):6.2f} s | rendu complet "
+                          f"{np.median([m['rendu_complet_s'] for m in mesures]):6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Surveillance de la dérive : surcoût sur le chemin de prédiction, mémoire et détection.
+
+1. Surcoût : un client (simulateur : encodage + predict_proba, avec et sans
+   MoniteurDerive.observer_client), un micro-lot du service, et un lot du
+   scoring en masse (scorer_clients contre observer_lot).
+2. Mémoire : taille des esquisses (comptes + exemples d'inconnues, et JSON
+   écrit) après 1e3 à 1e7 clients observés ; elle ne dépend pas du volume.
+3. Détection : profil de référence sur un lot d'entraînement synthétique, puis
+   flux scorés sans dérive, avec un autre mix de mois, un solde décalé et 2 %
+   de métiers inconnus ; variables signalées par comparer().
+
+Usage :
+    python -m benchmarks.bench_derive --clients 2000 --lot 100000
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from bank_marketing.derive import Esquisses, MoniteurDerive, comparer, construire_reference
+from bank_marketing.features import EncodeurCompile
+from bank_marketing.foret import ForetAplatie
+from bank_marketing.generateur import generer_lot
+from bank_marketing.scoring import predire_proba, scorer_clients
+from bank_marketing.service import MicroLots
+
+TAILLE_LOT = 1_000_000
+
+
+def chronometrer(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return np.median(durees)
+
+
+def octets(esquisses):
+    """Mémoire des comptes et des exemples d'inconnues (objets Python), taille du JSON écrit."""
+    memoire = 0
+    for e in esquisses.variables.values():
+        memoire += sys.getsizeof(e.comptes) + sum(sys.getsizeof(n) for n in e.comptes)
+        memoire += sum(sys.getsizeof(k) + sys.getsizeof(n) for k, n in getattr(e, 'inconnues', {}).items())
+    return memoire, len(json.dumps(esquisses.vers_dict()))
+
+
+def mesurer_surcout(model, encodeur, reference, n_clients, lignes_lot, repetitions):
+    lot = scorer_clients(model, generer_lot(lignes_lot, np.random.default_rng(1)), encodeur)
+    clients = lot.head(n_clients).drop(columns=['propension', 'priorite']).to_dict('records')
+    moniteur = MoniteurDerive(reference, "bench")
+
+    def predire(client):
+        return round(predire_proba(model, encodeur.encoder_client(client))[0] * 100, 2)
+
+    def predire_et_observer(client):
+        score = predire(client)
+        moniteur.observer_client(client, score)
+        return score
+
+    sans = chronometrer(lambda: [predire(c) for c in clients], repetitions) / n_clients
+    avec = chronometrer(lambda: [predire_et_observer(c) for c in clients], repetitions) / n_clients
+    seul = chronometrer(lambda: [moniteur.observer_client(c, 50.0) for c in clients], repetitions) / n_clients
+    print(f"Un client (simulateur, médiane sur {n_clients:,} clients) :")
+    print(f"  encodage + predict_proba         {sans * 1e6:8.1f} µs")
+    print(f"  + observer_client                {avec * 1e6:8.1f} µs  (+{(avec - sans) / sans * 100:.1f} %)")
+    print(f"  observer_client seul             {seul * 1e6:8.1f} µs")
+
+    micro_lots = {m: MicroLots(model, encodeur, moniteur=m) for m in (None, moniteur)}
+    paquets = [clients[i:i + 256] for i in range(0, len(clients), 256)]
+    durees = {m: chronometrer(lambda: [lots._traiter([(p, _FuturMuet())]) for p in paquets], repetitions) / len(paquets)
+              for m, lots in micro_lots.items()}
+    for lots in micro_lots.values():
+        lots.arreter()
+    print(f"Micro-lot de 256 clients (service) : {durees[None] * 1000:.2f} ms sans, "
+          f"{durees[moniteur] * 1000:.2f} ms avec (+{(durees[moniteur] - durees[None]) / durees[None] * 100:.1f} %)")
+
+    brut = lot.drop(columns=['propension', 'priorite'])
+    score = chronometrer(lambda: scorer_clients(model, brut, encodeur), repetitions)
+    observation = chronometrer(lambda: moniteur.observer_lot(lot, lot['propension']), repetitions)
+    print(f"Lot de {lignes_lot:,} lignes (scoring en masse) : scorer_clients {score * 1000:.1f} ms, "
+          f"observer_lot {observation * 1000:.1f} ms (+{observation / score * 100:.1f} %)")
+
+
+class _FuturMuet:
+    # Futur minimal : MicroLots._traiter appelé directement, sans file ni thread client
+    def set_result(self, resultat):
+        pass
+
+    def set_exception(self, erreur):
+        raise erreur
+
+
+def mesurer_memoire(model, encodeur, reference, volumes):
+    print("Mémoire des esquisses (comptes + exemples d'inconnues | JSON écrit) :")
+    esquisses, observes, rng = reference.vide(), 0, np.random.default_rng(2)
+    for volume in volumes:
+        while observes < volume:
+            n = min(TAILLE_LOT, volume - observes)
+            lot = generer_lot(n, rng)
+            lot['metier'] = lot['metier'].astype(object)
+            # Beaucoup de valeurs inconnues distinctes : les exemples gardés restent bornés
+            lot.loc[lot.index[:n // 50], 'metier'] = [f"metier-{i}" for i in rng.integers(0, 10_000, n // 50)]
+            lot = scorer_clients(model, lot, encodeur)
+            esquisses.observer_lot(lot, lot['propension'])
+            observes += n
+        memoire, json_octets = octets(esquisses)
+        print(f"  {observes:>12,} clients | {memoire / 1024:6.1f} Ko | {json_octets / 1024:6.1f} Ko")
+
+
+def scenarios(rng, n):
+    def sans_derive():
+        return generer_lot(n, rng)
+
+    def mois_ete():
+        lot = generer_lot(n, rng)
+        lot['mois'] = lot['mois'].astype(object)
+        lot.loc[lot.index[:n // 2], 'mois'] = rng.choice(['jun', 'jul', 'aug'], n // 2)
+        return lot
+
+    def solde_decale():
+        lot = generer_lot(n, rng)
+        lot['solde_bancaire'] = lot['solde_bancaire'] + 1000
+        return lot
+
+    def metiers_inconnus():
+        lot = generer_lot(n, rng)
+        lot['metier'] = lot['metier'].astype(object)
+        lot.loc[lot.index[:n // 50], 'metier'] = 'gig-worker'
+        return lot
+
+    return {"sans dérive": sans_derive, "mix de mois (50 % en été)": mois_ete,
+            "solde + 1000 €": solde_decale, "2 % de métiers inconnus": metiers_inconnus}
+
+
+def mesurer_detection(model, encodeur, reference, n):
+    print(f"Détection (flux de {n:,} clients scorés) :")
+    for nom, generer in scenarios(np.random.default_rng(3), n).items():
+        lot = scorer_clients(model, generer(), encodeur)
+        esquisses = reference.vide()
+        esquisses.observer_lot(lot, lot['propension'])
+        comparaison = comparer(reference, esquisses)
+        signalees = comparaison[~comparaison['Niveau'].str.startswith("🟢")]
+        resume = ", ".join(f"{v} (PSI {p:.2f}, {n[0]})" for v, p, n in
+                           signalees[['Variable', 'PSI', 'Niveau']].itertuples(index=False)) or "aucune"
+        print(f"  {nom:28s} | PSI max des autres {comparaison.loc[comparaison['Niveau'].str.startswith('🟢'), 'PSI'].max():.3f} "
+              f"| signalées : {resume}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la surveillance de la dérive.")
+    parser.add_argument("--clients", type=int, default=2000, help="Clients scorés un par un")
+    parser.add_argument("--lot", type=int, default=100_000, help="Lignes du lot de scoring en masse")
+    parser.add_argument("--volumes", type=int, nargs='+', default=[1_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    from benchmarks.bench_suite import entrainer_modele
+
+    model = ForetAplatie.depuis_modele(entrainer_modele())
+    encodeur = EncodeurCompile.depuis_modele(model)
+    debut = time.perf_counter()
+    reference = construire_reference(model, generer_lot(200_000, np.random.default_rng(0)))
+    print(f"Profil de référence : 200,000 clients en {time.perf_counter() - debut:.2f} s, "
+          f"{len(json.dumps(reference.vers_dict())) / 1024:.1f} Ko")
+    reference = Esquisses.depuis_dict(reference.vers_dict())
+
+    mesurer_surcout(model, encodeur, reference, args.clients, args.lot, args.repetitions)
+    mesurer_memoire(model, encodeur, reference, args.volumes)
+    mesurer_detection(model, encodeur, reference, 50_000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Filtres croisés : masque booléen + groupby sur les lignes brutes contre bitmaps du cube.
+
+Pour chaque sélection aléatoire de la sidebar (1 à 3 dimensions, 1 à 3
+modalités chacune), on calcule ce qu'affiche le dashboard (KPI, cible,
+métier, mois, âge, statut, pression d'appels, matrice métier x mois) :
+- naïf   : df[masque] puis un groupby par graphique sur les lignes brutes ;
+- bitmap : IndexBitmap.filtrer(cube) puis les roll-ups de bank_marketing.cube.
+Les volumes et conversions par métier des deux chemins sont comparés.
+
+Usage :
+    python -m benchmarks.bench_filtres --lignes 5000000 --selections 20
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.config import COLONNE_CIBLE, COLONNES_DASHBOARD, ORDRE_MOIS
+from bank_marketing.cube import CAMPAGNE_MAX, agreger, construire_cube, kpis, matrice, taux_par
+from bank_marketing.filtres import IndexBitmap
+from bank_marketing.generateur import generer_lot
+
+TAILLE_LOT = 1_000_000
+
+
+def generer(n_lignes, seed=0):
+    """Colonnes du dashboard seulement, générées par lots (catégories identiques d'un lot à l'autre)."""
+    rng = np.random.default_rng(seed)
+    lots = [generer_lot(min(TAILLE_LOT, n_lignes - debut), rng)[COLONNES_DASHBOARD]
+            for debut in range(0, n_lignes, TAILLE_LOT)]
+    return pd.concat(lots, ignore_index=True)
+
+
+def tirer_selections(index, n, rng):
+    selections = []
+    for _ in range(n):
+        dimensions = rng.choice(index.dimensions, size=rng.integers(1, 4), replace=False)
+        selections.append({
+            dim: list(rng.choice(index.modalites[dim], size=min(rng.integers(1, 4), len(index.modalites[dim])),
+                                 replace=False))
+            for dim in dimensions
+        })
+    return selections
+
+
+def tableau_naif(df, selection):
+    masque = np.ones(len(df), dtype=bool)
+    for dim, valeurs in selection.items():
+        masque &= df[dim].isin(valeurs).to_numpy()
+    sous = df[masque]
+    succes = (sous[COLONNE_CIBLE] == 'yes')
+    return {
+        'volume': len(sous),
+        'conversion_rate': succes.mean() * 100,
+        'cible': sous[COLONNE_CIBLE].value_counts(),
+        'metier': succes.groupby(sous['metier'], observed=True).agg(['size', 'sum']),
+        'mois': succes.groupby(sous['mois'], observed=True).agg(['size', 'mean']),
+        'age': succes.groupby(sous['age_group'], observed=True).mean(),
+        'statut': succes.groupby(sous['statut_matrimonial'], observed=True).mean(),
+        'pression': succes.groupby(np.minimum(sous['campaign'], CAMPAGNE_MAX + 1)).mean(),
+        'matrice': succes.groupby([sous['metier'], sous['mois']], observed=True).mean().unstack()
+    }
+
+
+def tableau_bitmap(index, cube, selection):
+    sous = index.filtrer(cube, selection)
+    return {
+        'kpis': kpis(sous),
+        'cible': agreger(sous, [COLONNE_CIBLE]),
+        'metier': agreger(sous, ['metier']),
+        'mois': agreger(sous, ['mois']),
+        'age': taux_par(sous, 'age_group'),
+        'statut': taux_par(sous, 'statut_matrimonial'),
+        'pression': taux_par(sous, 'campaign_bucket'),
+        'matrice': matrice(sous, 'metier', 'mois', ordre_colonnes=ORDRE_MOIS)
+    }
+
+
+def verifier(naif, bitmap):
+    attendu = naif['metier'].rename(columns={'size': 'Volume', 'sum': 'Conversions'})
+    obtenu = bitmap['metier'].set_index('metier')[['Volume', 'Conversions']]
+    obtenu.index = obtenu.index.astype(str)
+    attendu.index = attendu.index.astype(str)
+    attendu = attendu[attendu['Volume'] > 0].sort_index()
+    return naif['volume'] == bitmap['kpis']['volume'] and np.array_equal(attendu.to_numpy(), obtenu.sort_index().to_numpy())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des filtres croisés du dashboard.")
+    parser.add_argument("--lignes", type=int, default=5_000_000)
+    parser.add_argument("--selections", type=int, default=20)
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    df = generer(args.lignes)
+    print(f"{args.lignes:,} lignes générées en {time.perf_counter() - debut:.1f} s "
+          f"({df.memory_usage(deep=True).sum() / 1024 ** 2:.0f} Mo)")
+
+    debut = time.perf_counter()
+    cube = construire_cube(df)
+    duree_cube = time.perf_counter() - debut
+    debut = time.perf_counter()
+    index = IndexBitmap(cube)
+    duree_index = time.perf_counter() - debut
+    print(f"Cube : {len(cube):,} cellules en {duree_cube:.1f} s ; index : {len(index.dimensions)} dimensions, "
+          f"{sum(len(m) for m in index.modalites.values())} bitmaps, {index.octets / 1024:.0f} Ko en {duree_index * 1000:.0f} ms")
+
+    selections = tirer_selections(index, args.selections, np.random.default_rng(1))
+    naif, bitmap, resolution, identiques = [], [], [], 0
+    for selection in selections:
+        debut = time.perf_counter()
+        attendu = tableau_naif(df, selection)
+        naif.append(time.perf_counter() - debut)
+
+        debut = time.perf_counter()
+        index.bits(selection)
+        resolution.append(time.perf_counter() - debut)
+
+        debut = time.perf_counter()
+        obtenu = tableau_bitmap(index, cube, selection)
+        bitmap.append(time.perf_counter() - debut)
+        identiques += verifier(attendu, obtenu)
+
+    print(f"Par clic (médiane sur {len(selections)} sélections) :")
+    print(f"  naïf (masque + groupby bruts)   {np.median(naif) * 1000:9.1f} ms")
+    print(f"  bitmap (AND/OR seuls)           {np.median(resolution) * 1000:9.3f} ms")
+    print(f"  bitmap + roll-ups du dashboard  {np.median(bitmap) * 1000:9.1f} ms")
+    print(f"Résultats identiques : {identiques}/{len(selections)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Latence des zooms du dashboard : rerun complet contre fragment seul, cache de figures froid / chaud.
+
+Le dashboard tourne dans streamlit.testing sur un S3 simulé (ClientS3Local).
+Chaque interaction change le critère ou le mois du zoom ; les durées sont lues
+dans le profileur du dashboard (sidebar « Profilage des sections ») :
+- rerun complet : ce que coûtait chaque interaction avant les fragments ;
+- fragment : ce que le serveur réexécute désormais (1er passage sur l'option :
+  figure construite ; passages suivants : figure relue dans le cache).
+
+streamlit.testing réexécute toujours le script entier : la durée du fragment
+est mesurée à l'intérieur de ce rerun (hors surcoût du protocole Streamlit).
+
+Usage :
+    python -m benchmarks.bench_fragments --lignes 45211 --tours 3
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from bank_marketing.config import FICHIER_CSV, ORDRE_MOIS
+from bank_marketing.generateur import generer_fichier
+
+BUCKET = "bench"
+RACINE_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ZOOMS = {
+    'critere': ("Voir le détail par :", ["Statut Matrimonial", "Niveau d'Études", "Métier"], "Zoom critère (fragment)"),
+    'mois': ("Sélectionnez un mois :", ORDRE_MOIS, "Zoom mois (fragment)")
+}
+
+
+def derniere_mesure(app, section):
+    statistiques = app.sidebar.dataframe[0].value.set_index('Section')
+    return float(statistiques.at[section, 'Dernier_ms'])
+
+
+def mesurer(n_tours):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(RACINE_PROJET, "1_Dashboard.py"), default_timeout=300)
+    app.run()
+    app.sidebar.checkbox[0].check().run()
+
+    resultats = {}
+    for zoom, (libelle, options, section) in ZOOMS.items():
+        selecteur = next(s for s in app.selectbox if s.label == libelle)
+        complet, froid, chaud = [], [], []
+        for tour in range(n_tours):
+            for option in options:
+                selecteur.set_value(option).run()
+                selecteur = next(s for s in app.selectbox if s.label == libelle)
+                complet.append(derniere_mesure(app, "Total rerun"))
+                (froid if tour == 0 else chaud).append(derniere_mesure(app, section))
+        resultats[zoom] = {'rerun_complet_ms': complet, 'fragment_froid_ms': froid, 'fragment_chaud_ms': chaud}
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence par interaction des zooms du dashboard.")
+    parser.add_argument("--lignes", type=int, default=45_211, help="Taille du dataset synthétique")
+    parser.add_argument("--tours", type=int, default=3, help="Passages sur toutes les options de chaque zoom")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as racine, tempfile.TemporaryDirectory() as cache_dir:
+        os.makedirs(os.path.join(racine, BUCKET))
+        generer_fichier(os.path.join(racine, BUCKET, FICHIER_CSV), args.lignes)
+        os.environ.update(S3_LOCAL_DIR=racine, BUCKET_NAME=BUCKET, BANK_MARKETING_CACHE_DIR=cache_dir)
+
+        resultats = mesurer(args.tours)
+        print(f"Dataset : {args.lignes:,} lignes ; médianes par interaction (ms)")
+        for zoom, mesures in resultats.items():
+            print(f"{zoom:8s} | avant (rerun complet) {np.median(mesures['rerun_complet_ms']):7.1f} | "
+                  f"fragment, 1re fois {np.median(mesures['fragment_froid_ms']):6.1f} | "
+                  f"fragment, déjà vu {np.median(mesures['fragment_chaud_ms']):6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Chargement du modèle : temps jusqu'à la première prédiction et mémoire par processus.
+
+Médianes sur les processus : durée du chargement seul, et temps depuis le
+démarrage (imports compris) jusqu'à la première prédiction.
+
+Compare le chargeur historique (octets S3 -> BytesIO -> joblib.load), joblib
+depuis le fichier du cache, la forêt aplatie copiée en mémoire et la forêt
+aplatie mappée en mémoire. N processus chargent le même artefact en même temps,
+comme N workers Streamlit / réplicas sur un hôte ; chacun rapporte son RSS et
+son PSS (pages partagées divisées entre les processus qui les mappent).
+
+Usage :
+    python -m benchmarks.bench_modele --processus 4
+    python -m benchmarks.bench_modele --modele model_bank_marketing_v1.joblib --processus 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+import numpy as np
+
+CHARGEURS = ['joblib_bytesio', 'joblib_fichier', 'foret_copie', 'foret_mmap']
+
+
+def memoire_processus():
+    """RSS et PSS (Mo) depuis /proc/self/smaps_rollup (PSS = RSS sans /proc)."""
+    valeurs = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for ligne in f:
+                champ, _, reste = ligne.partition(':')
+                if champ in ('Rss', 'Pss'):
+                    valeurs[champ] = int(reste.split()[0]) / 1024
+    except OSError:
+        from bank_marketing.profilage import memoire_mo
+
+        valeurs = {'Rss': memoire_mo(), 'Pss': memoire_mo()}
+    return valeurs
+
+
+def charger(mode, chemin_joblib, chemin_foret):
+    if mode == 'joblib_bytesio':
+        import joblib
+
+        with open(chemin_joblib, 'rb') as f:
+            return joblib.load(BytesIO(f.read()))
+    if mode == 'joblib_fichier':
+        import joblib
+
+        return joblib.load(chemin_joblib)
+    from bank_marketing.foret import ForetAplatie
+
+    return ForetAplatie.charger(chemin_foret, mmap=(mode == 'foret_mmap'))
+
+
+def mesurer(mode, chemin_joblib, chemin_foret):
+    """Exécuté dans un sous-processus : une ligne JSON, puis attente de la fin des autres."""
+    debut = time.perf_counter()
+    from bank_marketing.features import EncodeurCompile
+    from bank_marketing.scoring import predire_proba
+
+    if mode.startswith('joblib'):
+        import sklearn.ensemble  # noqa: F401  (import compté dans le temps, pas dans la mémoire du modèle)
+    base = memoire_processus()
+    debut_chargement = time.perf_counter()
+    model = charger(mode, chemin_joblib, chemin_foret)
+    chargement = time.perf_counter() - debut_chargement
+    encodeur = EncodeurCompile.depuis_modele(model)
+    predire_proba(model, encodeur.encoder_client({'metier': 'student', 'mois': 'mar'}))
+    premiere = time.perf_counter() - debut
+    if mode.startswith('foret'):
+        # Serveur chaud : toutes les pages du modèle ont été lues au moins une fois
+        for tableau in (model.feature, model.seuil, model.enfants, model.valeur):
+            int(tableau.view(np.uint8)[::4096].sum())
+    memoire = memoire_processus()
+    print(json.dumps({
+        'mode': mode,
+        'chargement_s': round(chargement, 4),
+        'premiere_prediction_s': round(premiere, 4),
+        'rss_mo': round(memoire['Rss'] - base['Rss'], 1),
+        'pss_mo': round(memoire['Pss'] - base['Pss'], 1)
+    }), flush=True)
+    sys.stdin.readline()
+
+
+def lancer(mode, n, chemin_joblib, chemin_foret):
+    commande = [sys.executable, '-m', 'benchmarks.bench_modele', '--mesurer', mode,
+                '--joblib', chemin_joblib, '--foret', chemin_foret]
+    processus = [subprocess.Popen(commande, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(n)]
+    # Tous les processus restent vivants jusqu'à la dernière mesure : le PSS reflète le partage
+    mesures = [json.loads(p.stdout.readline()) for p in processus]
+    for p in processus:
+        p.stdin.close()
+        p.wait()
+    return mesures
+
+
+def entrainer_grand_modele(n=100_000, seed=0):
+    """RandomForest profond (comme la grille du notebook : max_depth=None) : quelques centaines de Mo."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    from bank_marketing.features import COLONNES_CATEGORIELLES_MODELE, COLONNES_MODELE, COLONNES_NUMERIQUES
+    from bank_marketing.features import EncodeurCompile, attacher_schema
+    from bank_marketing.generateur import generer_lot
+
+    df = generer_lot(n, np.random.default_rng(seed))
+    encodeur = EncodeurCompile(COLONNES_MODELE, COLONNES_NUMERIQUES, COLONNES_CATEGORIELLES_MODELE)
+    model = RandomForestClassifier(n_estimators=100, min_samples_leaf=2, random_state=42,
+                                   class_weight='balanced', n_jobs=-1)
+    model.fit(encodeur.encoder_lot(df), (df['souscription'] == 'yes').astype(int))
+    return attacher_schema(model)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps jusqu'à la 1re prédiction et mémoire par processus, par chargeur.")
+    parser.add_argument("--modele", help="Modèle .joblib (défaut : RandomForest profond sur données synthétiques)")
+    parser.add_argument("--processus", type=int, default=4, help="Processus qui chargent le modèle en même temps")
+    parser.add_argument("--mesurer", choices=CHARGEURS, help=argparse.SUPPRESS)
+    parser.add_argument("--joblib", help=argparse.SUPPRESS)
+    parser.add_argument("--foret", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mesurer:
+        mesurer(args.mesurer, args.joblib, args.foret)
+        return
+
+    import joblib
+
+    from bank_marketing.foret import exporter_foret
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin_joblib = args.modele
+        if chemin_joblib is None:
+            chemin_joblib = os.path.join(dossier, "modele.joblib")
+            joblib.dump(entrainer_grand_modele(), chemin_joblib)
+        chemin_foret = os.path.join(dossier, "modele_foret.npz")
+        foret, _ = exporter_foret(chemin_joblib, chemin_foret)
+        print(f"Modèle : {os.path.getsize(chemin_joblib) / 1024 ** 2:.0f} Mo (.joblib), "
+              f"{os.path.getsize(chemin_foret) / 1024 ** 2:.0f} Mo (.npz, {foret.feature.size:,} nœuds) ; "
+              f"{args.processus} processus")
+
+        for mode in CHARGEURS:
+            mesures = lancer(mode, args.processus, chemin_joblib, chemin_foret)
+            chargement = np.median([m['chargement_s'] for m in mesures])
+            premiere = np.median([m['premiere_prediction_s'] for m in mesures])
+            print(f"{mode:15s} | chargement {chargement * 1000:8.1f} ms | "
+                  f"1re prédiction (imports compris) {premiere * 1000:8.1f} ms | "
+                  f"RSS/processus {np.mean([m['rss_mo'] for m in mesures]):7.1f} Mo | "
+                  f"PSS/processus {np.mean([m['pss_mo'] for m in mesures]):7.1f} Mo | "
+                  f"PSS total {sum(m['pss_mo'] for m in mesures):7.1f} Mo")
+
+
+if __name__ == "__main__":
+    main()
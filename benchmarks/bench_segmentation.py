@@ -0,0 +1,131 @@
+"""Segmentation en flux : mémoire et durée de l'entraînement, surcoût de l'affectation au scoring.
+
+1. Entraînement : flux synthétique rejoué par graine (lots de `--chunk` lignes,
+   jamais tout l'historique en mémoire). Pour chaque taille, un processus neuf
+   rapporte la durée et le pic RSS (ru_maxrss), à comparer avec le notebook
+   (KMeans sur tout le sous-ensemble souscripteurs en mémoire) aux petites tailles.
+2. Affectation : scorer_clients avec et sans segmentation sur un lot, et
+   affectation d'un client seul (chemin du simulateur).
+
+Usage :
+    python -m benchmarks.bench_segmentation --tailles 1000000 10000000 100000000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from bank_marketing.generateur import generer_lot
+from bank_marketing.segmentation import FEATURES_SEGMENTATION, Segmentation, entrainer
+
+
+def flux(n_lignes, taille_chunk, seed=0):
+    """Générateur rejouable : mêmes lots à chaque passe (même graine)."""
+    def lots():
+        rng = np.random.default_rng(seed)
+        for debut in range(0, n_lignes, taille_chunk):
+            yield generer_lot(min(taille_chunk, n_lignes - debut), rng)
+    return lots
+
+
+def pic_rss_mo():
+    import resource
+
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pic / 1024 ** 2 if sys.platform == 'darwin' else pic / 1024
+
+
+def mesurer_entrainement(n_lignes, taille_chunk, methode):
+    """Exécuté dans un processus neuf : une ligne JSON (durée, pic RSS, profils)."""
+    debut = time.perf_counter()
+    if methode == 'flux':
+        segmentation = entrainer(flux(n_lignes, taille_chunk))
+    else:
+        # Notebook : tout en mémoire, StandardScaler + KMeans sur les souscripteurs
+        import pandas as pd
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
+
+        df = pd.concat(list(flux(n_lignes, taille_chunk)()), ignore_index=True)
+        X = df.loc[df['souscription'] == 'yes', FEATURES_SEGMENTATION].to_numpy(dtype=np.float64)
+        scaler = StandardScaler().fit(X)
+        kmeans = KMeans(n_clusters=3, random_state=42, n_init=10).fit(scaler.transform(X))
+        segmentation = Segmentation(scaler.mean_, scaler.scale_, kmeans.cluster_centers_,
+                                    np.bincount(kmeans.labels_, minlength=3))
+    duree = time.perf_counter() - debut
+    profils = sorted((round(p['age']), round(p['solde_bancaire']), round(p['duration'])) for p in segmentation.profils())
+    print(json.dumps({'duree': duree, 'rss': pic_rss_mo(), 'profils': profils}))
+
+
+def lancer(n_lignes, taille_chunk, methode):
+    sortie = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_segmentation', '--mesurer', str(n_lignes),
+         '--chunk', str(taille_chunk), '--methode', methode],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def chronometrer(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return np.median(durees)
+
+
+def mesurer_affectation(lignes_lot, repetitions):
+    from benchmarks.bench_suite import entrainer_modele
+    from bank_marketing.features import EncodeurCompile
+    from bank_marketing.foret import ForetAplatie
+    from bank_marketing.scoring import scorer_clients
+
+    model = ForetAplatie.depuis_modele(entrainer_modele())
+    encodeur = EncodeurCompile.depuis_modele(model)
+    segmentation = entrainer(flux(1_000_000, 250_000))
+    lot = generer_lot(lignes_lot, np.random.default_rng(1))
+    client = lot.drop(columns='duration').iloc[0].to_dict()
+
+    sans = chronometrer(lambda: scorer_clients(model, lot, encodeur), repetitions)
+    avec = chronometrer(lambda: scorer_clients(model, lot, encodeur, segmentation), repetitions)
+    seul = chronometrer(lambda: segmentation.affecter(lot), repetitions)
+    un_client = chronometrer(lambda: segmentation.affecter_client(client), repetitions * 200)
+    print(f"Scoring d'un lot de {lignes_lot:,} lignes (médianes) :")
+    print(f"  scorer_clients sans segment    {sans * 1000:8.1f} ms")
+    print(f"  scorer_clients avec segment    {avec * 1000:8.1f} ms  (+{(avec - sans) / sans * 100:.1f} %)")
+    print(f"  affectation seule              {seul * 1000:8.1f} ms  ({seul / lignes_lot * 1e9:.0f} ns/ligne)")
+    print(f"Simulateur : affectation d'un client {un_client * 1e6:.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la segmentation en flux.")
+    parser.add_argument("--tailles", type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument("--chunk", type=int, default=500_000)
+    parser.add_argument("--notebook-max", type=int, default=10_000_000,
+                        help="Taille max pour la référence tout-en-mémoire")
+    parser.add_argument("--lot", type=int, default=100_000, help="Lignes du lot de scoring")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--mesurer", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--methode", default='flux', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mesurer:
+        mesurer_entrainement(args.mesurer, args.chunk, args.methode)
+        return
+
+    print(f"Entraînement (processus neuf par mesure, chunks de {args.chunk:,} lignes) :")
+    for n in args.tailles:
+        methodes = ['flux'] + (['notebook'] if n <= args.notebook_max else [])
+        for methode in methodes:
+            r = lancer(n, args.chunk, methode)
+            print(f"  {n:>12,} lignes | {methode:8s} | {r['duree']:8.1f} s | pic RSS {r['rss']:8.0f} Mo | "
+                  f"centres (âge, solde, durée) {r['profils']}")
+    mesurer_affectation(args.lot, args.repetitions)
+
+
+if __name__ == "__main__":
+    main()
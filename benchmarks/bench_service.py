@@ -0,0 +1,126 @@
+"""Test de charge du service de scoring sur localhost : micro-lots contre un predict_proba par requête.
+
+Le service tourne dans un sous-processus (pas de GIL partagé avec les clients) ;
+N threads clients envoient chacun des requêtes d'un client sur une connexion
+persistante. On mesure le débit et les latences p50 / p99 côté client.
+
+Usage :
+    python -m benchmarks.bench_service --modele model_bank_marketing_v1_foret.npz --clients 32 --duree 10
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from bank_marketing.generateur import generer_lot
+
+MODES = {'sans_micro_lots': 1, 'micro_lots': 256}
+
+
+def port_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def attendre_service(port, delai=60):
+    limite = time.time() + delai
+    while time.time() < limite:
+        try:
+            connexion = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connexion.request('GET', '/health')
+            if connexion.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError("Le service de scoring n'a pas démarré")
+
+
+def client_charge(port, corps, arret, latences):
+    connexion = http.client.HTTPConnection('127.0.0.1', port)
+    en_tetes = {'Content-Type': 'application/json'}
+    while not arret.is_set():
+        debut = time.perf_counter()
+        connexion.request('POST', '/score', body=corps[len(latences) % len(corps)], headers=en_tetes)
+        reponse = connexion.getresponse()
+        reponse.read()
+        latences.append(time.perf_counter() - debut)
+    connexion.close()
+
+
+def mesurer(chemin_modele, taille_max, n_clients, duree, corps, attente_max_ms):
+    port = port_libre()
+    service = subprocess.Popen(
+        [sys.executable, '-m', 'bank_marketing.service', chemin_modele, '--hote', '127.0.0.1',
+         '--port', str(port), '--taille-max', str(taille_max), '--attente-max-ms', str(attente_max_ms)],
+        stdout=subprocess.DEVNULL
+    )
+    try:
+        attendre_service(port)
+        arret = threading.Event()
+        latences = [[] for _ in range(n_clients)]
+        threads = [threading.Thread(target=client_charge, args=(port, corps, arret, latences[i]))
+                   for i in range(n_clients)]
+        for thread in threads:
+            thread.start()
+        time.sleep(duree)
+        arret.set()
+        for thread in threads:
+            thread.join()
+
+        connexion = http.client.HTTPConnection('127.0.0.1', port)
+        connexion.request('GET', '/metrics')
+        metriques = json.loads(connexion.getresponse().read())
+    finally:
+        service.terminate()
+        service.wait()
+
+    toutes = np.concatenate([np.asarray(l) for l in latences]) * 1000
+    return {
+        'requetes': int(toutes.size),
+        'requetes_par_s': round(toutes.size / duree, 1),
+        'p50_ms': round(float(np.percentile(toutes, 50)), 2),
+        'p99_ms': round(float(np.percentile(toutes, 99)), 2),
+        'taille_moyenne_lot': metriques['taille_moyenne_lot']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Charge du service de scoring : micro-lots vs sans micro-lots.")
+    parser.add_argument("--modele", help="Modèle .joblib / .npz (défaut : RandomForest entraîné sur données synthétiques)")
+    parser.add_argument("--clients", type=int, default=32, help="Threads clients concurrents")
+    parser.add_argument("--duree", type=float, default=10, help="Secondes de charge par mode")
+    parser.add_argument("--attente-max-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin_modele = args.modele
+        if chemin_modele is None:
+            import joblib
+
+            from benchmarks.bench_suite import entrainer_modele
+
+            chemin_modele = os.path.join(dossier, "modele.joblib")
+            joblib.dump(entrainer_modele(), chemin_modele)
+
+        # Corps de requête préencodés : le client ne mesure que l'aller-retour HTTP
+        prospects = generer_lot(1000, np.random.default_rng(0)).astype(object)
+        corps = [json.dumps(ligne).encode('utf-8') for ligne in prospects.to_dict(orient='records')]
+
+        print(f"{args.clients} clients concurrents, {args.duree:.0f}s par mode")
+        for mode, taille_max in MODES.items():
+            r = mesurer(chemin_modele, taille_max, args.clients, args.duree, corps, args.attente_max_ms)
+            print(f"{mode:16s} | {r['requetes_par_s']:8.1f} req/s | p50 {r['p50_ms']:7.2f} ms | "
+                  f"p99 {r['p99_ms']:7.2f} ms | lot moyen {r['taille_moyenne_lot']:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
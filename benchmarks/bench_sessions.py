@@ -0,0 +1,119 @@
+"""Mémoire du dataset du dashboard : copie par rerun (st.cache_data) contre dataset partagé figé.
+
+1. Dataset : empreinte du DataFrame lu (int64, catégories) contre DatasetPartage
+   (entiers réduits, cible booléenne précalculée, tableaux en lecture seule).
+2. Par rerun : ce que coûtait st.cache_data (pickle puis dépickle du DataFrame
+   à chaque appel) contre la vue sans copie `DatasetPartage.df`.
+3. Par session : plusieurs sessions streamlit.testing du dashboard dans le même
+   process (S3 simulé) ; mémoire Python allouée au pic de chaque rerun et
+   mémoire restant allouée après chaque nouvelle session (tracemalloc, qui suit
+   aussi les tableaux NumPy).
+
+Pour comparer avec une autre version de la page :
+    git show <commit>:1_Dashboard.py > /tmp/avant.py
+    python -m benchmarks.bench_sessions --page /tmp/avant.py
+
+Usage :
+    python -m benchmarks.bench_sessions --lignes 1000000 --sessions 4
+"""
+import argparse
+import gc
+import os
+import pickle
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from bank_marketing.config import FICHIER_CSV
+from bank_marketing.donnees import DatasetPartage, ecrire_snapshot, lire_snapshot, nom_snapshot
+from bank_marketing.generateur import generer_lot
+
+BUCKET = "bench"
+RACINE_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TAILLE_LOT = 1_000_000
+MO = 1024 ** 2
+
+
+def mesurer_allocation(fonction):
+    """(durée en s, pic alloué en octets, octets encore alloués après l'appel)."""
+    gc.collect()
+    tracemalloc.start()
+    depart, _ = tracemalloc.get_traced_memory()
+    debut = time.perf_counter()
+    resultat = fonction()
+    duree = time.perf_counter() - debut
+    courant, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultat
+    return duree, pic - depart, courant - depart
+
+
+def publier(racine, n_lignes):
+    """Snapshot Parquet du dataset synthétique dans le bucket simulé ; renvoie le DataFrame relu."""
+    rng = np.random.default_rng(0)
+    df = pd.concat([generer_lot(min(TAILLE_LOT, n_lignes - debut), rng)
+                    for debut in range(0, n_lignes, TAILLE_LOT)], ignore_index=True)
+    chemin = os.path.join(racine, BUCKET, nom_snapshot(FICHIER_CSV))
+    os.makedirs(os.path.dirname(chemin))
+    ecrire_snapshot(df, chemin)
+    return lire_snapshot(chemin)
+
+
+def comparer_reruns(df, repetitions):
+    jeu = DatasetPartage(df)
+    print(f"Dataset : {len(df):,} lignes | lu {df.memory_usage(deep=True).sum() / MO:7.1f} Mo | "
+          f"partagé {jeu.octets / MO:7.1f} Mo")
+
+    octets = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    copie = [mesurer_allocation(lambda: pickle.loads(octets)) for _ in range(repetitions)]
+    vue = [mesurer_allocation(lambda: jeu.df) for _ in range(repetitions)]
+    print("Par rerun (médianes) :")
+    for libelle, mesures in (("st.cache_data (copie dépicklée)", copie), ("DatasetPartage.df (vue)", vue)):
+        durees, pics, _ = zip(*mesures)
+        print(f"  {libelle:32s} {np.median(durees) * 1000:8.2f} ms | {np.median(pics) / MO:8.2f} Mo alloués")
+
+
+def mesurer_sessions(page, n_sessions):
+    from streamlit.testing.v1 import AppTest
+
+    sessions = []
+    for numero in range(n_sessions):
+        app = AppTest.from_file(page, default_timeout=600)
+        duree, pic, retenu = mesurer_allocation(app.run)
+        sessions.append(app)
+        statut = "échec" if app.exception else "ok"
+        print(f"  session {numero + 1} : 1er rendu {duree:6.2f} s | pic {pic / MO:8.1f} Mo | "
+              f"retenu {retenu / MO:8.1f} Mo ({statut})")
+
+    pics = []
+    for app in sessions:
+        # Interaction : changement de mois du zoom (fragment, mais le script entier tourne sous streamlit.testing)
+        selecteur = next(s for s in app.selectbox if s.label == "Sélectionnez un mois :")
+        _, pic, _ = mesurer_allocation(selecteur.set_value("mar").run)
+        pics.append(pic)
+    print(f"  rerun après interaction : pic médian {np.median(pics) / MO:8.1f} Mo alloués")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire par session et par rerun du dataset du dashboard.")
+    parser.add_argument("--lignes", type=int, default=1_000_000, help="Taille du dataset synthétique")
+    parser.add_argument("--sessions", type=int, default=4, help="Sessions simulées dans le même process")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--page", default=os.path.join(RACINE_PROJET, "1_Dashboard.py"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as racine, tempfile.TemporaryDirectory() as cache_dir:
+        df = publier(racine, args.lignes)
+        comparer_reruns(df, args.repetitions)
+        del df
+
+        os.environ.update(S3_LOCAL_DIR=racine, BUCKET_NAME=BUCKET, BANK_MARKETING_CACHE_DIR=cache_dir)
+        print(f"Sessions ({os.path.basename(args.page)}) :")
+        mesurer_sessions(args.page, args.sessions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Suite de benchmarks headless des étapes derrière le dashboard et le simulateur.
+
+Étapes mesurées pour chaque taille (45k, 1M, 10M lignes par défaut) :
+chargement S3 du CSV (faux S3 local), dérivation de la cible, construction du
+cube et chaque agrégat du dashboard, matrice métier x mois, encodage (1 ligne
+et lot), predict_proba (1 ligne et lot, modèle sklearn et forêt aplatie).
+
+Les résultats (médiane, min, lignes/s) sont écrits en JSON et peuvent être
+comparés à une référence : code de sortie 1 si une étape ralentit au-delà de
+la tolérance (meilleur temps de chaque étape).
+
+Usage :
+    python -m benchmarks.bench_suite --tailles 45000 1000000 --sortie resultats.json
+    python -m benchmarks.bench_suite --reference benchmarks/reference.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bank_marketing.generateur import generer_fichier, generer_lot
+
+TAILLES = [45_000, 1_000_000, 10_000_000]
+BUCKET = "bench"
+CLE = "bank_marketing_cleaned_v1.csv"
+
+# Au-delà, encodage / prédiction en lot sont mesurés sur un échantillon (débit extrapolable)
+MAX_LIGNES_MODELE = 1_000_000
+# En dessous de ce temps, une étape est jugée trop courte pour signaler une régression
+SEUIL_BRUIT_S = 0.005
+
+
+def chronometrer(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+
+def entrainer_modele(n=20_000, seed=0):
+    """RandomForest configuré comme le modèle C du notebook V2, sur données synthétiques."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    from bank_marketing.features import EncodeurCompile, attacher_schema
+
+    df = generer_lot(n, np.random.default_rng(seed))
+    encodeur = EncodeurCompile.depuis_modele(attacher_schema(RandomForestClassifier()))
+    model = RandomForestClassifier(n_estimators=100, max_depth=6, min_samples_leaf=50,
+                                   random_state=42, class_weight='balanced')
+    model.fit(encodeur.encoder_lot(df), (df['souscription'] == 'yes').astype(int))
+    return attacher_schema(model)
+
+
+# --- 1. ÉTAPES ---
+def etapes(racine_s3, df, model):
+    """Renvoie {étape: (fonction, lignes traitées)} dans l'ordre du dashboard puis du simulateur."""
+    from bank_marketing.cache_s3 import CacheArtefacts
+    from bank_marketing.config import COLONNE_CIBLE, ORDRE_MOIS
+    from bank_marketing.cube import agreger, construire_cube, kpis, matrice, taux_par
+    from bank_marketing.donnees import charger_dataset
+    from bank_marketing.features import EncodeurCompile
+    from bank_marketing.foret import ForetAplatie
+    from bank_marketing.s3_local import ClientS3Local
+    from bank_marketing.scoring import predire_proba
+
+    n = len(df)
+    s3_client = ClientS3Local(racine_s3)
+    cube = construire_cube(df)
+
+    def charger():
+        # Cache vide à chaque répétition : on mesure le téléchargement + parsing
+        with tempfile.TemporaryDirectory() as cache_dir:
+            charger_dataset(CacheArtefacts(s3_client, cache_dir), BUCKET, CLE)
+
+    encodeur = EncodeurCompile.depuis_modele(model)
+    foret = ForetAplatie.depuis_modele(model)
+    client = df.iloc[0].to_dict()
+    lot = df.iloc[:MAX_LIGNES_MODELE]
+    X = encodeur.encoder_lot(lot)
+    ligne = X[:1]
+
+    return {
+        'chargement_s3_csv': (charger, n),
+        'cible_target_num': (lambda: (df[COLONNE_CIBLE] == 'yes').astype(int), n),
+        'cube_construction': (lambda: construire_cube(df), n),
+        'kpis': (lambda: kpis(cube), n),
+        'agregat_cible': (lambda: agreger(cube, [COLONNE_CIBLE]), n),
+        'agregat_zoom_metier_cible': (lambda: agreger(cube, ['metier', COLONNE_CIBLE]), n),
+        'agregat_metier': (lambda: agreger(cube, ['metier']), n),
+        'agregat_age_group': (lambda: taux_par(cube, 'age_group'), n),
+        'agregat_statut': (lambda: taux_par(cube, 'statut_matrimonial'), n),
+        'agregat_mois': (lambda: agreger(cube, ['mois']), n),
+        'agregat_zoom_mois': (lambda: agreger(cube, ['metier'], filtres={'mois': 'may'}), n),
+        'agregat_campagne': (lambda: taux_par(cube, 'campaign_bucket'), n),
+        'pivot_metier_mois': (lambda: matrice(cube, 'metier', 'mois', ordre_colonnes=ORDRE_MOIS), n),
+        'encodage_1_ligne': (lambda: encodeur.encoder_client(client), 1),
+        'encodage_lot': (lambda: encodeur.encoder_lot(lot), len(lot)),
+        'predict_proba_1_ligne_sklearn': (lambda: predire_proba(model, ligne), 1),
+        'predict_proba_1_ligne_foret': (lambda: foret.predict_proba(ligne), 1),
+        'predict_proba_lot_sklearn': (lambda: predire_proba(model, X), len(lot)),
+        'predict_proba_lot_foret': (lambda: foret.predict_proba(X), len(lot)),
+    }
+
+
+def mesurer_taille(n, model, repetitions, racine):
+    chemin = os.path.join(racine, BUCKET, CLE)
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    generer_fichier(chemin, n)
+    # Texte déjà en 'category', comme à la lecture du snapshot Parquet
+    df = generer_lot(n, np.random.default_rng(1))
+
+    resultats = {}
+    for nom, (fonction, lignes) in etapes(racine, df, model).items():
+        # Les étapes unitaires (1 ligne) sont répétées davantage : latence médiane stable
+        durees = chronometrer(fonction, repetitions * 50 if lignes == 1 else repetitions)
+        mediane = statistics.median(durees)
+        resultats[nom] = {
+            'mediane_s': mediane,
+            'min_s': min(durees),
+            'repetitions': len(durees),
+            'lignes': lignes,
+            'lignes_par_s': lignes / mediane if mediane else None
+        }
+        print(f"  {nom:32s} {mediane * 1000:10.2f} ms  ({lignes:,} lignes)", flush=True)
+    return resultats
+
+
+# --- 2. COMPARAISON À LA RÉFÉRENCE ---
+def comparer(resultats, reference, tolerance):
+    """Liste des (taille, étape, ratio) dont le meilleur temps dépasse la référence de plus de `tolerance`.
+
+    On compare les minimums : moins sensibles que la médiane au bruit de la machine.
+    """
+    regressions = []
+    for taille, etapes_ref in reference.get('resultats', {}).items():
+        for nom, ref in etapes_ref.items():
+            actuel = resultats.get('resultats', {}).get(taille, {}).get(nom)
+            if actuel is None or ref['min_s'] < SEUIL_BRUIT_S and actuel['min_s'] < SEUIL_BRUIT_S:
+                continue
+            ratio = actuel['min_s'] / ref['min_s']
+            print(f"  {taille:>10s} {nom:32s} x{ratio:5.2f}")
+            if ratio > 1 + tolerance:
+                regressions.append((taille, nom, ratio))
+    return regressions
+
+
+def environnement():
+    import pandas as pd
+    import sklearn
+
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'cpu': os.cpu_count(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks headless chargement / agrégats / encodage / prédiction.")
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES)
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--modele", help="Modèle .joblib à mesurer (défaut : RandomForest entraîné sur données synthétiques)")
+    parser.add_argument("--sortie", default="resultats_benchmarks.json")
+    parser.add_argument("--reference", help="JSON d'une exécution précédente à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Ralentissement toléré (0.25 = +25 %%)")
+    args = parser.parse_args()
+
+    if args.modele:
+        import joblib
+
+        model = joblib.load(args.modele)
+    else:
+        model = entrainer_modele()
+
+    resultats = {'environnement': environnement(), 'resultats': {}}
+    with tempfile.TemporaryDirectory() as racine:
+        for n in args.tailles:
+            print(f"--- {n:,} lignes ---", flush=True)
+            # Tailles énormes : une seule répétition
+            repetitions = 1 if n >= 5_000_000 else args.repetitions
+            resultats['resultats'][str(n)] = mesurer_taille(n, model, repetitions, racine)
+
+    with open(args.sortie, 'w', encoding='utf-8') as f:
+        json.dump(resultats, f, indent=1)
+    print(f"✅ Résultats -> {args.sortie}")
+
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            reference = json.load(f)
+        print(f"--- Comparaison à {args.reference} (tolérance +{args.tolerance:.0%}) ---")
+        regressions = comparer(resultats, reference, args.tolerance)
+        if regressions:
+            for taille, nom, ratio in regressions:
+                print(f"❌ Régression {nom} @ {taille} lignes : x{ratio:.2f}")
+            sys.exit(1)
+        print("✅ Aucune régression")
+
+
+if __name__ == "__main__":
+    main()
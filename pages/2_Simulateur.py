@@ -1,12 +1,9 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import joblib
-import boto3
-import os
-from io import BytesIO
 from dotenv import load_dotenv
 
+from bank_marketing.config import cache_artefacts, dossier_derive, nom_bucket
+from bank_marketing.demarrage import PRECHAUFFAGE, TACHE_MODELE
+
 # --- 1. CONFIGURATION DE LA PAGE ---
 load_dotenv()
 
@@ -19,23 +16,41 @@ st.set_page_config(
 # --- 2. CHARGEMENT DU MODÈLE S3 ---
 @st.cache_resource(show_spinner="Réveil de l'IA...")
 def charger_modele_s3():
-    bucket_name = os.getenv('BUCKET_NAME')
-    model_key = "model_bank_marketing_v1.joblib"
+    # Cache disque partagé : le modèle n'est retéléchargé que si son ETag a changé.
+    # Forêt aplatie (NumPy pur) si publiée : pas d'import sklearn, inférence vectorisée.
+    # Modèle déjà chargé par le préchauffage (python -m bank_marketing.demarrage) s'il a tourné
+    model = PRECHAUFFAGE.prendre(TACHE_MODELE)
+    if model is not None:
+        return model
     try:
-        s3 = boto3.client(
-            's3',
-            aws_access_key_id=os.getenv('ACCESS_KEY'),
-            aws_secret_access_key=os.getenv('SECRET_KEY'),
-            region_name="eu-west-3"
-        )
-        response = s3.get_object(Bucket=bucket_name, Key=model_key)
-        model_bytes = BytesIO(response['Body'].read())
-        return joblib.load(model_bytes)
+        return charger_modele_publie(cache_artefacts(), nom_bucket())
     except Exception as e:
         st.error(f"❌ Erreur S3 : {e}")
         return None
 
-model = charger_modele_s3()
+@st.cache_resource(show_spinner=False)
+def charger_segmentation_s3():
+    # Centroïdes des profils souscripteurs (optionnels : None s'ils ne sont pas publiés)
+    return charger_segmentation_publiee(cache_artefacts(), nom_bucket())
+
+@st.cache_resource(show_spinner=False)
+def creer_moniteur_derive():
+    # Esquisses des clients scorés par ce process (mémoire fixe), écrites en tâche de fond
+    # pour la page Dérive ; sans profil de référence publié, pas de surveillance
+    reference = charger_profil_publie(cache_artefacts(), nom_bucket())
+    if reference is None:
+        return None
+    return MoniteurDerive(reference, "simulateur", dossier_derive()).demarrer()
+
+@st.cache_resource
+def compiler_encodeur(_model):
+    # Schéma des features lu sur l'artefact du modèle, compilé une seule fois
+    return EncodeurCompile.depuis_modele(_model)
+
+@st.cache_resource
+def creer_balayage(_model, _encodeur):
+    # Cache LRU des balayages partagé entre les sessions
+    return BalayageSensibilite(_model, _encodeur)
 
 # --- 3. SIDEBAR : INTERFACE (UX FUSIONNÉE) ---
 st.sidebar.header("🎯 Leviers Prioritaires")
@@ -57,57 +72,70 @@ with st.sidebar.expander("⚙️ Paramètres Avancés"):
     defaut_credit = st.selectbox("Défaut Crédit", ['no','yes'])
     pret_conso = st.selectbox("Prêt Conso", ['no','yes'])
 
+st.sidebar.markdown("---")
+PRECHAUFFAGE.marquer("Premier affichage (simulateur)")
+
+# Imports lourds (pandas, plotly) et modèle après les leviers : la sidebar s'affiche d'abord
+import numpy as np
+import plotly.graph_objects as go
+
+from bank_marketing.derive import MoniteurDerive, charger_profil_publie
+from bank_marketing.features import EncodeurCompile
+from bank_marketing.scoring import SEUIL_HAUTE, SEUIL_MOYENNE, charger_modele_publie, predire_proba
+from bank_marketing.segmentation import charger_segmentation_publiee
+from bank_marketing.simulation import LEVIERS, LIBELLES_LEVIERS, BalayageSensibilite
+
+model = charger_modele_s3()
+encodeur = compiler_encodeur(model) if model is not None else None
+segmentation = charger_segmentation_s3()
+moniteur = creer_moniteur_derive()
+
+mode_balayage = st.sidebar.checkbox("🔬 Mode balayage (what-if)")
+if mode_balayage:
+    leviers_choisis = st.sidebar.multiselect(
+        "Leviers à faire varier (1 ou 2)",
+        list(LEVIERS),
+        default=['mois', 'campaign'],
+        format_func=LIBELLES_LEVIERS.get,
+        max_selections=2
+    )
+
 # --- 4. LOGIQUE DE PRÉDICTION ---
+client = {
+    'age': age,
+    'solde_bancaire': solde_bancaire,
+    'day': day,
+    'campaign': campaign,
+    'pdays': -1,
+    'previous': previous,
+    'defaut_credit': defaut_credit,
+    'pret_immo': pret_immo,
+    'pret_conso': pret_conso,
+    'metier': metier,
+    'statut_matrimonial': statut_matrimonial,
+    'niveau_etudes': niveau_etudes,
+    'mois': mois,
+    'resultat_precedent': resultat_precedent,
+    'segment_contact': segment_contact
+}
+
 if st.sidebar.button("🎯 Lancer la prédiction"):
-    input_data = pd.DataFrame([{
-        'age': age,
-        'solde_bancaire': solde_bancaire,
-        'day': day,
-        'campaign': campaign,
-        'pdays': -1,
-        'previous': previous,
-        'defaut_credit': defaut_credit,
-        'pret_immo': pret_immo,
-        'pret_conso': pret_conso,
-        'metier': metier,
-        'statut_matrimonial': statut_matrimonial,
-        'niveau_etudes': niveau_etudes,
-        'mois': mois,
-        'resultat_precedent': resultat_precedent,
-        'segment_contact': segment_contact
-    }])
-
-    cat_cols = ['metier','statut_matrimonial','niveau_etudes','defaut_credit', 
-                'pret_immo', 'pret_conso', 'mois','resultat_precedent','segment_contact']
-    input_data_encoded = pd.get_dummies(input_data, columns=cat_cols)
-
-    model_columns = [
-        'age', 'solde_bancaire', 'day', 'campaign', 'pdays', 'previous',
-        'defaut_credit_yes', 'pret_immo_yes', 'pret_conso_yes',
-        'metier_blue-collar', 'metier_entrepreneur', 'metier_housemaid', 'metier_management', 'metier_retired', 
-        'metier_self-employed', 'metier_services', 'metier_student', 'metier_technician', 'metier_unemployed', 'metier_unknown',
-        'statut_matrimonial_married', 'statut_matrimonial_single',
-        'niveau_etudes_secondary', 'niveau_etudes_tertiary', 'niveau_etudes_unknown',
-        'mois_aug', 'mois_dec', 'mois_feb', 'mois_jan', 'mois_jul', 'mois_jun', 'mois_mar', 'mois_may', 'mois_nov', 'mois_oct', 'mois_sep',
-        'resultat_precedent_no existant', 'resultat_precedent_success',
-        'segment_contact_Intermediaire (31-90j)', 'segment_contact_Jamais contacte', 'segment_contact_Recent (0-30j)'
-    ]
-
-    for col in model_columns:
-        if col not in input_data_encoded.columns:
-            input_data_encoded[col] = 0
-    input_data_encoded = input_data_encoded[model_columns]
-
-    proba = model.predict_proba(input_data_encoded)[0][1]
+    # Encodage one-hot précompilé : remplit directement une ligne NumPy propre à ce rerun
+    # (l'encodeur est partagé entre sessions par cache_resource)
+    input_data_encoded = encodeur.encoder_client(client, out=np.zeros((1, encodeur.nb_features)))
+
+    proba = predire_proba(model, input_data_encoded)[0]
     score = round(proba * 100, 2)
+    if moniteur is not None:
+        moniteur.observer_client(client, score)
 
     # --- 5. AFFICHAGE ET RECOMMANDATIONS ---
     st.markdown("---")
     st.markdown(f"### Résultat de l'Analyse IA")
     
-    if score >= 40:
+    if score >= SEUIL_HAUTE:
         st.success(f"**Score de Propension : {score}% (Potentiel Élevé)**")
-    elif score >= 15:
+    elif score >= SEUIL_MOYENNE:
         st.warning(f"**Score de Propension : {score}% (Potentiel Modéré)**")
     else:
         st.info(f"**Score de Propension : {score}% (Potentiel Faible)**")
@@ -129,13 +157,25 @@ if st.sidebar.button("🎯 Lancer la prédiction"):
     st.plotly_chart(fig, use_container_width=True)
 
     st.markdown("### 🚦 Recommandation ")
-    if score >= 40:
+    if score >= SEUIL_HAUTE:
         st.success("🟢 **PRIORITÉ HAUTE** : Opportunité immédiate. Client très réceptif. Conclure rapidement en mettant en avant les avantages de l'épargne et la sécurité.")
-    elif score >= 15:
+    elif score >= SEUIL_MOYENNE:
         st.warning("🟠 **PRIORITÉ MOYENNE** : Client à potentiel, renforcer l'argumentaire. Le client est hésitant mais captable avec une offre personnalisée axée sur la flexibilité.")
     else:
         st.error("🔴 **PRIORITÉ BASSE** : Ne pas abandonner, mais allouer peu de ressources. Allouer le temps commercial sur des profils plus qualifiés pour maximiser le ROI.")
 
+    # --- PROFIL SOUSCRIPTEUR LE PLUS PROCHE (durée d'appel inconnue : ignorée) ---
+    if segmentation is not None:
+        segment = segmentation.affecter_client(client)
+        profil = segmentation.profils()[segment]
+        part = segmentation.effectifs[segment] / max(segmentation.effectifs.sum(), 1) * 100
+        st.markdown("### 🧬 Profil souscripteur le plus proche")
+        st.info(
+            f"**{segmentation.noms[segment]}** ({part:.0f}% des souscripteurs) : "
+            f"âge moyen {profil['age']:.0f} ans, solde {profil['solde_bancaire']:,.0f} €, "
+            f"appel de {profil['duration'] / 60:.1f} min, {profil['campaign']:.1f} contacts."
+        )
+
     # --- CONSEILS COMMERCIAUX (DÉSORMAIS BIEN INDENTÉS) ---
     st.markdown("## 💼 Conseils pour le commercial")
 
@@ -164,4 +204,56 @@ if st.sidebar.button("🎯 Lancer la prédiction"):
         - Insister sur les promotions ou offres exclusives  
         - Confirmer les informations et simplifier le processus
         """)
-        
\ No newline at end of file
+
+# --- 6. MODE BALAYAGE : SENSIBILITÉ DU SCORE ---
+if mode_balayage and model is not None:
+    st.markdown("---")
+    st.markdown("## 🔬 Analyse de sensibilité")
+
+    if not leviers_choisis:
+        st.info("Choisissez un ou deux leviers dans la sidebar.")
+    else:
+        # Toute la grille est scorée en un seul appel au modèle (résultat mémorisé par profil)
+        grille = creer_balayage(model, encodeur).balayer(client, leviers_choisis)
+
+        if len(leviers_choisis) == 1:
+            levier = leviers_choisis[0]
+            fig_sweep = go.Figure(go.Scatter(
+                x=grille[levier],
+                y=grille['propension'],
+                mode='lines+markers',
+                line=dict(color='#E6A66A', width=3),
+                hovertemplate='%{x}<br>Score: %{y:.2f}%'
+            ))
+            fig_sweep.add_vline(x=client[levier], line_dash="dash", line_color="Brown", annotation_text="Profil actuel")
+            fig_sweep.add_hrect(y0=SEUIL_HAUTE, y1=100, fillcolor="#00BB44", opacity=0.08, line_width=0)
+            fig_sweep.update_layout(
+                title=f"Score de propension selon : {LIBELLES_LEVIERS[levier]}",
+                xaxis_title=LIBELLES_LEVIERS[levier],
+                yaxis_title="Score (%)"
+            )
+        else:
+            levier_x, levier_y = leviers_choisis
+            matrice_sweep = grille.pivot(index=levier_y, columns=levier_x, values='propension')
+            matrice_sweep = matrice_sweep.reindex(index=LEVIERS[levier_y], columns=LEVIERS[levier_x])
+            fig_sweep = go.Figure(go.Heatmap(
+                z=matrice_sweep.values,
+                x=[str(v) for v in matrice_sweep.columns],
+                y=[str(v) for v in matrice_sweep.index],
+                colorscale='RdYlGn',
+                zmin=0,
+                zmax=100,
+                colorbar=dict(title="Score (%)"),
+                hovertemplate=f"{levier_x}: %{{x}}<br>{levier_y}: %{{y}}<br>Score: %{{z:.2f}}%<extra></extra>"
+            ))
+            fig_sweep.update_layout(
+                title="Carte de sensibilité du score",
+                xaxis_title=LIBELLES_LEVIERS[levier_x],
+                yaxis_title=LIBELLES_LEVIERS[levier_y]
+            )
+
+        st.plotly_chart(fig_sweep, use_container_width=True)
+
+        meilleur = grille['propension'].idxmax()
+        reglage = ", ".join(f"**{LIBELLES_LEVIERS[l]}** = {grille.at[meilleur, l]}" for l in leviers_choisis)
+        st.info(f"🎯 Meilleur réglage : {reglage} → score de **{grille.at[meilleur, 'propension']:.2f}%**.")
@@ -0,0 +1,151 @@
+import streamlit as st
+from dotenv import load_dotenv
+
+from bank_marketing.config import COLONNE_CIBLE, COUT_APPEL, FICHIER_CSV, GAIN_VENTE, cache_artefacts, nom_bucket
+from bank_marketing.demarrage import PRECHAUFFAGE, TACHE_MODELE
+
+# --- 1. CONFIGURATION DE LA PAGE ---
+load_dotenv()
+
+st.set_page_config(
+    page_title="Planification de Campagne",
+    page_icon="📞",
+    layout="wide"
+)
+
+# --- 2. SCORES (MODÈLE S3 OU FICHIER SCORÉ) ---
+@st.cache_resource(show_spinner="Réveil de l'IA...")
+def charger_modele_s3():
+    # Modèle du préchauffage s'il n'a pas déjà été remis au simulateur
+    model = PRECHAUFFAGE.prendre(TACHE_MODELE)
+    if model is not None:
+        return model
+    return charger_modele_publie(cache_artefacts(), nom_bucket())
+
+@st.cache_resource(show_spinner="Scoring de l'historique...")
+def courbe_historique(nom_du_fichier):
+    # Jeu de test du notebook (hors entraînement du modèle) scoré une seule fois :
+    # la courbe garde les cumuls triés, chaque réglage n'est qu'une relecture
+    model = charger_modele_s3()
+    df = lignes_test(charger_dataset(cache_artefacts(), nom_bucket(), nom_du_fichier, colonnes=None))
+    proba = predire_proba_lot(model, EncodeurCompile.depuis_modele(model), df)
+    return CourbeSeuils(proba, (df[COLONNE_CIBLE].astype(str) == 'yes').to_numpy())
+
+@st.cache_data(max_entries=8, show_spinner="Lecture du fichier scoré...")
+def courbe_fichier(nom, contenu):
+    # Sortie de bank_marketing.scoring : propension en %, souscription optionnelle
+    if nom.lower().endswith((".parquet", ".pq")):
+        df = pd.read_parquet(BytesIO(contenu))
+    else:
+        df = pd.read_csv(BytesIO(contenu), sep=';')
+    proba = df['propension'].to_numpy(dtype=np.float64) / 100
+    conversions = (df[COLONNE_CIBLE].astype(str) == 'yes').to_numpy() if COLONNE_CIBLE in df.columns else None
+    return CourbeSeuils(proba, conversions)
+
+# --- 3. SIDEBAR : HYPOTHÈSES BUSINESS ---
+st.sidebar.header("💰 Hypothèses Business")
+cout_appel = st.sidebar.number_input("Coût d'un appel (€)", 0.0, 1000.0, float(COUT_APPEL), step=1.0)
+gain_vente = st.sidebar.number_input("Marge par vente (€)", 0.0, 100000.0, float(GAIN_VENTE), step=10.0)
+limiter_budget = st.sidebar.checkbox("Budget d'appels limité")
+budget = st.sidebar.number_input("Budget (€)", 0.0, 1e9, 50000.0, step=1000.0) if limiter_budget else None
+
+st.sidebar.markdown("---")
+source = st.sidebar.radio("Leads à planifier", ["Historique (modèle S3)", "Fichier scoré"])
+
+st.title("📞 Planification de Campagne")
+st.markdown("Quel **seuil de score** appeler pour maximiser le **profit**, sous contrainte de budget ?")
+PRECHAUFFAGE.marquer("Premier affichage (planification)")
+
+# Imports lourds (numpy, pandas, plotly) après l'en-tête et les hypothèses : la sidebar s'affiche d'abord
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from bank_marketing.campagne import PART_TEST, CourbeSeuils, lignes_test
+from bank_marketing.donnees import charger_dataset
+from bank_marketing.features import EncodeurCompile
+from bank_marketing.scoring import charger_modele_publie, predire_proba_lot
+
+try:
+    if source == "Fichier scoré":
+        fichier = st.sidebar.file_uploader("Sortie du scoring en masse (.csv ';' ou .parquet)", type=['csv', 'parquet'])
+        if fichier is None:
+            st.info("Chargez un fichier produit par `python -m bank_marketing.scoring` (colonne `propension`).")
+            st.stop()
+        courbe = courbe_fichier(fichier.name, fichier.getvalue())
+    else:
+        courbe = courbe_historique(FICHIER_CSV)
+except Exception as e:
+    st.error(f"Erreur technique : {e}")
+    st.stop()
+
+if courbe.nb_clients == 0:
+    st.info("Aucun lead dans ce fichier : rien à planifier.")
+    st.stop()
+
+# --- 4. SEUIL OPTIMAL ---
+optimum = courbe.optimum(cout_appel, gain_vente, budget)
+libre = courbe.optimum(cout_appel, gain_vente) if budget is not None else optimum
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Seuil optimal", f"{optimum['seuil'] * 100:.2f} %" if optimum['seuil'] is not None else "—")
+with col2:
+    st.metric("Clients à appeler", f"{optimum['appels']:,}".replace(",", " "),
+              f"{optimum['appels'] / courbe.nb_clients:.1%} des leads", delta_color="off")
+with col3:
+    st.metric("Précision / Recall", f"{optimum['precision']:.1%} / {optimum['recall']:.1%}")
+with col4:
+    st.metric("Profit estimé", f"{optimum['profit']:,.0f} €".replace(",", " "),
+              f"{optimum['profit'] - libre['profit']:,.0f} € vs sans budget".replace(",", " ")
+              if budget is not None else None)
+
+if optimum['seuil'] is None:
+    st.warning("⚠️ Aucun seuil n'est rentable avec ces hypothèses (ou le budget ne couvre aucun appel).")
+
+st.caption((f"{courbe.nb_clients:,} leads • {len(courbe):,} seuils distincts évalués".replace(",", " "))
+           + (f" • historique : jeu de test du notebook ({PART_TEST:.0%} des appels, jamais vus par le modèle)"
+              if source != "Fichier scoré" else ""))
+st.markdown("---")
+
+# --- 5. COURBES ---
+points = courbe.echantillon(cout_appel, gain_vente)
+
+col_profit, col_pr = st.columns(2)
+
+with col_profit:
+    fig_profit = go.Figure(go.Scatter(
+        x=points['appels'],
+        y=points['profit'],
+        mode='lines',
+        line=dict(color='#05662A', width=3),
+        customdata=points['seuil'] * 100,
+        hovertemplate='Appels: %{x:,}<br>Profit: %{y:,.0f} €<br>Seuil: %{customdata:.2f}%<extra></extra>'
+    ))
+    if optimum['seuil'] is not None:
+        fig_profit.add_vline(x=optimum['appels'], line_dash="dash", line_color="Brown", annotation_text="Optimum")
+    if budget is not None and cout_appel > 0:
+        fig_profit.add_vline(x=budget // cout_appel, line_dash="dot", line_color="red", annotation_text="Budget")
+    fig_profit.update_layout(title="Profit selon le nombre d'appels", xaxis_title="Clients appelés", yaxis_title="Profit (€)")
+    st.plotly_chart(fig_profit, use_container_width=True)
+
+with col_pr:
+    fig_pr = go.Figure()
+    fig_pr.add_trace(go.Scatter(x=points['seuil'] * 100, y=points['precision'] * 100, name='Précision (%)',
+                                mode='lines', line=dict(color='#E6A66A', width=3)))
+    fig_pr.add_trace(go.Scatter(x=points['seuil'] * 100, y=points['recall'] * 100, name='Recall (%)',
+                                mode='lines', line=dict(color='#CA2103', width=3)))
+    if optimum['seuil'] is not None:
+        fig_pr.add_vline(x=optimum['seuil'] * 100, line_dash="dash", line_color="Brown", annotation_text="Optimum")
+    fig_pr.update_layout(title="Précision / Recall selon le seuil", xaxis_title="Seuil de score (%)",
+                         yaxis_title="%", legend=dict(orientation="h", y=1.1), hovermode="x unified")
+    st.plotly_chart(fig_pr, use_container_width=True)
+
+st.info(f"""
+💰 **La logique du calcul (ROI) :**
+✅ +{gain_vente:,.0f} € pour chaque vente réussie • ❌ -{cout_appel:,.0f} € pour chaque appel déclenché.
+
+👉 Profit = (Ventes x {gain_vente:,.0f} €) - (Appels x {cout_appel:,.0f} €), évalué pour **chaque** seuil possible.
+""")
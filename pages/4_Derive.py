@@ -0,0 +1,127 @@
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from dotenv import load_dotenv
+
+from bank_marketing.config import cache_artefacts, dossier_derive, nom_bucket
+from bank_marketing.derive import (LIGNES_MIN_DERIVE, PSI_DERIVE, PSI_SURVEILLER, VARIABLE_SCORE, alertes,
+                                   charger_profil_publie, comparer, lire_observations, periode_courante)
+
+# --- 1. CONFIGURATION DE LA PAGE ---
+load_dotenv()
+
+st.set_page_config(
+    page_title="Dérive du Modèle",
+    page_icon="📡",
+    layout="wide"
+)
+
+# --- 2. PROFIL DE RÉFÉRENCE ET OBSERVATIONS ---
+@st.cache_resource(show_spinner="Lecture du profil de référence...")
+def charger_reference():
+    # Esquisses des données d'entraînement, publiées à côté du modèle
+    return charger_profil_publie(cache_artefacts(), nom_bucket())
+
+@st.cache_data(ttl=30, show_spinner=False)
+def observations(depuis, _reference):
+    # Fusion des esquisses écrites par le simulateur, le service et le scoring
+    # (relues au plus toutes les 30 s, au rythme de leur écriture)
+    courant, sources, ignores = lire_observations(dossier_derive(), _reference, depuis)
+    return courant, sources, ignores
+
+# --- 3. SIDEBAR : FENÊTRE D'OBSERVATION ---
+st.sidebar.header("📡 Fenêtre d'observation")
+FENETRES = {"Dernière heure": 1, "24 dernières heures": 24, "7 derniers jours": 24 * 7, "Tout l'historique": None}
+fenetre = st.sidebar.selectbox("Clients scorés sur :", list(FENETRES), index=1)
+if st.sidebar.button("🔄 Actualiser"):
+    observations.clear()
+
+heures = FENETRES[fenetre]
+depuis = None if heures is None else periode_courante(time.time() - heures * 3600)
+
+st.title("📡 Dérive des Entrées et du Score")
+st.markdown("Les clients scorés ressemblent-ils encore aux données d'entraînement du modèle ?")
+
+reference = charger_reference()
+if reference is None:
+    st.warning(
+        "Aucun profil de référence publié. Calculez-le sur les données d'entraînement "
+        "(`python -m bank_marketing.derive reference donnees.csv modele.joblib model_bank_marketing_v1_profil.json`) "
+        "et publiez-le à côté du modèle."
+    )
+    st.stop()
+
+courant, sources, ignores = observations(depuis, reference)
+if courant.lignes == 0:
+    st.info(f"Aucun client scoré sur la fenêtre « {fenetre} » (dossier `{dossier_derive()}`).")
+    st.stop()
+
+comparaison = comparer(reference, courant)
+
+# --- 4. KPIs ---
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Clients observés", f"{courant.lignes:,}".replace(",", " "))
+col2.metric("Variables en dérive 🔴", int(comparaison['Niveau'].str.startswith("🔴").sum()))
+col3.metric("À surveiller 🟠", int(comparaison['Niveau'].str.startswith("🟠").sum()))
+ligne_score = comparaison.set_index('Variable').loc[VARIABLE_SCORE]
+col4.metric("PSI du score", f"{ligne_score['PSI']:.3f}",
+            delta=f"{ligne_score['Moyenne'] - ligne_score['Moyenne réf.']:+.2f} pts de propension moyenne",
+            delta_color="off")
+st.caption(" | ".join(f"{source} : {n:,} clients".replace(",", " ") for source, n in sources.items())
+           + (f" | {ignores} fichier(s) d'un autre profil ignoré(s)" if ignores else ""))
+
+# --- 5. ALERTES ---
+st.markdown("### 🚨 Alertes")
+messages = alertes(reference, courant)
+if courant.lignes < LIGNES_MIN_DERIVE:
+    st.info(f"Moins de {LIGNES_MIN_DERIVE} clients sur la fenêtre : écarts non interprétés.")
+elif not messages:
+    st.success("🟢 Aucune dérive : entrées et score restent proches des données d'entraînement.")
+for message in messages:
+    (st.error if message.startswith("🔴") else st.warning)(message)
+
+st.dataframe(
+    comparaison,
+    hide_index=True,
+    use_container_width=True,
+    column_config={
+        'PSI': st.column_config.NumberColumn(format="%.3f"),
+        'KS': st.column_config.NumberColumn(format="%.3f"),
+        'Moyenne réf.': st.column_config.NumberColumn(format="%.1f"),
+        'Moyenne': st.column_config.NumberColumn(format="%.1f")
+    }
+)
+st.caption(f"PSI < {PSI_SURVEILLER} : stable ; {PSI_SURVEILLER} - {PSI_DERIVE} : à surveiller ; > {PSI_DERIVE} : dérive. "
+           "KS : écart maximal entre les fonctions de répartition, aux bornes des déciles de référence.")
+
+# --- 6. DÉTAIL D'UNE VARIABLE ---
+st.markdown("### 🔎 Distribution : référence contre clients scorés")
+variable = st.selectbox("Variable :", comparaison['Variable'].tolist())
+ref, cour = reference.variables[variable], courant.variables[variable]
+libelles = ref.libelles()
+parts_ref = ref.cases() / max(ref.lignes, 1) * 100
+parts = cour.cases() / max(cour.lignes, 1) * 100
+# Cases vides des deux côtés (manquantes, inconnues) masquées
+visibles = (parts_ref > 0) | (parts > 0)
+
+fig = go.Figure()
+fig.add_bar(x=np.array(libelles)[visibles], y=parts_ref[visibles], name="Entraînement", marker_color='#9DB4C0')
+fig.add_bar(x=np.array(libelles)[visibles], y=parts[visibles], name=f"Scorés ({fenetre.lower()})", marker_color='#E6A66A')
+fig.update_layout(barmode='group', yaxis_title="Part des clients (%)", xaxis_title=variable, legend_title="")
+st.plotly_chart(fig, use_container_width=True)
+
+if ref.type == 'categorielle' and cour.inconnues:
+    st.warning(
+        "Valeurs jamais vues à l'entraînement (mises à zéro par l'encodeur du modèle) : "
+        + ", ".join(f"'{v}' ({n:,})".replace(",", " ")
+                    for v, n in sorted(cour.inconnues.items(), key=lambda x: -x[1]))
+    )
+elif ref.type == 'numerique':
+    st.dataframe(pd.DataFrame({
+        'Moyenne': [ref.moyenne, cour.moyenne],
+        'Min': [ref.minimum, cour.minimum],
+        'Max': [ref.maximum, cour.maximum]
+    }, index=['Entraînement', 'Scorés']).round(2))
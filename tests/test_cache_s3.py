@@ -0,0 +1,138 @@
+import json
+import os
+import time
+
+import pytest
+
+from bank_marketing.cache_s3 import CacheArtefacts
+from bank_marketing.s3_local import ClientS3Local
+
+
+class ClientEspion(ClientS3Local):
+    """S3 local qui garde les appels get_object et peut simuler une panne réseau."""
+
+    def __init__(self, racine):
+        super().__init__(racine)
+        self.appels = []
+        self.panne = False
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self.appels.append(kwargs)
+        if self.panne:
+            raise ConnectionError("S3 injoignable")
+        return super().get_object(Bucket=Bucket, Key=Key, **kwargs)
+
+
+@pytest.fixture
+def s3(tmp_path):
+    (tmp_path / "s3" / "b").mkdir(parents=True)
+    return ClientEspion(str(tmp_path / "s3"))
+
+
+def publier(s3, cle, contenu):
+    s3.put_object(Bucket="b", Key=cle, Body=contenu)
+
+
+def fichiers_partiels(repertoire):
+    return [nom for _, _, noms in os.walk(repertoire) for nom in noms if nom.endswith('.part')]
+
+
+def test_premier_telechargement(s3, tmp_path):
+    publier(s3, "modele.bin", b"x" * 1000)
+    cache = CacheArtefacts(s3, str(tmp_path / "cache"))
+
+    chemin = cache.recuperer("b", "modele.bin")
+
+    assert open(chemin, 'rb').read() == b"x" * 1000
+    assert cache.statuts["modele.bin"] == 'telecharge'
+    with open(chemin + '.meta.json', encoding='utf-8') as f:
+        assert json.load(f)['etag'] == s3.head_object(Bucket="b", Key="modele.bin")['ETag']
+
+
+def test_revalidation_304(s3, tmp_path):
+    publier(s3, "modele.bin", b"v1")
+    cache = CacheArtefacts(s3, str(tmp_path / "cache"))
+    cache.recuperer("b", "modele.bin")
+    etag = s3.head_object(Bucket="b", Key="modele.bin")['ETag']
+
+    chemin = cache.recuperer("b", "modele.bin")
+
+    assert s3.appels[-1]['IfNoneMatch'] == etag
+    assert cache.statuts["modele.bin"] == 'revalide'
+    assert open(chemin, 'rb').read() == b"v1"
+
+    # Objet modifié : ETag différent, nouveau téléchargement
+    time.sleep(0.01)
+    publier(s3, "modele.bin", b"v2 plus long")
+    assert open(cache.recuperer("b", "modele.bin"), 'rb').read() == b"v2 plus long"
+    assert cache.statuts["modele.bin"] == 'telecharge'
+
+
+def test_hors_ligne_derniere_copie_valide(s3, tmp_path):
+    publier(s3, "modele.bin", b"v1")
+    cache = CacheArtefacts(s3, str(tmp_path / "cache"))
+    cache.recuperer("b", "modele.bin")
+
+    s3.panne = True
+    chemin = cache.recuperer("b", "modele.bin")
+
+    assert cache.statuts["modele.bin"] == 'hors_ligne'
+    assert open(chemin, 'rb').read() == b"v1"
+    # Jamais téléchargé : la panne remonte
+    with pytest.raises(ConnectionError):
+        cache.recuperer("b", "autre.bin")
+    assert not fichiers_partiels(cache.repertoire)
+
+
+def test_mode_hors_ligne_sans_appel_s3(s3, tmp_path):
+    publier(s3, "modele.bin", b"v1")
+    CacheArtefacts(s3, str(tmp_path / "cache")).recuperer("b", "modele.bin")
+    appels = len(s3.appels)
+
+    cache = CacheArtefacts(s3, str(tmp_path / "cache"), hors_ligne=True)
+    cache.recuperer("b", "modele.bin")
+
+    assert len(s3.appels) == appels
+    assert cache.statuts["modele.bin"] == 'hors_ligne'
+
+
+def test_eviction_par_taille(s3, tmp_path):
+    for cle in ("a.bin", "b.bin", "c.bin"):
+        publier(s3, cle, b"x" * 100)
+    cache = CacheArtefacts(s3, str(tmp_path / "cache"), taille_max=250)
+
+    for cle in ("a.bin", "b.bin", "c.bin"):
+        cache.recuperer("b", cle)
+        time.sleep(0.01)
+
+    # Le moins récemment utilisé sort, le dernier téléchargé est toujours gardé
+    assert sorted(os.path.basename(c) for c, _ in cache.entrees()) == ["b.bin", "c.bin"]
+
+
+def test_eviction_par_age(s3, tmp_path):
+    for cle in ("vieux.bin", "recent.bin"):
+        publier(s3, cle, b"x" * 10)
+    cache = CacheArtefacts(s3, str(tmp_path / "cache"), age_max=3600)
+    chemin_vieux = cache.recuperer("b", "vieux.bin")
+    meta = cache._meta(chemin_vieux)
+    meta['dernier_acces'] = time.time() - 7200
+    cache._ecrire_meta(chemin_vieux, meta)
+
+    cache.recuperer("b", "recent.bin")
+
+    assert [os.path.basename(c) for c, _ in cache.entrees()] == ["recent.bin"]
+    assert not os.path.exists(chemin_vieux + '.meta.json')
+
+
+def test_telechargement_interrompu_sans_fichier_partiel(s3, tmp_path):
+    publier(s3, "gros.bin", os.urandom(3 * 1024 * 1024))
+    cache = CacheArtefacts(s3, str(tmp_path / "cache"))
+
+    with cache.ouvrir("b", "gros.bin") as flux:
+        flux.read(1024)
+
+    assert not fichiers_partiels(cache.repertoire)
+    assert not os.path.exists(cache.chemin("b", "gros.bin"))
+    assert cache.entrees() == []
+    # Le téléchargement suivant repart de zéro et aboutit
+    assert os.path.getsize(cache.recuperer("b", "gros.bin")) == 3 * 1024 * 1024
@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bank_marketing.derive import VARIABLE_SCORE, Esquisses, lire_observations
+
+
+def profil(decalage_solde=0, n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'age': rng.integers(18, 90, n),
+        'solde_bancaire': rng.normal(1500, 3000, n) + decalage_solde,
+        'metier': rng.choice(['admin.', 'technician', 'student'], n)
+    })
+    return Esquisses.depuis_donnees(df, rng.uniform(0, 100, n), ['age', 'solde_bancaire'], ['metier'])
+
+
+def ecrire(dossier, nom, esquisses, source="service"):
+    with open(dossier / nom, 'w', encoding='utf-8') as f:
+        json.dump({'source': source, 'periode': '20260101T00', 'variables': esquisses.vers_dict()}, f)
+
+
+def test_fusion_refusee_sans_fusion_partielle():
+    reference, autre = profil(), profil(decalage_solde=10_000)
+    total = reference.vide()
+    with pytest.raises(ValueError):
+        total.fusionner(autre)
+    assert all(e.lignes == 0 for e in total.variables.values())
+
+
+def test_fichier_d_un_autre_profil_ignore(tmp_path):
+    reference, autre = profil(), profil(decalage_solde=10_000)
+    ecrire(tmp_path, "a.json", reference, "simulateur")
+    ecrire(tmp_path, "b.json", autre)
+
+    total, sources, ignores = lire_observations(str(tmp_path), reference)
+
+    assert ignores == 1
+    assert sources == {'simulateur': 1000}
+    # Aucune variable du fichier ignoré n'entre dans le cumul
+    assert {col: e.lignes for col, e in total.variables.items()} == {
+        col: 1000 for col in ['age', 'solde_bancaire', 'metier', VARIABLE_SCORE]}
+
+
+def test_fichier_avec_variable_manquante_ignore(tmp_path):
+    reference = profil()
+    contenu = reference.vers_dict()
+    del contenu['metier']
+    with open(tmp_path / "c.json", 'w', encoding='utf-8') as f:
+        json.dump({'source': 'service', 'periode': '20260101T00', 'variables': contenu}, f)
+
+    total, _, ignores = lire_observations(str(tmp_path), reference)
+
+    assert ignores == 1
+    assert all(e.lignes == 0 for e in total.variables.values())
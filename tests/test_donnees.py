@@ -0,0 +1,52 @@
+import gc
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from bank_marketing.donnees import DatasetPartage
+from bank_marketing.generateur import generer_lot
+
+# Une vue par rerun : quelques objets pandas, jamais les colonnes (plusieurs Mo ici)
+ALLOCATION_MAX_RERUN = 64 * 1024
+
+
+@pytest.fixture(scope="module")
+def jeu():
+    return DatasetPartage(generer_lot(200_000, np.random.default_rng(0)))
+
+
+def test_vues_partagent_les_tableaux(jeu):
+    session_1, session_2 = jeu.df, jeu.df
+    for col in ['age', 'solde_bancaire', 'souscrit']:
+        assert np.shares_memory(session_1[col].to_numpy(), session_2[col].to_numpy())
+    assert np.shares_memory(session_1['metier'].array.codes, session_2['metier'].array.codes)
+
+
+def test_ecriture_en_place_refusee(jeu):
+    vue = jeu.df
+    with pytest.raises(ValueError):
+        vue['age'].to_numpy()[0] = 99
+    with pytest.raises(ValueError):
+        vue['solde_bancaire'].to_numpy()[:] = 0
+    # Écriture par pandas : copy-on-write de la seule colonne de la vue
+    age = jeu.df['age'].iat[0]
+    vue.loc[0, 'age'] = age + 1
+    assert jeu.df['age'].iat[0] == age
+    # Ajouter une colonne à la vue ne touche pas le dataset partagé
+    vue['nouvelle'] = 1
+    assert 'nouvelle' not in jeu.df.columns
+
+
+def test_allocation_par_rerun_bornee(jeu):
+    assert jeu.octets > 10 * ALLOCATION_MAX_RERUN
+    gc.collect()
+    tracemalloc.start()
+    try:
+        depart, _ = tracemalloc.get_traced_memory()
+        vue = jeu.df
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(vue) == len(jeu)
+    assert pic - depart < ALLOCATION_MAX_RERUN
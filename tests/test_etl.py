@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from bank_marketing.etl import COLONNES_SOURCE, empreintes
+from bank_marketing.generateur import generer_lot
+
+
+def lot(n=20, seed=0):
+    return generer_lot(n, np.random.default_rng(seed))[COLONNES_SOURCE]
+
+
+def test_empreintes_independantes_des_dtypes():
+    df = lot()
+    autre = df.astype({'age': 'float64', 'solde_bancaire': 'Int64', 'metier': object, 'mois': 'category'})
+    assert (empreintes(df) == empreintes(autre)).all()
+
+
+def test_empreintes_avec_manquants():
+    df = lot()
+    avec_nan = df.astype({'solde_bancaire': 'float64', 'metier': object})
+    avec_nan.loc[[0, 1], 'solde_bancaire'] = np.nan
+    avec_nan.loc[2, 'metier'] = None
+
+    hachages = empreintes(avec_nan)
+
+    assert hachages.dtype == np.uint64
+    # Lignes sans manquant : même empreinte qu'avec des colonnes entières
+    assert (hachages[3:] == empreintes(df)[3:]).all()
+    # Un manquant ne se confond pas avec une valeur
+    assert (hachages[:3] != empreintes(df)[:3]).all()
+    # Et reste déterministe (doublons d'un lot à l'autre détectés)
+    assert (empreintes(avec_nan.copy()) == hachages).all()
+
+
+def test_empreintes_manquant_distinct_de_zero():
+    df = pd.concat([lot(1)] * 2, ignore_index=True).astype({'pdays': 'float64'})
+    df.loc[0, 'pdays'] = np.nan
+    df.loc[1, 'pdays'] = 0
+    hachages = empreintes(df)
+    assert hachages[0] != hachages[1]
@@ -0,0 +1,31 @@
+import numpy as np
+
+from bank_marketing.generateur import generer_lot
+from bank_marketing.ingestion import Entrepot, ingerer
+from bank_marketing.s3_local import ClientS3Local
+
+
+def lot_avec_manquants(n=500, seed=0):
+    lot = generer_lot(n, np.random.default_rng(seed))
+    lot = lot.astype({'solde_bancaire': 'float64', 'pdays': 'float64', 'metier': object})
+    lot.loc[lot.index[:10], 'solde_bancaire'] = np.nan
+    lot.loc[lot.index[5:15], 'pdays'] = np.nan
+    lot.loc[lot.index[20:25], 'metier'] = None
+    return lot
+
+
+def test_ingestion_lot_avec_manquants(tmp_path):
+    (tmp_path / "b").mkdir()
+    entrepot = Entrepot(ClientS3Local(str(tmp_path)), "b")
+    lot = lot_avec_manquants()
+    attendues = len(lot.drop_duplicates())
+
+    rapport = ingerer(entrepot, lot)
+    assert rapport['version'] == 1
+    assert rapport['ajoutees'] == attendues
+
+    # Lot rejoué : toutes les lignes, manquants compris, sont reconnues comme doublons
+    rapport = ingerer(entrepot, lot)
+    assert rapport['ajoutees'] == 0
+    assert rapport['doublons'] == len(lot)
+    assert entrepot.manifeste()['lignes'] == attendues